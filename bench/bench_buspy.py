@@ -0,0 +1,383 @@
+'''
+[LICENSE]
+Copyright (c) 2015, Alliance for Sustainable Energy.
+All rights reserved.
+
+Redistribution and use in source and binary forms, 
+with or without modification, are permitted provided 
+that the following conditions are met:
+
+1. Redistributions of source code must retain the above 
+copyright notice, this list of conditions and the 
+following disclaimer.
+
+2. Redistributions in binary form must reproduce the 
+above copyright notice, this list of conditions and the 
+following disclaimer in the documentation and/or other 
+materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the 
+names of its contributors may be used to endorse or 
+promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND 
+CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, 
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF 
+MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR 
+CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, 
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) 
+HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE 
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+If you use this work or its derivatives for research publications, please cite:
+Timothy M. Hansen, Bryan Palmintier, Siddharth Suryanarayanan, 
+Anthony A. Maciejewski, and Howard Jay Siegel, "Bus.py: A GridLAB-D 
+Communication Interface for Smart Distribution Grid Simulations," 
+in IEEE PES General Meeting 2015, Denver, CO, July 2015, 5 pages.
+[/LICENSE]
+Created on Oct 19, 2026
+
+@author: Tim Hansen
+
+Microbenchmarks of the Python side of buspy (no GridLAB-D): the Bus transaction loop for the
+ConstantBus, FileBus and MultiNodeBus (with the AggregatorBusTranslator), action.SumAction, 
+gridlabcomm.str_to_complex, player_to_timeseries, and loading a scenario with BusCatalog (with
+its worker threads, and serially).
+
+The bus configurations are seeded from data/example_bus_input and scaled to the requested size
+(number of time steps, sub-Bus objects, and action inputs).  Each benchmark times every step 
+individually and reports latency percentiles (microseconds) and the net number of gc-tracked 
+objects allocated per step, as JSON.
+
+Usage:
+    python bench/bench_buspy.py [-s STEPS] [-n NODES] [-b BENCHMARK ...] [-o results.json]
+'''
+
+######################################################################
+# IMPORTS
+######################################################################
+
+import argparse
+import gc
+import json
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+from collections import OrderedDict
+from copy import deepcopy
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from buspy.bus import get_bus_from_classname
+from buspy.bus import BusCatalog
+from buspy.bus import DEFAULT_CATALOG_THREADS
+from buspy.bus import AggregatorBusTranslator
+from buspy.comm.message import CommonParam
+from buspy.comm.gridlabcomm import str_to_complex
+from buspy.analyze.loaders.player import player_to_timeseries
+import buspy.utils.action as action
+
+######################################################################
+# CONSTANTS
+######################################################################
+
+SEED_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'example_bus_input')
+
+PLAYER_FILENAME = 'power.player'
+
+SCENARIO_FOLDER = 'scenario'
+
+PERCENTILES = [50, 90, 99]
+
+#timing function with the best resolution on the platform
+TIMING_FUNC = timeit.default_timer
+
+ARGS = OrderedDict()
+
+ARGS['-s']           = ( ['--steps'],
+                          {'type'       :int,
+                           'default'    :1000,
+                           'help'       :"""(optional) Number of time steps (transactions, actions, strings, player rows, scenario bus folders) per benchmark.
+                                         Default: 1000"""} )
+
+ARGS['-n']           = ( ['--nodes'],
+                          {'type'       :int,
+                           'default'    :10,
+                           'help'       :"""(optional) Number of sub-Bus objects under the MultiNodeBus, and of inputs to the SumAction.
+                                         Default: 10"""} )
+
+ARGS['-r']           = ( ['--repeat'],
+                          {'type'       :int,
+                           'default'    :5,
+                           'help'       :"""(optional) Number of times to load the player file (and the scenario in the BusCatalog benchmarks).
+                                         Default: 5"""} )
+
+ARGS['-b']           = ( ['--benchmark'],
+                          {'nargs'      :'*',
+                           'default'    :None,
+                           'help'       :"""(optional) Names of the benchmarks to run.  Default: all"""} )
+
+ARGS['-o']           = ( ['--output'],
+                          {'default'    :None,
+                           'help'       :"""(optional) Filename to write the JSON results to.  Default: stdout"""} )
+
+ARGS['--seed']       = ( [],
+                          {'type'       :int,
+                           'default'    :0,
+                           'help'       :"""(optional) Seed for the random workloads.  Default: 0"""} )
+
+######################################################################
+# UTILITY FUNCTIONS
+######################################################################
+
+def load_seed(filename):
+    '''
+    Loads an example bus JSON from data/example_bus_input as a plain dict.
+    '''
+    with open(os.path.join(SEED_FOLDER, filename), 'r') as f:
+        return json.load(f)
+
+def scale_params(params, folder, steps):
+    '''
+    Points the seed bus parameters at folder, runs them for steps time steps, and turns debug off.
+    '''
+    params = deepcopy(params)
+    
+    _start = datetime.strptime(params['time_info']['start'], '%Y-%m-%d %H:%M:%S')
+    params['time_info']['end'] = str(_start + timedelta(seconds=params['time_info']['delta'] * steps))
+    params['folder'] = folder
+    params['debug'] = False
+    params.pop('debug_type', None)
+    params.pop('debug_args', None)
+    
+    return params
+
+def write_player(filename, start, delta, steps):
+    '''
+    Writes a synthetic power .player file with steps+1 rows (absolute first time, then relative '+<delta>s' times).
+    '''
+    _values = np.random.normal(20000.0, 2000.0, steps + 1)
+    with open(filename, 'w') as f:
+        f.write('%s,%r+%rj\n' % (start, _values[0], 4.0))
+        for v in _values[1:]:
+            f.write('+%ds,%r+%rj\n' % (delta, v, 4.0))
+
+def write_scenario(folder, count):
+    '''
+    Writes count bus folders with distinct ResistorBus configurations (so BusCatalog parses each one) under folder, 
+    once.
+    '''
+    if os.path.isdir(folder):
+        return
+    _seed = load_seed('resistor_bus.json')
+    for i in xrange(count):
+        _params = deepcopy(_seed)
+        _params['io_map'][0]['nominal_voltage'] += i
+        os.makedirs(os.path.join(folder, 'bus_%d' % i))
+        with open(os.path.join(folder, 'bus_%d' % i, 'bus.json'), 'w') as f:
+            json.dump(_params, f, indent=4)
+
+def measure(func, steps):
+    '''
+    Calls func(k) for k in range(steps), timing each call.  The garbage collector is disabled while 
+    measuring so the gen0 count is the net number of gc-tracked objects the call allocated.
+    
+    Returns:
+        OrderedDict - latency percentiles (us), mean, max, and allocations per step
+    '''
+    _lat = np.empty(steps)
+    _alloc = np.empty(steps)
+    
+    gc.collect()
+    gc.disable()
+    try:
+        for k in xrange(steps):
+            _c0 = gc.get_count()[0]
+            _t0 = TIMING_FUNC()
+            func(k)
+            _lat[k] = TIMING_FUNC() - _t0
+            _alloc[k] = gc.get_count()[0] - _c0
+    finally:
+        gc.enable()
+    
+    _lat *= 1e6
+    
+    ret = OrderedDict()
+    ret['steps'] = steps
+    for p in PERCENTILES:
+        ret['p%d_us' % p] = float(np.percentile(_lat, p))
+    ret['mean_us'] = float(_lat.mean())
+    ret['max_us'] = float(_lat.max())
+    ret['total_s'] = float(_lat.sum() / 1e6)
+    ret['allocs_per_step'] = float(_alloc.mean())
+    ret['allocs_total'] = int(_alloc.sum())
+    return ret
+
+def bus_steps(bus, inputs_func):
+    '''
+    Returns the step function for a started bus, one transaction per call.
+    '''
+    def _step(k):
+        bus.transaction(inputs_func(k))
+    return _step
+
+def aggregator_inputs(steps):
+    '''
+    Precomputed random AggregatorBusTranslator inputs so their creation is not timed.
+    '''
+    _re = np.random.normal(1.0, 0.05, steps)
+    _im = np.random.normal(0.0, 0.1, steps)
+    return [{AggregatorBusTranslator.IN_V_RE_KEY : _re[k], AggregatorBusTranslator.IN_V_IM_KEY : _im[k]} for k in xrange(steps)]
+
+######################################################################
+# BENCHMARKS
+######################################################################
+
+def bench_constant_bus(folder, args):
+    bus = get_bus_from_classname(scale_params(load_seed('constant_bus.json'), folder, args.steps))
+    bus.start_bus()
+    ret = measure(bus_steps(bus, lambda k: None), args.steps)
+    bus.stop_bus()
+    return ret
+
+def bench_file_bus(folder, args):
+    bus = get_bus_from_classname(scale_params(load_seed('file_bus.json'), folder, args.steps))
+    bus.start_bus()
+    ret = measure(bus_steps(bus, lambda k: None), args.steps)
+    bus.stop_bus()
+    return ret
+
+def bench_multinode_bus(folder, args):
+    '''
+    MultiNodeBus with the AggregatorBusTranslator over args.nodes sub-Bus objects, alternating the 
+    ConstantBus and FileBus seeds.  The SumAction sums the measured_power of all of them.
+    '''
+    params = scale_params(load_seed('multi_bus_translator.json'), folder, args.steps)
+    _seeds = [scale_params(load_seed('constant_bus.json'), folder, args.steps),
+              scale_params(load_seed('file_bus.json'), folder, args.steps)]
+    params['nodes'] = [deepcopy(_seeds[i % len(_seeds)]) for i in xrange(args.nodes)]
+    
+    bus = get_bus_from_classname(params)
+    bus.start_bus()
+    _inputs = aggregator_inputs(args.steps)
+    ret = measure(bus_steps(bus, lambda k: _inputs[k]), args.steps)
+    bus.stop_bus()
+    return ret
+
+def bench_sum_action(folder, args):
+    '''
+    SumAction over args.nodes sub-Bus outputs (the MultiNodeBus output_list layout).
+    '''
+    _seed = load_seed('multi_bus_translator.json')['actions'][0]
+    _action = action.json_to_action(_seed)
+    _name, _param = _action.action_names[0]
+    
+    _values = np.random.normal(20000.0, 2000.0, (args.steps, args.nodes)) + 4.0j
+    _lists = []
+    for k in xrange(args.steps):
+        _lists.append([{}] + [{_name : {_param : CommonParam(name=_name, param=_param, value=v)}} for v in _values[k]] + [{}])
+    
+    return measure(lambda k: _action.execute(_lists[k]), args.steps)
+
+def bench_str_to_complex(folder, args):
+    '''
+    Alternates the rectangular ('+..j' and '+..i') and polar ('..d') GridLAB-D complex formats.
+    '''
+    _mag = np.random.normal(20000.0, 2000.0, args.steps)
+    _ang = np.random.uniform(-180.0, 180.0, args.steps)
+    _fmts = ['%+.6f%+.6fj', '%+.6f%+.6fi', '%+.6f%+.6fd']
+    _strs = [_fmts[k % 3] % (_mag[k], _ang[k]) for k in xrange(args.steps)]
+    
+    return measure(lambda k: str_to_complex(_strs[k]), args.steps)
+
+def bench_player_to_timeseries(folder, args):
+    '''
+    Loads the args.steps row player file args.repeat times.  Each step is a whole load.
+    '''
+    _filename = os.path.join(folder, PLAYER_FILENAME)
+    ret = measure(lambda k: player_to_timeseries(_filename), args.repeat)
+    ret['rows'] = args.steps + 1
+    return ret
+
+def bench_bus_catalog(folder, args, threads=DEFAULT_CATALOG_THREADS):
+    '''
+    Loads a scenario of args.steps bus folders with BusCatalog args.repeat times.  Each step is a whole load.
+    '''
+    _scenario = os.path.join(folder, SCENARIO_FOLDER)
+    write_scenario(_scenario, args.steps)
+    ret = measure(lambda k: BusCatalog(_scenario, threads=threads), args.repeat)
+    ret['folders'] = args.steps
+    ret['threads'] = threads
+    return ret
+
+def bench_bus_catalog_serial(folder, args):
+    return bench_bus_catalog(folder, args, threads=1)
+
+BENCHMARKS = OrderedDict([
+    ('ConstantBus',             bench_constant_bus),
+    ('FileBus',                 bench_file_bus),
+    ('MultiNodeBus',            bench_multinode_bus),
+    ('SumAction',               bench_sum_action),
+    ('str_to_complex',          bench_str_to_complex),
+    ('player_to_timeseries',    bench_player_to_timeseries),
+    ('BusCatalog',              bench_bus_catalog),
+    ('BusCatalog_serial',       bench_bus_catalog_serial),
+])
+
+def run_benchmarks(args):
+    '''
+    Runs the requested benchmarks in a temporary folder holding the synthetic player file.
+    
+    Returns:
+        OrderedDict - the configuration and the results of each benchmark
+    '''
+    np.random.seed(args.seed)
+    
+    _names = args.benchmark if args.benchmark else BENCHMARKS.keys()
+    for name in _names:
+        if name not in BENCHMARKS:
+            raise Exception('Unknown benchmark: %s (choose from %s)' % (name, ', '.join(BENCHMARKS.keys())))
+    
+    _seed = load_seed('file_bus.json')
+    folder = tempfile.mkdtemp(prefix='buspy_bench_')
+    try:
+        write_player(os.path.join(folder, PLAYER_FILENAME), _seed['time_info']['start'], _seed['time_info']['delta'], args.steps)
+        
+        ret = OrderedDict()
+        ret['config'] = OrderedDict([('steps', args.steps), ('nodes', args.nodes), ('repeat', args.repeat), 
+                                     ('seed', args.seed), ('python', sys.version.split()[0])])
+        ret['results'] = OrderedDict()
+        for name in _names:
+            ret['results'][name] = BENCHMARKS[name](folder, args)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    
+    return ret
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="""Microbenchmarks of the buspy
+    message, translation and action layers.  Results are written as JSON.""")
+    
+    #add the arguments from ARGS
+    for key in ARGS.keys():
+        parser.add_argument(key, *ARGS[key][0], **ARGS[key][1])
+    
+    args = parser.parse_args()
+    
+    results = json.dumps(run_benchmarks(args), indent=4)
+    
+    if args.output != None:
+        with open(args.output, 'w') as f:
+            f.write(results)
+    else:
+        print results
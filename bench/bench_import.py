@@ -0,0 +1,165 @@
+'''
+[LICENSE]
+Copyright (c) 2015, Alliance for Sustainable Energy.
+All rights reserved.
+
+Redistribution and use in source and binary forms, 
+with or without modification, are permitted provided 
+that the following conditions are met:
+
+1. Redistributions of source code must retain the above 
+copyright notice, this list of conditions and the 
+following disclaimer.
+
+2. Redistributions in binary form must reproduce the 
+above copyright notice, this list of conditions and the 
+following disclaimer in the documentation and/or other 
+materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the 
+names of its contributors may be used to endorse or 
+promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND 
+CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, 
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF 
+MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR 
+CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, 
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) 
+HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE 
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+If you use this work or its derivatives for research publications, please cite:
+Timothy M. Hansen, Bryan Palmintier, Siddharth Suryanarayanan, 
+Anthony A. Maciejewski, and Howard Jay Siegel, "Bus.py: A GridLAB-D 
+Communication Interface for Smart Distribution Grid Simulations," 
+in IEEE PES General Meeting 2015, Denver, CO, July 2015, 5 pages.
+[/LICENSE]
+Created on Oct 19, 2026
+
+@author: Tim Hansen
+
+Import-time benchmark.  Each case is run in a fresh interpreter (-r times) and reports the 
+wall-clock time of its import statements, and which of the heavy dependencies buspy defers
+(see buspy.utils.lazy) ended up in sys.modules, as JSON.
+
+Usage:
+    python bench/bench_import.py [-r REPEAT] [-o results.json]
+'''
+
+######################################################################
+# IMPORTS
+######################################################################
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import OrderedDict
+
+######################################################################
+# CONSTANTS
+######################################################################
+
+ROOT_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+HEAVY_MODULES = ['numpy', 'pandas', 'h5py', 'xml.etree.ElementTree', 'httplib', 'http.client', 
+                 'subprocess', 'subprocess32', 'buspy.analyze.loaders.player']
+
+#import statements timed in each case
+CASES = OrderedDict([
+    ('baseline',        ''),
+    ('buspy',           'import buspy'),
+    ('buspy.bus',       'import buspy.bus'),
+    ('ConstantBus',     'from buspy.bus import ConstantBus'),
+    ('git_hash',        'import buspy; buspy.git_hash()'),
+    ('numpy',           'import numpy'),
+    ('pandas',          'import pandas'),
+])
+
+#run in the child interpreter; prints the import time and the loaded heavy modules as JSON
+CHILD_SCRIPT = '''
+import sys, json, timeit
+_t0 = timeit.default_timer()
+%s
+_t = timeit.default_timer() - _t0
+sys.stderr.write(json.dumps([_t, [m for m in %r if sys.modules.get(m) is not None]]) + '\\n')
+'''
+
+ARGS = OrderedDict()
+
+ARGS['-r']           = ( ['--repeat'],
+                          {'type'       :int,
+                           'default'    :10,
+                           'help'       :"""(optional) Number of fresh interpreters per case.
+                                         Default: 10"""} )
+
+ARGS['-o']           = ( ['--output'],
+                          {'default'    :None,
+                           'help'       :"""(optional) Filename to write the JSON results to.  Default: stdout"""} )
+
+######################################################################
+# UTILITY FUNCTIONS
+######################################################################
+
+def time_import(statement, repeat):
+    '''
+    Runs the import statement in repeat fresh interpreters.
+    
+    Returns:
+        OrderedDict - min/median/max import time (ms) and the heavy modules loaded by the import
+    '''
+    _env = dict(os.environ)
+    _env['PYTHONPATH'] = os.pathsep.join([ROOT_FOLDER] + [p for p in [_env.get('PYTHONPATH')] if p])
+    
+    _times = []
+    _loaded = []
+    for _ in xrange(repeat):
+        _proc = subprocess.Popen([sys.executable, '-c', CHILD_SCRIPT % (statement, HEAVY_MODULES)],
+                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=_env)
+        _out, _err = _proc.communicate()
+        if _proc.returncode != 0:
+            raise Exception('Import failed (%s): %s' % (statement, _err))
+        _t, _loaded = json.loads(_err.strip().splitlines()[-1])
+        _times.append(_t * 1e3)
+    
+    _times.sort()
+    ret = OrderedDict()
+    ret['statement'] = statement
+    ret['min_ms'] = _times[0]
+    ret['median_ms'] = _times[len(_times) // 2]
+    ret['max_ms'] = _times[-1]
+    ret['loaded'] = _loaded
+    return ret
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="""Import-time benchmark of buspy.
+    Results are written as JSON.""")
+    
+    #add the arguments from ARGS
+    for key in ARGS.keys():
+        parser.add_argument(key, *ARGS[key][0], **ARGS[key][1])
+    
+    args = parser.parse_args()
+    
+    ret = OrderedDict()
+    ret['config'] = OrderedDict([('repeat', args.repeat), ('python', sys.version.split()[0])])
+    ret['results'] = OrderedDict()
+    for name, statement in CASES.items():
+        ret['results'][name] = time_import(statement, args.repeat)
+    
+    results = json.dumps(ret, indent=4)
+    
+    if args.output != None:
+        with open(args.output, 'w') as f:
+            f.write(results)
+    else:
+        print results
@@ -46,16 +46,27 @@ __version__ = '1.1.0'
 
 import os
 
+# Absolute package path, so the deferred imports (see buspy.utils.lazy) still work after a Bus
+# changes the working directory when buspy was imported from a relative sys.path entry (e.g., '')
+__path__ = [os.path.abspath(p) for p in __path__]
+
 def bus_dir():
     return os.path.realpath(os.path.dirname(os.path.realpath(__file__)))
 
-# Print hash of project on import
-try:
-    import os
-    path = bus_dir()
-    from subprocess import check_output as _check_output
-    _hash = _check_output(["git", "rev-parse", "HEAD"], cwd=path).strip()
-    print('HASH of {} is {}'.format(bus_dir(), _hash))
-except:
-    print('Unable to print hash of {}'.format(bus_dir()))
+_git_hash = None
+
+def git_hash():
+    '''
+    Returns the git hash of the project (None if bus_dir() is not in a git checkout).  Looked up on the first call
+    instead of on import, as it starts a git process.
+    '''
+    global _git_hash
+    if _git_hash is None:
+        try:
+            from subprocess import check_output as _check_output
+            with open(os.devnull, 'w') as _devnull:
+                _git_hash = _check_output(["git", "rev-parse", "HEAD"], cwd=bus_dir(), stderr=_devnull).strip()
+        except Exception:
+            _git_hash = ''
+    return _git_hash or None
 
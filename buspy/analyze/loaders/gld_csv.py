@@ -47,15 +47,19 @@ Created on June 9, 2014
 
 csv functions.  Will load the files into the data-holder classes.  
 
+A time window of a recorder is found through a sparse index of the byte offsets and timestamps of every 
+INDEX_STRIDE-th row, which is cached in filename + INDEX_EXTENSION and only rebuilt when the file changes.
+
 Functions:
-    CsvGridlab(filename) - takes a csv filename and returns a filled GridlabData class
+    CsvGridlab(filename)     - takes a csv filename and returns a filled GridlabData class (optionally only a time window 
+                               and some of the columns)
+    recorder_index(filename) - returns the sparse (timestamp, byte offset) index of a recorder csv
 
 Requirements:
     numpy
     pandas
     
 To-Do List:
-    TODO: only load a specific range of dates/times
 '''
 
 ################################################################################################
@@ -63,19 +67,24 @@ To-Do List:
 ################################################################################################
 
 from __future__ import print_function
+import cPickle as pickle
+import logging
+import os
 import numpy as np
 import linecache
 import pandas as pd
 from array import *
+from collections import OrderedDict
+from StringIO import StringIO
 
 from buspy.analyze.gridlabd import _strip_prefix_asarray as _strip
 import buspy.analyze.gridlabd as gridlabd
 
 #for complex conversion
 import re
-from igms.run.bus_utils.comm.gridlabcomm import COMPLEX_REGEX_PATTERN
+from buspy.comm.gridlabcomm import COMPLEX_REGEX_PATTERN
 import cmath
-from igms.run.bus_utils.comm.gridlabcomm import str_to_complex
+from buspy.comm.gridlabcomm import str_to_complex
 
 ############################
 # CONSTANTS
@@ -101,6 +110,16 @@ _GRIDLAB_DELIMITER = {
     gridlabd._G_GROUP_ZIPLOAD:('groupid=',1)           
 }
 
+#recorder timestamps are 'YYYY-MM-DD HH:MM:SS' followed by an optional time zone name, which is dropped
+_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+_TIME_WIDTH = 19
+
+#sparse recorder index
+INDEX_EXTENSION = '.idx'
+INDEX_STRIDE = 4096 #rows between index entries
+_INDEX_VERSION = 1
+_INDEX_BLOCK = 1 << 24 #bytes read at a time while building the index
+
 ############################
 # UTILITY FUNCTIONS
 ############################
@@ -156,6 +175,173 @@ def conv_data(x,comp_ind,cur_line,skip_rows=True):
         
     return ret.rstrip(',')
 
+def _to_datetime(col):
+    '''
+    Converts the recorder timestamp column to a DatetimeIndex.  Uses the fixed recorder format when every
+    timestamp has it, otherwise falls back to the (much slower) general parser.
+    '''
+    col = col.astype(str)
+    if col.str[_TIME_WIDTH:_TIME_WIDTH+1].isin(['',' ']).all():
+        try:
+            return pd.DatetimeIndex(pd.to_datetime(col.str[:_TIME_WIDTH], format=_TIME_FORMAT))
+        except ValueError:
+            pass
+    return pd.DatetimeIndex(pd.to_datetime(col.values))
+
+def _split_complex(col):
+    '''
+    Converts a column of rectangular ('i'/'j') or polar ('d') strings to complex, without a python loop per value.
+    The unit suffix is swapped for 'j' on a byte view of the strings, so a polar value parses as (magnitude + angle j).
+    '''
+    values = np.asarray(col.astype(str).values, dtype=np.str)
+    n = values.shape[0]
+    if n == 0 or values.itemsize == 0:
+        return np.zeros(n, dtype=np.complex)
+    
+    chars = values.view('S1').reshape(n, values.itemsize)
+    last = (chars != '').sum(axis=1) - 1
+    rows = np.arange(n)
+    suffix = chars[rows, np.maximum(last, 0)]
+    polar = suffix == 'd'
+    
+    unit = polar | (suffix == 'i')
+    chars[rows[unit], last[unit]] = 'j'
+    
+    ret = values.astype(np.complex)
+    if polar.any():
+        mag = ret.real[polar]
+        ang = ret.imag[polar] * (np.pi/180.0)
+        ret[polar] = mag*np.cos(ang) + 1j*mag*np.sin(ang)
+    
+    return ret
+
+def _read_rows(source,complex_indices,skiprows=NUM_SKIP_ROWS,usecols=None):
+    '''
+    Reads the recorder data rows in a single pass of the C csv parser.  Switch states are mapped to 1/0 and
+    complex columns are split into real,imag columns.  usecols is a list of the csv columns (0 is the time) to convert.
+    
+    Returns the time as a DatetimeIndex and the values as a 2-D float array.
+    '''
+    try:
+        frame = pd.read_csv(source, header=None, skiprows=skiprows, comment='#', dtype={0:str}, usecols=usecols, engine='c')
+    except pd.errors.EmptyDataError:
+        return pd.DatetimeIndex([]), np.empty((0,0))
+    
+    columns = []
+    for i in frame.columns[1:]:
+        col = frame[i]
+        if i in complex_indices:
+            val = _split_complex(col)
+            columns.extend([val.real, val.imag])
+        elif col.dtype == np.object:
+            val = col.values
+            val = np.where(val == 'CLOSED', 1, np.where(val == 'OPEN', 0, val))
+            columns.append(pd.to_numeric(pd.Series(val), errors='coerce').values.astype(np.float))
+        else:
+            columns.append(col.values.astype(np.float))
+    
+    return _to_datetime(frame[0]), np.column_stack(columns) if columns else np.empty((frame.shape[0],0))
+
+def _column_names(names,complex_indices):
+    '''
+    Returns an OrderedDict of the csv columns (label: (csv column, [indices into names])), where the label of a complex 
+    column is its name without '.real'/'.imag'.
+    '''
+    ret = OrderedDict()
+    i = 0
+    for col in range(1, len(names) - len(complex_indices) + 1):
+        if col in complex_indices:
+            ret[names[i][:-len('.real')]] = (col, [i, i+1])
+            i += 2
+        else:
+            ret[names[i]] = (col, [i])
+            i += 1
+    return ret
+
+def _build_index(filename,stride):
+    '''
+    Scans the recorder for the byte offset of every stride-th data row, and parses the timestamps of those rows.
+    '''
+    offsets = []
+    lines = 0
+    pos = 0
+    with open(filename, 'rb') as f:
+        while True:
+            block = f.read(_INDEX_BLOCK)
+            if not block:
+                break
+            ends = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == ord('\n'))
+            #the row starting after each newline
+            rows = lines + np.arange(1, ends.shape[0] + 1) - NUM_SKIP_ROWS
+            take = (rows >= 0) & (rows % stride == 0)
+            offsets.append(pos + ends[take] + 1)
+            lines += ends.shape[0]
+            pos += len(block)
+        
+        stamps = []
+        starts = []
+        for offset in np.concatenate(offsets) if offsets else []:
+            f.seek(offset)
+            line = f.readline()
+            if line.strip() and not line.startswith('#'):
+                stamps.append(line.split(',', 1)[0])
+                starts.append(offset)
+    
+    times = _to_datetime(pd.Series(stamps, dtype=object)).asi8 if stamps else np.empty(0, dtype=np.int64)
+    return times, np.array(starts, dtype=np.int64)
+
+def recorder_index(filename,stride=INDEX_STRIDE,cache=True):
+    '''
+    Returns the sparse index of a recorder csv: the times (int64 ns) and the byte offsets of every stride-th data row.  
+    If cache is True, the index is pickled to filename + INDEX_EXTENSION, and later calls load it (while the size and 
+    mtime of the csv file are unchanged) instead of scanning the file.
+    '''
+    if not cache:
+        return _build_index(filename, stride)
+    
+    _stat = os.stat(filename)
+    _key = (_INDEX_VERSION, stride, _stat.st_size, _stat.st_mtime)
+    _path = filename + INDEX_EXTENSION
+    try:
+        with open(_path, 'rb') as f:
+            if pickle.load(f) == _key:
+                return pickle.load(f)
+    except Exception:
+        #missing, out of date or unreadable
+        pass
+    
+    index = _build_index(filename, stride)
+    
+    _tmp = '%s.%d.tmp' % (_path, os.getpid())
+    try:
+        with open(_tmp, 'wb') as f:
+            pickle.dump(_key, f, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(index, f, pickle.HIGHEST_PROTOCOL)
+        os.rename(_tmp, _path)
+    except Exception as e:
+        logging.warning('Could not write the recorder index {}, because {}.'.format(_path, e))
+        if os.path.exists(_tmp):
+            os.remove(_tmp)
+    return index
+
+def _read_window(filename,start,end):
+    '''
+    Returns the bytes of the data rows that can hold [start, end] (int64 ns, None for open), found through the recorder index.
+    '''
+    times, offsets = recorder_index(filename)
+    if offsets.shape[0] == 0:
+        return ''
+    
+    #the last index row at or before start, up to the first index row after end
+    first = 0 if start is None else max(np.searchsorted(times, start, side='right') - 1, 0)
+    last = times.shape[0] if end is None else np.searchsorted(times, end, side='right')
+    
+    with open(filename, 'rb') as f:
+        f.seek(offsets[first])
+        if last < offsets.shape[0]:
+            return f.read(offsets[last] - offsets[first])
+        return f.read()
+
 def get_indeces_of_complex(test_line):
     ret = []
     for i,s in enumerate(test_line.strip('\n').split(',')):
@@ -251,22 +437,48 @@ def get_line_offsets(filename,num_ranks,skip_lines=NUM_SKIP_ROWS):
 #############################################################################################################################
 # GRIDLAB-D
 #############################################################################################################################   
-def CsvGridlab(filename,prefix=None,dtype=np.float):
+def CsvGridlab(filename,prefix=None,dtype=np.float,start=None,end=None,columns=None):
     '''
     Loads the gridlab output from a csv to GridlabData.
     
     Keyword Arguments:
         filename - csv file to load
         prefix - string to strip from the gridlabd names
+        start - first time to load (inclusive), None for the start of the file
+        end - last time to load (inclusive), None for the end of the file
+        columns - list of the columns to load (complex columns without '.real'/'.imag'), None for all of them
     '''
     _ret, complex_indices = common_load(filename,prefix)
     
-    _ret.time = pd.to_datetime(np.loadtxt(filename, delimiter=',', skiprows=NUM_SKIP_ROWS, dtype=np.str, usecols=(0,)))
+    usecols = None
+    if columns is not None:
+        _columns = _column_names(_ret.names, complex_indices)
+        for name in columns:
+            if name not in _columns:
+                raise Exception('column {} is not in the recorder {}'.format(name, filename))
+        usecols = [0] + sorted(_columns[name][0] for name in set(columns))
+        _ret.names = _ret.names[sorted(i for name in set(columns) for i in _columns[name][1])]
+        _ret.number = _ret.names.shape[0]
+    
+    #one pass over the file (or over the window of it) for both the time and the data
+    if start is None and end is None:
+        _ret.time, values = _read_rows(filename, complex_indices, usecols=usecols)
+    else:
+        start = None if start is None else pd.Timestamp(start).value
+        end = None if end is None else pd.Timestamp(end).value
+        _ret.time, values = _read_rows(StringIO(_read_window(filename, start, end)), complex_indices, skiprows=0, usecols=usecols)
+        
+        keep = np.ones(_ret.time.shape[0], dtype=bool)
+        if start is not None:
+            keep &= _ret.time.asi8 >= start
+        if end is not None:
+            keep &= _ret.time.asi8 <= end
+        _ret.time = _ret.time[keep]
+        values = values[keep]
     
-    #iterate through the data lines and replace the string using conv_switch.
-    _ret.data = pd.DataFrame(np.genfromtxt((conv_data(x,complex_indices,i) for i,x in enumerate(open(filename))),delimiter=',', 
-                                           skip_header=NUM_SKIP_ROWS,usecols=np.arange(1,_ret.number+1),dtype=dtype), 
-                                           columns=_ret.names, index=_ret.time)
+    if values.shape[0] == 0:
+        values = np.empty((0,_ret.number))
+    _ret.data = pd.DataFrame(values.astype(dtype), columns=_ret.names, index=_ret.time)
     
     return _ret
 
@@ -302,11 +514,8 @@ def ParallelCsvGridlab(filename,prefix=None,dtype=np.float,root=0):
     
     #convert to pandas dataframe
     data = buffer.tostring()
-    _ret.time = pd.to_datetime(np.loadtxt((x for x in data.split('\n')), delimiter=',', dtype=np.str, usecols=(0,)))
-    
-    _ret.data = pd.DataFrame(np.genfromtxt((conv_data(x,complex_indices,i,False) for i,x in enumerate(data.split('\n'))),delimiter=',', 
-                                           usecols=np.arange(1,_ret.number+1),dtype=dtype), 
-                                           columns=_ret.names, index=_ret.time)
+    _ret.time, values = _read_rows(StringIO(data), complex_indices, skiprows=0)
+    _ret.data = pd.DataFrame(values.astype(dtype), columns=_ret.names, index=_ret.time)
     
     return _ret, offset_indices, num_lines
 
@@ -49,14 +49,313 @@ glm.py
 
 Load a GridLAB-D load .glm file into Python memory.
 
+The file is read line by line with a small tokenizer (quoted strings, '{', '}', ';', and everything else), so a
+model is indexed in one pass without GridLAB-D.  The index holds every object (nested objects included) by name
+and by class, with its properties and the line and byte offset of its definition.  It is cached next to the file
+(filename + INDEX_EXTENSION) and only rebuilt when the file changes.  Macros (${...} of #define, #set and #for, 
+#insert) and id ranges ('object class:1..3') are not expanded: the index of such a file is not complete (see 
+GlmIndex.complete).
+
+Classes:
+    GlmObject             - an object of a .glm file
+    GlmIndex              - the objects of a .glm file by name and by class
+
+Functions:
+    glm_index(filename)     - returns the GlmIndex of a .glm file (through the cache file)
+    glm_schedules(filename) - returns the schedules of a .glm file (name: buspy.analyze.schedule.Schedule)
+
 Requirements:
-    
+    numpy
+    pandas
     
 To-Do List:
-    TODO: find and copy glm functionality from GridLAB-D
-    TODO: output a cpest.analyze.data.schedule
+    TODO: follow #include files
 '''
 
+######################################################################
+# IMPORTS
+######################################################################
+
+import cPickle as pickle
+import logging
+import os
+import re
+from collections import OrderedDict
+from buspy.analyze.schedule import glm_to_schedules
+
+
+######################################################################
+# CONSTANTS
+######################################################################
+
+INDEX_EXTENSION = '.idx'
+_INDEX_VERSION = 2
+
+_TOKEN = re.compile(r'"[^"]*"|\'[^\']*\'|\$\{[^}]*\}|[{};]|[^"\'{};$]+|\$')
+_OBJECT = re.compile(r'^object\s+([^\s:{]+)(?::(\S+))?$')
+_SIMPLE = re.compile(r'^[^"\'{};/]+;$')
+
+
+######################################################################
+# CLASSES
+######################################################################
+
+class GlmObject(object):
+    '''
+    An object of a .glm file.  id is the id of the 'object class:id' statement or, if there is none, the position of 
+    the statement in the file (from 0).  properties holds the property values as written (without quotes), and line
+    and offset the line (1-based) and byte offset of the 'object' statement.  parent is the name of the parent object (the 
+    parent property, or the enclosing object of a nested object), or None.
+    '''
+    __slots__ = ('class_name', 'id', 'name', 'properties', 'line', 'offset', 'parent', '_enclosing')
+    
+    def __init__(self,class_name,id=None,line=None,offset=None,enclosing=None):
+        self.class_name = class_name
+        self.id = id
+        self.name = None
+        self.properties = {}
+        self.line = line
+        self.offset = offset
+        self.parent = None
+        self._enclosing = enclosing
+    
+    def __getitem__(self,prop):
+        return self.properties[prop]
+    
+    def __contains__(self,prop):
+        return prop in self.properties
+    
+    def get(self,prop,default=None):
+        return self.properties.get(prop, default)
+    
+    def __repr__(self):
+        return 'GlmObject(%s %s, line %s)' % (self.class_name, self.name, self.line)
+    
+    def __getstate__(self):
+        return (self.class_name, self.id, self.name, self.properties, self.line, self.offset, self.parent)
+    
+    def __setstate__(self,state):
+        self.class_name, self.id, self.name, self.properties, self.line, self.offset, self.parent = state
+        self._enclosing = None
+
+class GlmIndex(object):
+    '''
+    The objects of a .glm file.  index[name] returns the GlmObject named name (unnamed objects are named 
+    'class:id'), of_class(class_name) the objects of a class, and children(name) the objects whose parent is name.
+    unresolved holds the lines with macros or id ranges, whose objects may have other names (or be more objects) in 
+    GridLAB-D.
+    '''
+    def __init__(self,filename=None):
+        self.filename = filename
+        self.objects = OrderedDict()
+        self.modules = []
+        self.includes = []
+        self.unresolved = []
+        self._classes = {}
+        self._children = {}
+    
+    def __getitem__(self,name):
+        return self.objects[name]
+    
+    def __contains__(self,name):
+        return name in self.objects
+    
+    def __len__(self):
+        return len(self.objects)
+    
+    def __iter__(self):
+        return self.objects.itervalues()
+    
+    def get(self,name,default=None):
+        return self.objects.get(name, default)
+    
+    @property
+    def complete(self):
+        '''
+        True if the index holds every object of the model by its GridLAB-D name (the file includes no other files, and
+        uses no macros or id ranges)
+        '''
+        return len(self.includes) == 0 and len(self.unresolved) == 0
+    
+    def classes(self):
+        return self._classes.keys()
+    
+    def of_class(self,class_name):
+        return self._classes.get(class_name, [])
+    
+    def children(self,name):
+        return self._children.get(name, [])
+    
+    def add(self,obj):
+        '''
+        Adds the (complete) GlmObject obj.  Throws an Exception if another object has the same name.
+        '''
+        if obj.name is None:
+            obj.name = '%s:%s' % (obj.class_name, obj.id)
+        if obj.name in self.objects:
+            raise Exception('%s: object %s (line %s) is already defined on line %s' % (self.filename, obj.name, obj.line,
+                                                                                       self.objects[obj.name].line))
+        self.objects[obj.name] = obj
+        self._classes.setdefault(obj.class_name, []).append(obj)
+    
+    def link(self):
+        '''
+        Sets the parent of each object and the children lists once every object is added.
+        '''
+        self._children = {}
+        for obj in self.objects.itervalues():
+            obj.parent = obj.properties.get('parent', obj._enclosing.name if obj._enclosing is not None else obj.parent)
+            obj._enclosing = None
+            if obj.parent is not None:
+                self._children.setdefault(obj.parent, []).append(obj)
+
+
+######################################################################
+# FUNCTIONS
+######################################################################
+
+def parse_glm(filename):
+    '''
+    Returns the GlmIndex of the .glm file, parsed in one pass.
+    '''
+    index = GlmIndex(filename)
+    
+    #the open blocks: a GlmObject, or the first word of any other block (e.g., 'module', 'clock', 'schedule')
+    _blocks = []
+    _statement = []
+    _offset = 0
+    _objects = 0
+    
+    with open(filename, 'rb') as f:
+        for _line_number, _line in enumerate(f, 1):
+            _line_offset = _offset
+            _offset += len(_line)
+            
+            _text = _line.strip()
+            if len(_text) == 0 or _text.startswith('//'):
+                continue
+            if _text.startswith('#'):
+                if _text.startswith('#include'):
+                    index.includes.append(_text[len('#include'):].strip().strip('"\'<>'))
+                elif _text.startswith('#insert'):
+                    index.unresolved.append(_line_number)
+                continue
+            if '${' in _text:
+                index.unresolved.append(_line_number)
+            
+            #most lines are a single 'property value;' of an object
+            if (len(_statement) == 0 and len(_blocks) > 0 and _text[-1] == ';' and isinstance(_blocks[-1], GlmObject) 
+                and _SIMPLE.match(_text)):
+                _set_property(_blocks[-1], [_text[:-1]])
+                continue
+            
+            for _token in _TOKEN.findall(_line):
+                if _token[0] in '"\'$':
+                    _statement.append(_token)
+                    continue
+                if '//' in _token:
+                    _statement.append(_token[:_token.index('//')])
+                    break
+                
+                if _token == '{':
+                    _header = ''.join(_statement).strip()
+                    _statement = []
+                    _match = _OBJECT.match(_header)
+                    if _match:
+                        if _match.group(2) is not None and '..' in _match.group(2):
+                            index.unresolved.append(_line_number)
+                        _enclosing = _blocks[-1] if len(_blocks) > 0 and isinstance(_blocks[-1], GlmObject) else None
+                        _blocks.append(GlmObject(_match.group(1), _match.group(2) or str(_objects), _line_number, _line_offset, _enclosing))
+                        _objects += 1
+                    else:
+                        _words = _header.split()
+                        if len(_words) > 1 and _words[0] == 'module' and _words[1] not in index.modules:
+                            index.modules.append(_words[1])
+                        _blocks.append(_words[0] if len(_words) > 0 else '')
+                elif _token == '}':
+                    if len(_blocks) == 0:
+                        raise Exception('%s: unmatched } on line %d' % (filename, _line_number))
+                    _block = _blocks.pop()
+                    if isinstance(_block, GlmObject):
+                        _set_property(_block, _statement)
+                        index.add(_block)
+                    _statement = []
+                elif _token == ';':
+                    _words = ''.join(_statement).split()
+                    if len(_blocks) > 0 and isinstance(_blocks[-1], GlmObject):
+                        _set_property(_blocks[-1], _statement)
+                    elif len(_blocks) == 0 and len(_words) > 1 and _words[0] == 'module' and _words[1] not in index.modules:
+                        index.modules.append(_words[1])
+                    _statement = []
+                else:
+                    _statement.append(_token)
+    
+    if len(_blocks) > 0:
+        raise Exception('%s: unterminated block %s' % (filename, _blocks[-1]))
+    
+    index.link()
+    return index
+
+def _set_property(obj,statement):
+    '''
+    Sets the property of the statement 'property value' (the tokens before the ';') of obj
+    '''
+    _text = ''.join(statement).strip()
+    if len(_text) == 0:
+        return
+    _words = _text.split(None, 1)
+    _prop = _words[0]
+    _value = _words[1].strip() if len(_words) > 1 else ''
+    if len(_value) > 1 and _value[0] == _value[-1] and _value[0] in '"\'':
+        _value = _value[1:-1]
+    
+    obj.properties[_prop] = _value
+    if _prop == 'name':
+        obj.name = _value
+
+def glm_index(filename,cache=True):
+    '''
+    Returns the GlmIndex of the .glm file.  If cache is True, the index is pickled to filename + INDEX_EXTENSION,
+    and later calls load it (while the size and mtime of the .glm file are unchanged) instead of parsing the file.
+    '''
+    if not cache:
+        return parse_glm(filename)
+    
+    _stat = os.stat(filename)
+    _key = (_INDEX_VERSION, _stat.st_size, _stat.st_mtime)
+    _path = filename + INDEX_EXTENSION
+    try:
+        with open(_path, 'rb') as f:
+            if pickle.load(f) == _key:
+                index = pickle.load(f)
+                index.filename = filename
+                return index
+    except Exception:
+        #missing, out of date or unreadable
+        pass
+    
+    index = parse_glm(filename)
+    
+    _tmp = '%s.%d.tmp' % (_path, os.getpid())
+    try:
+        with open(_tmp, 'wb') as f:
+            pickle.dump(_key, f, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(index, f, pickle.HIGHEST_PROTOCOL)
+        os.rename(_tmp, _path)
+    except Exception as e:
+        logging.warning('Could not write the .glm index {}, because {}.'.format(_path, e))
+        if os.path.exists(_tmp):
+            os.remove(_tmp)
+    return index
+
+def glm_schedules(filename):
+    '''
+    Returns an OrderedDict of the schedules (name: Schedule) defined in the .glm file.
+    '''
+    with open(filename, 'r') as f:
+        return glm_to_schedules(f.read())
+
+
 
 if __name__ == '__main__':
     fname = '..\\..\\..\\data\\Bus\\resources\\schedules.glm'
\ No newline at end of file
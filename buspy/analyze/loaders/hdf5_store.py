@@ -0,0 +1,239 @@
+'''
+[LICENSE]
+Copyright (c) 2015, Alliance for Sustainable Energy.
+All rights reserved.
+
+Redistribution and use in source and binary forms, 
+with or without modification, are permitted provided 
+that the following conditions are met:
+
+1. Redistributions of source code must retain the above 
+copyright notice, this list of conditions and the 
+following disclaimer.
+
+2. Redistributions in binary form must reproduce the 
+above copyright notice, this list of conditions and the 
+following disclaimer in the documentation and/or other 
+materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the 
+names of its contributors may be used to endorse or 
+promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND 
+CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, 
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF 
+MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR 
+CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, 
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) 
+HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE 
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+If you use this work or its derivatives for research publications, please cite:
+Timothy M. Hansen, Bryan Palmintier, Siddharth Suryanarayanan, 
+Anthony A. Maciejewski, and Howard Jay Siegel, "Bus.py: A GridLAB-D 
+Communication Interface for Smart Distribution Grid Simulations," 
+in IEEE PES General Meeting 2015, Denver, CO, July 2015, 5 pages.
+[/LICENSE]
+Created on Oct 19, 2026
+
+@author: Tim Hansen
+
+hdf5_store.py
+
+Time series stores in HDF5 files, e.g., the inputs of many FileBus objects in one compressed file instead of 
+thousands of .player files.  A store dataset is a (time x column) array of real or complex values with a 'columns'
+attribute of column labels, next to a 'time' dataset (int64 nanoseconds since the epoch, sorted) in the same group.
+The 'outputs' and 'inputs' of a RecordingBus file are store datasets.
+
+The values are read in time slices aligned to the HDF5 chunks as the times looked up advance, and each slice (all 
+columns) is shared by the columns of the dataset.
+
+Classes:
+    H5Store(filename)                - an open store file; dataset_column(dataset,column) returns an H5Column
+    H5Column                         - column[time] returns the value at the latest time <= time
+
+Functions:
+    frame_to_h5(frame,filename,dataset) - writes a pandas.DataFrame indexed by time as a (compressed) store dataset
+
+Requirements:
+    h5py
+    numpy
+    pandas
+    
+To-Do List:
+
+'''
+
+######################################################################
+# IMPORTS
+######################################################################
+
+import posixpath
+import h5py
+import numpy as np
+import pandas as pd
+from buspy.analyze.timeseries import to_i8
+
+
+######################################################################
+# CONSTANTS
+######################################################################
+
+TIME_DATASET = 'time'
+COLUMNS_ATTR = 'columns'
+
+#the rows read at once are the multiple of the chunk rows closest to (at least) SLICE_ROWS
+SLICE_ROWS = 4096
+
+#frame_to_h5 chunks hold about CHUNK_BYTES
+CHUNK_BYTES = 1 << 20
+
+
+######################################################################
+# CLASSES
+######################################################################
+
+class H5Store(object):
+    '''
+    An HDF5 store file opened read-only.  The time and the last slice read of each dataset are kept in memory.
+    '''
+    def __init__(self,filename):
+        self.filename = filename
+        self._file = h5py.File(filename, 'r')
+        
+        #dataset name: [time, columns, slice rows, (first row, last row + 1, values) of the last slice read]
+        self._datasets = {}
+    
+    def dataset_column(self,dataset,column=None):
+        '''
+        Returns an H5Column of column (a label of the 'columns' attribute) of dataset.  column may be None if the 
+        dataset has a single column.  Throws an Exception if there is no such dataset or column.
+        '''
+        _info = self._dataset(dataset)
+        _columns = _info[1]
+        if column is None and len(_columns) == 1:
+            column = _columns[0]
+        if column not in _columns:
+            raise Exception('No column %s in %s:%s (columns: %s)' % (column, self.filename, dataset, 
+                                ', '.join(_columns[:10]) + (', ...' if len(_columns) > 10 else '')))
+        return H5Column(self, dataset, _columns.index(column), _info[0])
+    
+    def close(self):
+        self._datasets = {}
+        self._file.close()
+    
+    def read_slice(self,dataset,row):
+        '''
+        Returns the first row, last row + 1 and values (all columns) of the chunk-aligned slice of dataset holding row.
+        '''
+        _info = self._datasets[dataset]
+        _start, _stop, _values = _info[3]
+        if not _start <= row < _stop:
+            _ds = self._file[dataset]
+            _start = row - row % _info[2]
+            _stop = min(_start + _info[2], _ds.shape[0])
+            _values = _ds[_start:_stop]
+            if _values.ndim == 1:
+                _values = _values[:,np.newaxis]
+            _values = _values.astype(complex)
+            _info[3] = (_start, _stop, _values)
+        return _start, _stop, _values
+    
+    def _dataset(self,dataset):
+        _info = self._datasets.get(dataset)
+        if _info is None:
+            if dataset not in self._file:
+                raise Exception('No dataset %s in %s' % (dataset, self.filename))
+            _ds = self._file[dataset]
+            _time = self._file[posixpath.join(posixpath.dirname(_ds.name), TIME_DATASET)][()].astype(np.int64)
+            if len(_time) != _ds.shape[0]:
+                raise Exception('%s:%s has %d rows and %d times' % (self.filename, dataset, _ds.shape[0], len(_time)))
+            
+            if COLUMNS_ATTR in _ds.attrs:
+                _columns = [col.decode('utf-8') if isinstance(col, bytes) else str(col) for col in _ds.attrs[COLUMNS_ATTR]]
+            else:
+                _columns = [str(i) for i in range(_ds.shape[1] if _ds.ndim > 1 else 1)]
+            
+            _chunk_rows = _ds.chunks[0] if _ds.chunks else 1
+            _rows = _chunk_rows * max(1, int(np.ceil(float(SLICE_ROWS) / _chunk_rows)))
+            
+            _info = self._datasets[dataset] = [_time, _columns, _rows, (0, 0, None)]
+        return _info
+
+class H5Column(object):
+    '''
+    A column of an H5Store dataset.  column[time] returns the value at the latest time <= time, like TimeSeries, and
+    throws an IndexError if time is before the first time.  Times are looked up forward from the last one.
+    '''
+    def __init__(self,store,dataset,index,time):
+        self.store = store
+        self.dataset = dataset
+        self.index = index
+        self.time = time
+        
+        self._k = 0
+        self._slice = (0, 0, None)
+    
+    def __len__(self):
+        return len(self.time)
+    
+    def __getitem__(self,index):
+        _t = to_i8(index)
+        _k = self._k
+        _n = len(self.time)
+        
+        #the next row is the most likely, else binary search
+        if _k < _n and self.time[_k] <= _t:
+            if _k + 1 < _n and self.time[_k + 1] <= _t:
+                _k += 1
+                if _k + 1 < _n and self.time[_k + 1] <= _t:
+                    _k = int(np.searchsorted(self.time, _t, side='right')) - 1
+        else:
+            _k = int(np.searchsorted(self.time, _t, side='right')) - 1
+            if _k < 0:
+                raise IndexError('index out of bounds')
+        self._k = _k
+        
+        _start, _stop, _values = self._slice
+        if not _start <= _k < _stop:
+            _start, _stop, _values = self.store.read_slice(self.dataset, _k)
+            _values = _values[:,self.index]
+            self._slice = (_start, _stop, _values)
+        return _values[_k - _start]
+
+
+######################################################################
+# FUNCTIONS
+######################################################################
+
+def frame_to_h5(frame,filename,dataset,mode='a',compression='gzip'):
+    '''
+    Writes frame (a pandas.DataFrame indexed by time) as the store dataset of filename (e.g., 'feeder_1/loads', 
+    with the times in 'feeder_1/time').  The values are complex if any column is.  Datasets of the same group must 
+    have the same times.
+    '''
+    _index = pd.DatetimeIndex(frame.index)
+    _values = np.asarray(frame.values)
+    if _values.dtype.kind != 'c':
+        _values = _values.astype(float)
+    
+    _chunk_rows = max(1, min(len(_index), CHUNK_BYTES // (_values.itemsize * max(1, _values.shape[1]))))
+    
+    with h5py.File(filename, mode) as f:
+        _time = posixpath.join(posixpath.dirname(dataset), TIME_DATASET)
+        if _time in f:
+            if not np.array_equal(f[_time][()], _index.asi8):
+                raise Exception('The times of %s differ from %s:%s' % (dataset, filename, _time))
+        else:
+            f.create_dataset(_time, data=_index.asi8)
+        if dataset in f:
+            del f[dataset]
+        _ds = f.create_dataset(dataset, data=_values, chunks=(_chunk_rows, _values.shape[1]), compression=compression)
+        _ds.attrs[COLUMNS_ATTR] = np.array([str(col).encode('utf-8') for col in frame.columns])
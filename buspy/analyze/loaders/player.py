@@ -51,6 +51,8 @@ Load a GridLAB-D player file into Python memory.
 
 Functions:
     player_to_timeseries(filename) - takes a .player file and returns a cpest.analyze.data.timeseries.TimeSeries
+    load_player(filename)          - same, through a memory-mapped binary sidecar file (filename + SIDECAR_EXTENSION)
+    iter_player_chunks(filename)   - parses a .player file rows lines at a time (e.g., for a StreamingTimeSeries)
 
 Requirements:
     pandas
@@ -63,8 +65,16 @@ To-Do List:
 # IMPORTS
 ######################################################################
 
+import csv
+import itertools
+import logging
+import os
+import re
+import struct
+import numpy as np
 import pandas as pd
 from datetime import timedelta
+from StringIO import StringIO
 from buspy.analyze.timeseries import TimeSeries
 
 
@@ -72,6 +82,15 @@ from buspy.analyze.timeseries import TimeSeries
 # CONSTANTS
 ######################################################################
 
+#the characters _split_line strips from the end of each line
+_TRAILING = re.compile(r'[\r;,]+$', re.M)
+
+#sidecar: header (magic, player size, player mtime, rows, time zone), int64 ns times, complex128 values
+SIDECAR_EXTENSION = '.bin'
+_SIDECAR_MAGIC = 'BUSPYPL1'
+_SIDECAR_HEADER = struct.Struct('<8sqdq64s')
+_SIDECAR_OFFSET = 128
+
 
 ######################################################################
 # UTILITY FUNCTIONS
@@ -135,6 +154,170 @@ def _player_line_to_key_value(line,cur_time):
 def player_to_timeseries(filename):
     '''
     Takes a .player file and returns a cpest.analyze.data.timeseries.TimeSeries
+    
+    The whole file is parsed at once with the pandas C parser.  Each distinct time string (e.g., '+15m') is only
+    parsed once, the absolute times are parsed with one pd.to_datetime call, each relative time is the latest 
+    absolute time plus the cumulative sum of the deltas since, and the values are converted as one array.  Falls 
+    back to the line by line loader if the absolute times do not parse into a single DatetimeIndex (e.g., mixed 
+    time zones).
+    '''
+    with open(filename, 'r') as f:
+        _parsed = _parse_player(f.read(), filename)
+    if _parsed is None:
+        return _player_to_timeseries_by_line(filename)
+    
+    _i8, _values, _tz = _parsed
+    _index = pd.DatetimeIndex(_i8)
+    if _tz is not None:
+        _index = _index.tz_localize('UTC').tz_convert(_tz)
+    
+    return TimeSeries(_values, index=_index)
+
+def iter_player_chunks(filename, rows):
+    '''
+    Parses the .player file rows lines at a time (see player_to_timeseries).  Yields the times (int64 ns, UTC if 
+    the file has a time zone), complex values and time zone of each chunk.  Throws an Exception if the times do not
+    parse into a single time zone.
+    '''
+    _start = None
+    with open(filename, 'r') as f:
+        while True:
+            _lines = list(itertools.islice(f, rows))
+            if len(_lines) == 0:
+                break
+            _parsed = _parse_player(''.join(_lines), filename, _start)
+            if _parsed is None:
+                raise Exception('Cannot read %s in chunks: the times are not in a single time zone' % filename)
+            if len(_parsed[0]) > 0:
+                _start = _parsed[0][-1]
+                yield _parsed
+
+def _parse_player(data, filename, start=None):
+    '''
+    Returns the times (int64 ns), complex values and time zone of the player file contents data, or None if the 
+    absolute times do not parse into a single DatetimeIndex.  start is the time (int64 ns) of the line before data,
+    which the relative times at the beginning of data are added to (e.g., the previous chunk of a file).
+    '''
+    data = _TRAILING.sub('', data)
+    if len(data.strip()) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=complex), None
+    
+    _frame = pd.read_csv(StringIO(data), header=None, names=['time','value'], dtype=str, na_filter=False, 
+                         engine='c', quoting=csv.QUOTE_NONE)
+    if data.count(',') != len(_frame):
+        raise Exception('Every line of %s should be time,value' % filename)
+    
+    #parse each distinct time string once
+    _codes, _times = pd.factorize(_frame['time'].values)
+    _times = [t.strip() for t in _times]
+    if '' in _times:
+        raise Exception('Missing time in %s' % filename)
+    _is_delta_time = np.array([_is_delta(t) for t in _times], dtype=bool)
+    
+    _abs_times = pd.to_datetime([t for t, is_delta in zip(_times, _is_delta_time) if not is_delta])
+    if not isinstance(_abs_times, pd.DatetimeIndex):
+        return None
+    
+    _time_ns = np.zeros(len(_times), dtype=np.int64)
+    _time_ns[~_is_delta_time] = _abs_times.asi8
+    for k in np.flatnonzero(_is_delta_time):
+        _d = _get_delta(_times[k])
+        _time_ns[k] = ((_d.days * 86400 + _d.seconds) * 1000000 + _d.microseconds) * 1000
+    
+    _rel = _is_delta_time[_codes]
+    _abs = np.flatnonzero(~_rel)
+    if start is None and (len(_abs) == 0 or _abs[0] != 0):
+        raise Exception('The first time in %s must be absolute' % filename)
+    
+    #each time is the latest absolute time (start before the first one) plus the deltas since
+    _delta = np.where(_rel, _time_ns[_codes], 0)
+    _group = np.cumsum(~_rel)
+    _cumsum = np.cumsum(_delta)
+    _base = np.concatenate(([start or 0], _time_ns[_codes[_abs]]))
+    _base_cumsum = np.concatenate(([0], _cumsum[_abs]))
+    _i8 = _base[_group] + (_cumsum - _base_cumsum[_group])
+    
+    return _i8, _frame['value'].values.astype(str).astype(complex), _abs_times.tz
+
+def load_player(filename, sidecar=True):
+    '''
+    Same as player_to_timeseries.  If sidecar is True, the parsed times and values are written to the binary file
+    filename + SIDECAR_EXTENSION, and later calls memory-map it (while the size and mtime of the player file are
+    unchanged) instead of parsing the player file, so processes on one node share its pages.  The mapping is copy on
+    write, so changing the values of the returned TimeSeries changes neither the sidecar nor later loads.
+    '''
+    if not sidecar:
+        return player_to_timeseries(filename)
+    
+    _stat = os.stat(filename)
+    ts = _read_sidecar(filename, _stat)
+    if ts is None:
+        ts = player_to_timeseries(filename)
+        _write_sidecar(filename, _stat, ts)
+    return ts
+
+def _read_sidecar(filename, stat):
+    '''
+    Returns the TimeSeries memory-mapped from the sidecar of filename, or None if it is missing or out of date.
+    '''
+    _path = filename + SIDECAR_EXTENSION
+    try:
+        with open(_path, 'rb') as f:
+            _magic, _size, _mtime, _n, _tz = _SIDECAR_HEADER.unpack(f.read(_SIDECAR_HEADER.size))
+    except (IOError, OSError, struct.error):
+        return None
+    
+    if _magic != _SIDECAR_MAGIC or _size != stat.st_size or _mtime != stat.st_mtime or _n == 0:
+        return None
+    
+    _times = np.memmap(_path, dtype='<i8', mode='c', offset=_SIDECAR_OFFSET, shape=(_n,))
+    _values = np.memmap(_path, dtype='<c16', mode='c', offset=_SIDECAR_OFFSET + 8 * _n, shape=(_n,))
+    
+    _index = pd.DatetimeIndex(_times.view('M8[ns]'))
+    _tz = _tz.rstrip('\0')
+    if _tz:
+        _index = _index.tz_localize('UTC').tz_convert(_tz)
+    
+    return TimeSeries(_values, index=_index)
+
+def _write_sidecar(filename, stat, ts):
+    '''
+    Writes the sidecar of filename (atomically, so several processes may load the same player file).  Skipped for
+    empty series and fixed offset time zones, and if the folder is not writable.
+    '''
+    _tz = ts.index.tz
+    _zone = getattr(_tz, 'zone', None) if _tz is not None else ''
+    if len(ts) == 0 or _zone is None or len(_zone) > 64:
+        return
+    
+    _path = filename + SIDECAR_EXTENSION
+    _tmp = '%s.%d.tmp' % (_path, os.getpid())
+    try:
+        with open(_tmp, 'wb') as f:
+            f.write(_SIDECAR_HEADER.pack(_SIDECAR_MAGIC, stat.st_size, stat.st_mtime, len(ts), str(_zone)).ljust(_SIDECAR_OFFSET, '\0'))
+            f.write(np.asarray(ts.index.asi8, dtype='<i8').tobytes())
+            f.write(np.asarray(ts.values, dtype='<c16').tobytes())
+        _replace(_tmp, _path)
+    except Exception as e:
+        logging.warning('Could not write the player sidecar {}, because {}.'.format(_path, e))
+        if os.path.exists(_tmp):
+            os.remove(_tmp)
+
+def _replace(src, dst):
+    '''
+    os.rename(src, dst), also when dst exists on Windows (where rename does not overwrite)
+    '''
+    try:
+        os.rename(src, dst)
+    except OSError:
+        if not os.path.exists(dst):
+            raise
+        os.remove(dst)
+        os.rename(src, dst)
+
+def _player_to_timeseries_by_line(filename):
+    '''
+    Line by line version of player_to_timeseries
     '''
     #the list of time:value pairs to be converted to a time series
     times = []
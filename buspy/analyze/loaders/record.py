@@ -0,0 +1,123 @@
+'''
+[LICENSE]
+Copyright (c) 2015, Alliance for Sustainable Energy.
+All rights reserved.
+
+Redistribution and use in source and binary forms, 
+with or without modification, are permitted provided 
+that the following conditions are met:
+
+1. Redistributions of source code must retain the above 
+copyright notice, this list of conditions and the 
+following disclaimer.
+
+2. Redistributions in binary form must reproduce the 
+above copyright notice, this list of conditions and the 
+following disclaimer in the documentation and/or other 
+materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the 
+names of its contributors may be used to endorse or 
+promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND 
+CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, 
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF 
+MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR 
+CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, 
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) 
+HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE 
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+If you use this work or its derivatives for research publications, please cite:
+Timothy M. Hansen, Bryan Palmintier, Siddharth Suryanarayanan, 
+Anthony A. Maciejewski, and Howard Jay Siegel, "Bus.py: A GridLAB-D 
+Communication Interface for Smart Distribution Grid Simulations," 
+in IEEE PES General Meeting 2015, Denver, CO, July 2015, 5 pages.
+[/LICENSE]
+Created on Oct 19, 2026
+
+@author: Tim Hansen
+
+record.py
+
+RecordingBus files (see buspy.bus.RecordingBus and ReplayBus).  A record file holds 'time' (int64 nanoseconds 
+since the epoch), and 'outputs' and 'inputs' (time x column complex arrays, NaN where nothing was recorded) with a 
+'columns' attribute of 'name.param' labels, i.e., two store datasets (see hdf5_store).
+
+Functions:
+    read_record(filename)         - reads a record file into 'time', 'outputs' and 'inputs' arrays
+    write_record(filename,chunks) - writes the chunks recorded by a RecordingBus
+
+Requirements:
+    h5py
+    numpy
+    pandas
+    
+To-Do List:
+
+'''
+
+######################################################################
+# IMPORTS
+######################################################################
+
+import h5py
+import numpy as np
+import pandas as pd
+from buspy.analyze.loaders.hdf5_store import TIME_DATASET
+from buspy.analyze.loaders.hdf5_store import COLUMNS_ATTR
+from buspy.bus import key_to_param
+
+######################################################################
+# FUNCTIONS
+######################################################################
+
+def read_record(filename):
+    '''
+    Reads a RecordingBus file.  Returns a dict with 'time' (int64 nanoseconds), and 'outputs' and 'inputs' dicts
+    mapping (name, param) to a complex column (NaN where nothing was recorded).
+    '''
+    with h5py.File(filename, 'r') as f:
+        ret = {'time' : f[TIME_DATASET][()]}
+        for group in ('outputs', 'inputs'):
+            _values = f[group][()]
+            ret[group] = dict((key_to_param(col.decode('utf-8') if isinstance(col, bytes) else col), _values[:,i]) 
+                              for i, col in enumerate(f[group].attrs[COLUMNS_ATTR]))
+    return ret
+
+def write_record(filename,chunks):
+    '''
+    Writes a RecordingBus file from the chunks recorded, each a tuple of (times, input columns, input values (times x
+    input columns), output columns, output values (times x output columns)).  Chunks may name different columns.
+    '''
+    _in_cols, _out_cols = [], []
+    for _, in_cols, _, out_cols, _ in chunks:
+        _in_cols.extend(col for col in in_cols if col not in _in_cols)
+        _out_cols.extend(col for col in out_cols if col not in _out_cols)
+    
+    _times = [t for chunk in chunks for t in chunk[0]]
+    _inputs = np.full((len(_times), len(_in_cols)), np.nan, dtype=complex)
+    _outputs = np.full((len(_times), len(_out_cols)), np.nan, dtype=complex)
+    
+    _row = 0
+    for times, in_cols, in_values, out_cols, out_values in chunks:
+        _rows = slice(_row, _row + len(times))
+        if len(in_cols) > 0:
+            _inputs[_rows, [_in_cols.index(col) for col in in_cols]] = in_values
+        if len(out_cols) > 0:
+            _outputs[_rows, [_out_cols.index(col) for col in out_cols]] = out_values
+        _row += len(times)
+    
+    with h5py.File(filename, 'w') as f:
+        f[TIME_DATASET] = np.asarray(pd.DatetimeIndex(_times).asi8, dtype='int64')
+        for group, cols, values in (('outputs', _out_cols, _outputs), ('inputs', _in_cols, _inputs)):
+            f[group] = values
+            f[group].attrs[COLUMNS_ATTR] = np.array([col.encode('utf-8') for col in cols], dtype='S')
+            
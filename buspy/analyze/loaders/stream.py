@@ -0,0 +1,210 @@
+'''
+[LICENSE]
+Copyright (c) 2015, Alliance for Sustainable Energy.
+All rights reserved.
+
+Redistribution and use in source and binary forms, 
+with or without modification, are permitted provided 
+that the following conditions are met:
+
+1. Redistributions of source code must retain the above 
+copyright notice, this list of conditions and the 
+following disclaimer.
+
+2. Redistributions in binary form must reproduce the 
+above copyright notice, this list of conditions and the 
+following disclaimer in the documentation and/or other 
+materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the 
+names of its contributors may be used to endorse or 
+promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND 
+CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, 
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF 
+MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR 
+CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, 
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) 
+HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE 
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+If you use this work or its derivatives for research publications, please cite:
+Timothy M. Hansen, Bryan Palmintier, Siddharth Suryanarayanan, 
+Anthony A. Maciejewski, and Howard Jay Siegel, "Bus.py: A GridLAB-D 
+Communication Interface for Smart Distribution Grid Simulations," 
+in IEEE PES General Meeting 2015, Denver, CO, July 2015, 5 pages.
+[/LICENSE]
+Created on Oct 19, 2026
+
+@author: Tim Hansen
+
+stream.py
+
+A time series read in chunks on a background thread, for files too large to load into memory (e.g., a year of 
+one-second data).  Only a window of rows around the last time looked up is kept in memory: the next chunks are 
+read ahead while the simulation runs, and the rows before the last time looked up are dropped.
+
+Classes:
+    StreamingTimeSeries(chunks) - series[time] returns the value at the latest time <= time, for non-decreasing times
+
+Requirements:
+    numpy
+    
+To-Do List:
+
+'''
+
+######################################################################
+# IMPORTS
+######################################################################
+
+import sys
+import threading
+import Queue
+import numpy as np
+from buspy.analyze.timeseries import to_i8
+
+
+######################################################################
+# CONSTANTS
+######################################################################
+
+#the number of chunks read ahead of the window
+READ_AHEAD = 2
+
+#how often (seconds) a blocked reader checks if the series was closed
+_POLL = 0.1
+
+
+######################################################################
+# CLASSES
+######################################################################
+
+class _ReadError(object):
+    '''
+    An exception raised in the reader thread, re-raised when the chunk is taken
+    '''
+    def __init__(self,exc_info):
+        self.exc_info = exc_info
+
+class StreamingTimeSeries(object):
+    '''
+    A time series read from chunks, an iterable of (times (int64 ns), values, time zone) sorted by time (e.g., 
+    buspy.analyze.loaders.player.iter_player_chunks).  The chunks are read on a background thread, at most 
+    read_ahead chunks ahead.
+    
+    series[time] returns the value at the latest time <= time, like TimeSeries, but the times looked up must not
+    decrease (the rows before the last one looked up are dropped).  Throws an IndexError if time is before the first
+    time of the series.  Call close() to stop reading.
+    '''
+    def __init__(self,chunks,read_ahead=READ_AHEAD,name=None):
+        self.name = name
+        self.tz = None
+        
+        self._queue = Queue.Queue(maxsize=read_ahead)
+        self._closed = threading.Event()
+        self._done = False
+        self._dropped = False
+        
+        #the window
+        self._times = np.empty(0, dtype=np.int64)
+        self._values = np.empty(0, dtype=complex)
+        
+        self._thread = threading.Thread(target=self._read, args=(chunks,), name='stream %s' % name)
+        self._thread.daemon = True
+        self._thread.start()
+        
+    def __getitem__(self,index):
+        _t = to_i8(index)
+        
+        while not self._done and (len(self._times) == 0 or self._times[-1] <= _t):
+            self._next_chunk(_t)
+        
+        _k = int(np.searchsorted(self._times, _t, side='right')) - 1
+        if _k < 0:
+            if self._dropped:
+                raise Exception('%s is read in chunks and cannot go back in time to %s' % (self.name, index))
+            raise IndexError('index out of bounds')
+        
+        if _k > 0:
+            self._times, self._values = self._times[_k:], self._values[_k:]
+            self._dropped = True
+        return self._values[0]
+    
+    def __len__(self):
+        '''
+        The number of rows in memory
+        '''
+        return len(self._times)
+    
+    def close(self):
+        '''
+        Stops the reader thread and frees the window
+        '''
+        self._closed.set()
+        while self._thread.is_alive():
+            try:
+                self._queue.get_nowait()
+            except Queue.Empty:
+                pass
+            self._thread.join(_POLL)
+        self._done = True
+        self._times = self._times[:0]
+        self._values = self._values[:0]
+    
+    def _next_chunk(self,t):
+        '''
+        Appends the next chunk to the window.  Only the last row of the window is kept if it is <= t.
+        '''
+        _item = self._queue.get()
+        if _item is None:
+            self._done = True
+            return
+        if isinstance(_item, _ReadError):
+            self._done = True
+            raise _item.exc_info[0], _item.exc_info[1], _item.exc_info[2]
+        
+        _times, _values, self.tz = _item
+        if len(self._times) > 0:
+            if _times[0] < self._times[-1]:
+                raise Exception('%s is read in chunks and must be sorted by time' % self.name)
+            if self._times[-1] <= t:
+                self._dropped = self._dropped or len(self._times) > 1
+                self._times, self._values = self._times[-1:], self._values[-1:]
+            _times = np.concatenate((self._times, _times))
+            _values = np.concatenate((self._values, _values))
+        self._times, self._values = _times, _values
+    
+    def _read(self,chunks):
+        '''
+        Reader thread: puts the chunks in the queue, then None (or the exception)
+        '''
+        try:
+            for _chunk in chunks:
+                if not self._put(_chunk):
+                    return
+            self._put(None)
+        except Exception:
+            self._put(_ReadError(sys.exc_info()))
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+    
+    def _put(self,item):
+        '''
+        Puts item in the queue, waiting for room.  Returns False if the series was closed.
+        '''
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=_POLL)
+                return True
+            except Queue.Full:
+                pass
+        return False
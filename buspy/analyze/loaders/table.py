@@ -0,0 +1,141 @@
+'''
+[LICENSE]
+Copyright (c) 2015, Alliance for Sustainable Energy.
+All rights reserved.
+
+Redistribution and use in source and binary forms, 
+with or without modification, are permitted provided 
+that the following conditions are met:
+
+1. Redistributions of source code must retain the above 
+copyright notice, this list of conditions and the 
+following disclaimer.
+
+2. Redistributions in binary form must reproduce the 
+above copyright notice, this list of conditions and the 
+following disclaimer in the documentation and/or other 
+materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the 
+names of its contributors may be used to endorse or 
+promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND 
+CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, 
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF 
+MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR 
+CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, 
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) 
+HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE 
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+If you use this work or its derivatives for research publications, please cite:
+Timothy M. Hansen, Bryan Palmintier, Siddharth Suryanarayanan, 
+Anthony A. Maciejewski, and Howard Jay Siegel, "Bus.py: A GridLAB-D 
+Communication Interface for Smart Distribution Grid Simulations," 
+in IEEE PES General Meeting 2015, Denver, CO, July 2015, 5 pages.
+[/LICENSE]
+Created on Oct 19, 2026
+
+@author: Tim Hansen
+
+table.py
+
+Load a columnar (wide) time series CSV file into Python memory, e.g., a load-shape library with one column per 
+load.  The first row holds the column labels and the first column the timestamps.  Values may be real or complex 
+(rectangular, e.g., '1+2j' or '1+2i', or polar '10+30d').
+
+Functions:
+    csv_to_table(filename) - takes a .csv file and returns a pandas.DataFrame of complex values indexed by time
+    table_column(table,column) - returns one column of the table as a cpest.analyze.data.timeseries.TimeSeries
+    iter_table_column_chunks(filename,column,rows) - parses one column of a .csv file rows lines at a time
+
+Requirements:
+    pandas
+    
+To-Do List:
+
+'''
+
+######################################################################
+# IMPORTS
+######################################################################
+
+import csv
+import numpy as np
+import pandas as pd
+from buspy.analyze.timeseries import TimeSeries
+
+
+######################################################################
+# UTILITY FUNCTIONS
+######################################################################
+
+def _to_complex(values):
+    '''
+    Converts one parsed column to complex.  Numbers are converted as an array, strings with complex() and, if that
+    fails, with the GridLAB-D string conversion (e.g., polar values).
+    '''
+    if values.dtype.kind in 'biufc':
+        return values.astype(complex)
+    
+    try:
+        return values.astype(str).astype(complex)
+    except (TypeError, ValueError):
+        from buspy.comm.gridlabcomm import str_to_complex
+        return np.array([str_to_complex(str(v)) for v in values], dtype=complex)
+
+def csv_to_table(filename):
+    '''
+    Takes a .csv file and returns a pandas.DataFrame of complex values indexed by time (sorted), with one column per 
+    CSV column.  The file is parsed once with the pandas C parser.
+    '''
+    _frame = pd.read_csv(filename, index_col=0, engine='c')
+    
+    _columns = [str(col).strip() for col in _frame.columns]
+    _values = np.empty((len(_frame), len(_columns)), dtype=complex)
+    for i, col in enumerate(_frame.columns):
+        _values[:,i] = _to_complex(_frame[col].values)
+    
+    _index = pd.to_datetime(_frame.index)
+    _index.name = None
+    
+    _table = pd.DataFrame(_values, index=_index, columns=_columns)
+    if not _index.is_monotonic_increasing:
+        _table = _table.sort_index(kind='mergesort')
+    return _table
+
+def table_column(table,column):
+    '''
+    Returns column of the table (from csv_to_table) as a TimeSeries.  Throws an Exception if there is no such column.
+    '''
+    _check_column(table.columns, column)
+    return TimeSeries(table[column].values, index=table.index)
+
+def iter_table_column_chunks(filename,column,rows):
+    '''
+    Parses column of the .csv file (see csv_to_table) rows lines at a time, without reading the other columns.  
+    Yields the times (int64 ns, UTC if the file has a time zone), complex values and time zone of each chunk.  The 
+    file must be sorted by time.
+    '''
+    with open(filename, 'r') as f:
+        _columns = [str(col).strip() for col in next(csv.reader(f))]
+    _check_column(_columns[1:], column)
+    
+    for _chunk in pd.read_csv(filename, usecols=[0, _columns.index(column)], index_col=0, engine='c', chunksize=rows):
+        _index = pd.to_datetime(_chunk.index)
+        yield np.asarray(_index.asi8), _to_complex(_chunk.iloc[:,0].values), _index.tz
+
+def _check_column(columns,column):
+    '''
+    Throws an Exception if column is not one of the table columns
+    '''
+    if column not in columns:
+        raise Exception('No column %s in the table (columns: %s)' % (column, ', '.join(columns[:10]) + 
+                                                                      (', ...' if len(columns) > 10 else '')))
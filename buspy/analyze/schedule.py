@@ -45,32 +45,63 @@ Created on August 6, 2014
 
 @author: Tim Hansen
 
-timeseries.py
+schedule.py
 
 Contains a GridLAB-D schedule datatype.
 
+A schedule is a list of cron-style rules, 'minute hour day-of-month month weekday value' (e.g., '* 6-9 * * 1-5 0.8'),
+where each field is *, a number, a range (a-b), a step (*/n or a-b/n), or a comma separated list of them.  Weekdays
+are 0-6 (Sunday is 0, 7 is also Sunday) and the value defaults to 1.0.  A time matching no rule is 0.0; a time
+matching several rules takes the value of the last one.
 
-Requirements:
+The rules are compiled into lookup tables once: the distinct day profiles (the value of each minute of the day), and
+the profile of each (month, day of month, weekday).  Schedule[time] is then two array indexes, and 
+Schedule[DatetimeIndex] evaluates the whole index at once.
+
+Functions:
+    glm_to_schedules(text) - returns the schedules of the GridLAB-D .glm text (schedule name { rules })
 
+Requirements:
+    numpy
+    pandas
     
 To-Do List:
-    TODO: implement the schedule (copy functionality from core/schedule.c or tape/schedule.cpp)
-    TODO: load schedule from a schedule .glm file
-    TODO: implement __getitem__ from a pd.datetime index
+
 '''
 
 ######################################################################
 # IMPORTS
 ######################################################################
 
+import re
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
 
 
+######################################################################
+# CONSTANTS
+######################################################################
+
+#(size, first value) of the minute, hour, day of month, month and weekday fields
+_FIELDS = ((60, 0), (24, 0), (31, 1), (12, 1), (7, 0))
+
+_SCHEDULE = re.compile(r'\bschedule\s+([^\s{]+)\s*\{')
+_COMMENT = re.compile(r'//[^\n]*')
+
+
 ######################################################################
 # CLASSES
 ######################################################################
 
 class Schedule(object):
+    '''
+    A GridLAB-D schedule.  Schedule[index] takes a pd.datetime (or a string that can be converted to one) and returns
+    the value, or a pd.DatetimeIndex and returns a numpy array of the values.
+    '''
+    
+    #FileBus evaluates all its simulation times at once
+    vectorized = True
     
     def __getitem__(self,index):
         #make sure the index is a pd.datetime or a string that can be converted to a pd.datetime
@@ -80,14 +111,98 @@ class Schedule(object):
                 _i = pd.to_datetime(index)
             except:
                 raise Exception('invalid index to Schedule.  Schedule[index] takes a pd.datetime, pd.DateTimeIndex, or a string that can be converted to a pd.datetime')
-            
-        #TODO: get the correct value from the time specified by _i
         
-    def __init__(self):
-        #TODO: how to instantiate
-        pass
+        if isinstance(_i,pd.DatetimeIndex):
+            _day = self._day_class[_i.month - 1, _i.day - 1, (_i.dayofweek + 1) % 7]
+            return self._profiles[_day, _i.hour * 60 + _i.minute]
+        
+        return self._profiles[self._day_class[_i.month - 1, _i.day - 1, (_i.weekday() + 1) % 7], _i.hour * 60 + _i.minute]
+        
+    def __init__(self,rules=(),name=None):
+        '''
+        rules is a list of rule strings (see the module documentation), or a string of rules separated by ';' or 
+        new lines.  Throws an Exception if a rule is invalid.
+        '''
+        self.name = name
+        if isinstance(rules, basestring):
+            rules = re.split(r'[;\n]', _COMMENT.sub('', rules))
+        self.rules = [_parse_rule(rule) for rule in rules if rule.strip()]
+        self._compile()
+    
+    def __repr__(self):
+        return 'Schedule(%s, %d rules)' % (self.name, len(self.rules))
+    
+    def _compile(self):
+        '''
+        Compiles the rules into the day profiles and the day class lookup table.
+        '''
+        #the rules that apply to each (month, day of month, weekday)
+        _days = np.zeros((12, 31, 7, len(self.rules)), dtype=bool)
+        for r, (_minutes, _hours, _mdays, _months, _wdays, _) in enumerate(self.rules):
+            _days[:,:,:,r] = _months[:,None,None] & _mdays[None,:,None] & _wdays[None,None,:]
+        
+        _signatures, _day_class = np.unique(_days.reshape(-1, len(self.rules)), axis=0, return_inverse=True)
+        self._day_class = _day_class.reshape(12, 31, 7)
+        
+        self._profiles = np.zeros((len(_signatures), 24 * 60))
+        for s, _signature in enumerate(_signatures):
+            for r in np.flatnonzero(_signature):
+                _minutes, _hours, _, _, _, _value = self.rules[r]
+                self._profiles[s, (_hours[:,None] & _minutes[None,:]).ravel()] = _value
+
 
-if __name__ == '__main__':
-    test = Schedule()
+######################################################################
+# FUNCTIONS
+######################################################################
+
+def glm_to_schedules(text):
+    '''
+    Returns an OrderedDict of the schedules (name: Schedule) of the GridLAB-D .glm text.  The rules of the blocks of
+    a schedule (e.g., 'weekday { ... }') are all part of the schedule.
+    '''
+    text = _COMMENT.sub('', text)
+    ret = OrderedDict()
+    for match in _SCHEDULE.finditer(text):
+        _depth, _end = 1, match.end()
+        while _depth > 0:
+            if _end >= len(text):
+                raise Exception('Unterminated schedule %s' % match.group(1))
+            _depth += {'{' : 1, '}' : -1}.get(text[_end], 0)
+            _end += 1
+        _body = re.sub(r'[^\s{};]+\s*\{|[{}]', ';', text[match.end():_end - 1])
+        ret[match.group(1)] = Schedule(_body, name=match.group(1))
+    return ret
+
+def _parse_rule(rule):
+    '''
+    Returns the minute, hour, day of month, month and weekday masks and the value of the rule string.
+    '''
+    _fields = rule.split()
+    if len(_fields) == 5:
+        _fields.append('1.0')
+    if len(_fields) != 6:
+        raise Exception('Invalid schedule rule (minute hour day month weekday value): %s' % rule.strip())
+    
+    _masks = []
+    for _field, (_size, _first) in zip(_fields[:5], _FIELDS):
+        _mask = np.zeros(_size + (1 if _size == 7 else 0), dtype=bool)
+        for _item in _field.split(','):
+            _range, _, _step = _item.partition('/')
+            if _range == '*':
+                _start, _stop = _first, _first + len(_mask) - 1
+            else:
+                _start, _, _stop = _range.partition('-')
+                try:
+                    _start, _stop = int(_start), int(_stop or _start)
+                except ValueError:
+                    raise Exception('Invalid schedule rule field %s: %s' % (_field, rule.strip()))
+            if not _first <= _start <= _stop < _first + len(_mask):
+                raise Exception('Schedule rule field %s out of range: %s' % (_field, rule.strip()))
+            _mask[_start - _first:_stop - _first + 1:int(_step or 1)] = True
+        
+        #Sunday is 0 or 7
+        if _size == 7:
+            _mask = _mask[:7] | np.append(_mask[7], np.zeros(6, dtype=bool))
+        _masks.append(_mask)
     
-    
\ No newline at end of file
+    return tuple(_masks) + (float(_fields[5]),)
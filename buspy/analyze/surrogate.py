@@ -0,0 +1,139 @@
+'''
+[LICENSE]
+Copyright (c) 2015, Alliance for Sustainable Energy.
+All rights reserved.
+
+Redistribution and use in source and binary forms, 
+with or without modification, are permitted provided 
+that the following conditions are met:
+
+1. Redistributions of source code must retain the above 
+copyright notice, this list of conditions and the 
+following disclaimer.
+
+2. Redistributions in binary form must reproduce the 
+above copyright notice, this list of conditions and the 
+following disclaimer in the documentation and/or other 
+materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the 
+names of its contributors may be used to endorse or 
+promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND 
+CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, 
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF 
+MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR 
+CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, 
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) 
+HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE 
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+If you use this work or its derivatives for research publications, please cite:
+Timothy M. Hansen, Bryan Palmintier, Siddharth Suryanarayanan, 
+Anthony A. Maciejewski, and Howard Jay Siegel, "Bus.py: A GridLAB-D 
+Communication Interface for Smart Distribution Grid Simulations," 
+in IEEE PES General Meeting 2015, Denver, CO, July 2015, 5 pages.
+[/LICENSE]
+Created on Oct 19, 2026
+
+@author: Tim Hansen
+
+surrogate.py
+
+Least squares surrogate models of a bus (see buspy.bus.SurrogateBus): fit_surrogate fits a model to
+recorded inputs and outputs, and surrogate_design builds the features the model is evaluated on.
+'''
+
+######################################################################
+# IMPORTS
+######################################################################
+
+import math
+import itertools
+
+#numpy is imported on first use (see buspy.utils.lazy)
+from buspy.utils.lazy import lazy_import
+np = lazy_import('numpy')
+
+######################################################################
+# UTILITY FUNCTIONS
+######################################################################
+
+def fit_surrogate(inputs_frame,outputs_frame,degree=2,harmonics=2):
+    '''
+    Least squares fit of the outputs_frame columns to the inputs_frame columns (both indexed by the same times, e.g.,
+    recorded with SurrogateBus.fit).  The real and imaginary part of each input are standardized and expanded into
+    every polynomial term up to degree, and sin/cos time-of-day terms up to harmonics are added.
+    
+    Returns the model as a JSON-serializable dict (see SurrogateBus), including its fit error on the training data.
+    '''
+    if len(inputs_frame) != len(outputs_frame) or len(inputs_frame) == 0:
+        raise Exception('fit_surrogate requires the same (non-zero) number of input and output rows')
+    
+    _x = _complex_components(inputs_frame.values)
+    _y = np.asarray(outputs_frame.values, dtype=complex)
+    
+    _mean = _x.mean(axis=0)
+    _scale = _x.std(axis=0)
+    _scale[_scale == 0] = 1.0
+    
+    _terms = [list(term) for d in range(1, degree + 1) for term in itertools.combinations_with_replacement(range(_x.shape[1]), d)]
+    _design = surrogate_design((_x - _mean) / _scale, _seconds_of_day(inputs_frame.index), _terms, harmonics)
+    
+    _n = _y.shape[1]
+    _coef = np.linalg.lstsq(_design, np.hstack((_y.real, _y.imag)), rcond=None)[0]
+    _fit = _design.dot(_coef)
+    _res = np.abs(_y - (_fit[:,:_n] + 1j * _fit[:,_n:]))
+    _tot = np.sum(np.abs(_y - _y.mean(axis=0))**2, axis=0)
+    
+    _outputs = [str(col) for col in outputs_frame.columns]
+    return {'inputs'        : [str(col) for col in inputs_frame.columns],
+            'outputs'       : _outputs,
+            'degree'        : degree,
+            'harmonics'     : harmonics,
+            'terms'         : _terms,
+            'mean'          : _mean.tolist(),
+            'scale'         : _scale.tolist(),
+            'envelope_min'  : _x.min(axis=0).tolist(),
+            'envelope_max'  : _x.max(axis=0).tolist(),
+            'coefficients'  : _coef.tolist(),
+            'fit_error'     : {'samples'  : len(_y),
+                               'rmse'     : dict(zip(_outputs, np.sqrt(np.mean(_res**2, axis=0)).tolist())),
+                               'max_error': dict(zip(_outputs, _res.max(axis=0).tolist())),
+                               'r2'       : dict(zip(_outputs, [1.0 - r / t if t > 0 else float(r == 0)
+                                                                for r, t in zip(np.sum(_res**2, axis=0), _tot)]))}}
+
+def _complex_components(values):
+    '''
+    (rows x n) complex values -> (rows x 2n) real array of the real and imaginary part of each column
+    '''
+    values = np.asarray(values, dtype=complex)
+    _x = np.empty(values.shape[:-1] + (2 * values.shape[-1],))
+    _x[...,0::2] = values.real
+    _x[...,1::2] = values.imag
+    return _x
+
+def _seconds_of_day(times):
+    '''
+    Seconds since midnight of a DatetimeIndex
+    '''
+    return np.asarray(times.hour * 3600 + times.minute * 60 + times.second, dtype=float)
+
+def surrogate_design(z,seconds,terms,harmonics):
+    '''
+    Surrogate model features of the standardized input components z (rows x components): an intercept, each
+    polynomial term (a list of the component indices multiplied together), and the time-of-day harmonics.
+    '''
+    z = np.atleast_2d(z)
+    _tod = 2.0 * math.pi * np.atleast_1d(seconds)[:,None] / 86400.0
+    _h = np.arange(1, harmonics + 1)
+    return np.hstack([np.ones((z.shape[0], 1))] + 
+                     [np.prod(z[:,term], axis=1)[:,None] for term in terms] +
+                     [np.sin(_tod * _h), np.cos(_tod * _h)])
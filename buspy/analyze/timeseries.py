@@ -55,6 +55,9 @@ Assumptions:
     - if a datetime is used as an index, will choose the closest value with a time <= index
     - if an int is used as an index, will choose the value at the absolute index
 
+Time lookups search the int64 (nanosecond) index with numpy.searchsorted, starting from the position of the
+previous lookup (the cursor), so stepping forward through the series (e.g., FileBus) is O(1) per lookup.
+
 Requirements:
     pandas
     
@@ -66,7 +69,35 @@ To-Do List:
 # IMPORTS
 ######################################################################
 
+import numpy as np
 import pandas as pd
+from datetime import datetime
+
+
+######################################################################
+# CONSTANTS
+######################################################################
+
+_EPOCH = datetime(1970, 1, 1)
+
+#rows checked after the cursor before falling back to a binary search
+CURSOR_SCAN = 4
+
+
+######################################################################
+# UTILITY FUNCTIONS
+######################################################################
+
+def to_i8(t):
+    '''
+    Nanoseconds since the epoch of a datetime-like (datetime, pandas.Timestamp, numpy.datetime64 or string)
+    '''
+    if type(t) is datetime and t.tzinfo is None:
+        _d = t - _EPOCH
+        return ((_d.days * 86400 + _d.seconds) * 1000000 + _d.microseconds) * 1000
+    if isinstance(t, pd.Timestamp):
+        return t.value
+    return pd.Timestamp(t).value
 
 
 ######################################################################
@@ -75,18 +106,40 @@ import pandas as pd
 
 class TimeSeries(pd.Series):
     def __getitem__(self,index):
-        #try the normal pd.Series[index] get
+        #if an int, return the value at the absolute index
+        if isinstance(index,(int,long,np.integer)) and not isinstance(index,bool):
+            return self.values[index]
+        
+        #slices, lists, masks, etc.
+        if not isinstance(index,(datetime,np.datetime64,basestring)):
+            return super(TimeSeries,self).__getitem__(index)
+        
+        #get closest time <= index
+        return self.values[self.position(index)]
+    
+    def position(self,index):
+        '''
+        Returns the position of the closest time <= index (a datetime-like).  Throws an IndexError if index is before
+        the first time.
+        '''
         try:
-            return super.__get__(index)
+            _i8, _k = self.__dict__['_ts_lookup']
+        except KeyError:
+            _i8, _k = np.asarray(self.index.asi8), 0
+        _t = to_i8(index)
+        _n = len(_i8)
+        
+        #scan forward a few rows from the last position, else binary search
+        if _k < _n and _i8[_k] <= _t:
+            _stop = min(_k + CURSOR_SCAN, _n)
+            while _k + 1 < _stop and _i8[_k + 1] <= _t:
+                _k += 1
+            if _k + 1 < _n and _i8[_k + 1] <= _t:
+                _k = _k + int(np.searchsorted(_i8[_k:], _t, side='right')) - 1
+        else:
+            _k = int(np.searchsorted(_i8, _t, side='right')) - 1
+            if _k < 0:
+                raise IndexError('index out of bounds')
         
-        #if it didn't work, assume that it is either a non-exact time or an integer
-        except:
-            #if not an int, get closest time <= index
-            if not isinstance(index,int):
-                _temp = self.truncate(after=index)
-                return _temp[len(_temp)-1]
-            
-            #if an int, return the value at the absolute index
-            else:
-                return self[self._data.items[index]]
-            
\ No newline at end of file
+        self.__dict__['_ts_lookup'] = (_i8, _k)
+        return _k
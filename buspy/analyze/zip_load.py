@@ -0,0 +1,85 @@
+'''
+[LICENSE]
+Copyright (c) 2015, Alliance for Sustainable Energy.
+All rights reserved.
+
+Redistribution and use in source and binary forms, 
+with or without modification, are permitted provided 
+that the following conditions are met:
+
+1. Redistributions of source code must retain the above 
+copyright notice, this list of conditions and the 
+following disclaimer.
+
+2. Redistributions in binary form must reproduce the 
+above copyright notice, this list of conditions and the 
+following disclaimer in the documentation and/or other 
+materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the 
+names of its contributors may be used to endorse or 
+promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND 
+CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, 
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF 
+MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR 
+CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, 
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) 
+HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE 
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+If you use this work or its derivatives for research publications, please cite:
+Timothy M. Hansen, Bryan Palmintier, Siddharth Suryanarayanan, 
+Anthony A. Maciejewski, and Howard Jay Siegel, "Bus.py: A GridLAB-D 
+Communication Interface for Smart Distribution Grid Simulations," 
+in IEEE PES General Meeting 2015, Denver, CO, July 2015, 5 pages.
+[/LICENSE]
+Created on Oct 19, 2026
+
+@author: Tim Hansen
+
+zip_load.py
+
+ZIP (constant impedance, current and power) load model used by buspy.bus.ResistorBus.
+'''
+
+######################################################################
+# IMPORTS
+######################################################################
+
+#numpy is imported on first use (see buspy.utils.lazy)
+from buspy.utils.lazy import lazy_import
+np = lazy_import('numpy')
+
+######################################################################
+# UTILITY FUNCTIONS
+######################################################################
+
+def zip_load_power(voltage,nominal_voltage,base_power,zip_coefficients):
+    '''
+    Complex power (VA) of ZIP loads: base_power * (Z*(|V|/Vn)^2 + I*(|V|/Vn) + P), where Z, I and P are the complex
+    (fraction times power factor) coefficients.  All arguments are numpy arrays that broadcast together.
+    
+    Parameters:
+        voltage          - complex voltage (V)
+        nominal_voltage  - nominal voltage magnitude (V)
+        base_power       - apparent power at the nominal voltage (VA)
+        zip_coefficients - (z, i, p) complex coefficients (see zip_coefficient)
+    '''
+    _z, _i, _p = zip_coefficients
+    _v = np.abs(voltage) / nominal_voltage
+    return base_power * ((_z * _v + _i) * _v + _p)
+
+def zip_coefficient(fraction,pf):
+    '''
+    Complex ZIP coefficient of a fraction of the load at the power factor pf (negative pf is leading, as in GridLAB-D).
+    '''
+    pf = np.asarray(pf, dtype=float)
+    return fraction * (np.abs(pf) + 1j * np.where(pf < 0, -1.0, 1.0) * np.sqrt(1.0 - np.square(pf)))
@@ -64,8 +64,12 @@ Bus Implementations:
     GridlabBus     - GridLAB-D bus interface
     FileBus        - file-based bus interface 
     ConstantBus    - constant bus interface 
-    ResistorBus    - resistance-based bus interface (NOT YET FULLY IMPLEMENTED)
+    ResistorBus    - algebraic (ZIP) load bus interface
+    SurrogateBus   - fitted (least squares) model of another bus
+    ReplayBus      - serves the outputs recorded by a RecordingBus
     MultiNodeBus   - substation-like bus interface
+    CachedBus      - wraps any Bus to reuse its transaction results across runs (see transaction_cache)
+    RecordingBus   - wraps any Bus to record its inputs and outputs to HDF5 (see record_file)
     
 Usage:
     #Option #1
@@ -84,11 +88,18 @@ Usage:
         out = bus.transaction(in_packet)
 
 
+    #Option #3 (all inputs are known ahead of time, e.g., a voltage schedule)
+    from bus import open_bus
+
+    with open_bus(json_filename) as bus:
+        out_frame = bus.run(inputs_frame)
+
+
 Requirements:
     
     
 To-Do List:
-    TODO: implement a resistance-based version of the interface
+    
 '''
 
 ######################################################################
@@ -101,14 +112,27 @@ from buspy.construct.bus_params import GridlabBusParams
 from buspy.construct.bus_params import FileBusParams
 from buspy.construct.bus_params import ConstantBusParams
 from buspy.construct.bus_params import ResistorBusParams
+from buspy.construct.bus_params import SurrogateBusParams
+from buspy.construct.bus_params import ReplayBusParams
 from buspy.construct.bus_params import MultiNodeBusParams
+from buspy.construct.bus_params import BusParamsCache
 import buspy.comm.message as message
-
-from buspy.analyze.loaders.player import player_to_timeseries
+from buspy.analyze.zip_load import zip_load_power
+from buspy.analyze.zip_load import zip_coefficient
+from buspy.analyze.surrogate import fit_surrogate
+from buspy.analyze.surrogate import surrogate_design
 
 import buspy.utils.action as action
 import os
-import numpy as np
+import math
+import json
+import hashlib
+import cPickle as pickle
+
+#numpy and pandas are imported on first use (see buspy.utils.lazy)
+from buspy.utils.lazy import lazy_import
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
 
 import logging
 
@@ -119,6 +143,15 @@ from copy import deepcopy
 
 from buspy.utils.debug import DebugEmpty
 from buspy.utils.debug import DEBUG_MAP
+from buspy.utils.debug import TRACE_IO
+from buspy.utils.debug import TRACE_SEND
+from buspy.utils.debug import TRACE_RECV
+from buspy.utils.timing import TimerCollection
+from buspy.utils.timing import BlankTimerCollection
+from buspy.utils.transaction_cache import TransactionCache
+from buspy.utils.transaction_cache import quantize
+from buspy.utils.transaction_cache import frame_hash
+from buspy.utils.data_file_cache import DataFileCache
 
 import socket   #for hostname ID
 
@@ -126,15 +159,36 @@ import socket   #for hostname ID
 # CONSTANTS
 ######################################################################
 
-VOLTAGE_CONVERSION_A = np.cos(120.0 * np.pi/180.0) + np.sin(120.0 * np.pi/180.0) * 1j
+VOLTAGE_CONVERSION_A = math.cos(120.0 * math.pi/180.0) + math.sin(120.0 * math.pi/180.0) * 1j
 
-VOLTAGE_CONVERSION_A_SQUARED = np.square(VOLTAGE_CONVERSION_A)
+VOLTAGE_CONVERSION_A_SQUARED = VOLTAGE_CONVERSION_A * VOLTAGE_CONVERSION_A
 
 DEFAULT_BUS_FILENAME = 'bus.json'
 DEFAULT_BUS_DEBUG    = 'bus.debug'
 
+#number of threads BusCatalog reads the bus JSON files with
+DEFAULT_CATALOG_THREADS = 16
+
+#size limit (MB) of a CachedBus transaction_cache when the params do not set one (e.g., an inline MultiNodeBus node)
+DEFAULT_TRANSACTION_CACHE_SIZE = 512.0
+
 DEFAULT_DEBUG = DebugEmpty()
 
+#transaction phase timers (see Bus.enable_timing)
+TIMER_TRANSLATE_INPUT   = 'translate_input'
+TIMER_SPECIAL_INPUT     = 'special_input'
+TIMER_SEND              = 'send'
+TIMER_RUNTO             = 'runto'
+TIMER_POLL              = 'poll'
+TIMER_RECV              = 'recv'
+TIMER_TRANSLATE_OUTPUT  = 'translate_output'
+TIMER_ACTIONS           = 'actions'
+
+TIMER_PHASES = [TIMER_TRANSLATE_INPUT, TIMER_SPECIAL_INPUT, TIMER_SEND, TIMER_RUNTO,
+                TIMER_POLL, TIMER_RECV, TIMER_TRANSLATE_OUTPUT]
+
+DEFAULT_TIMERS = BlankTimerCollection()
+
 
 ######################################################################
 # CONSTANTS
@@ -143,6 +197,12 @@ DEFAULT_DEBUG = DebugEmpty()
 GLOBAL_DEFAULT_BUS_TYPE = None
 GLOBAL_DEFAULT_BUS_INIT = None
 
+#BusParamsCache used by BusLoader (None: parse the bus JSON every time)
+GLOBAL_CONFIG_CACHE = None
+
+#write/memory-map binary sidecars of the player files FileBus loads (see buspy.analyze.loaders.player.load_player)
+GLOBAL_PLAYER_SIDECAR = True
+
 def set_default_bus(bus_type,json_init):
     global GLOBAL_DEFAULT_BUS_TYPE 
     global GLOBAL_DEFAULT_BUS_INIT
@@ -150,16 +210,135 @@ def set_default_bus(bus_type,json_init):
     GLOBAL_DEFAULT_BUS_TYPE = bus_type
     GLOBAL_DEFAULT_BUS_INIT = json_init
 
+def set_config_cache(cache_dir):
+    '''
+    Opt in to the on-disk BusParamsCache in cache_dir for every BusLoader (None turns it off).
+    '''
+    global GLOBAL_CONFIG_CACHE
+    
+    GLOBAL_CONFIG_CACHE = BusParamsCache(cache_dir) if cache_dir is not None else None
+
+def set_player_sidecar(enabled):
+    '''
+    Turns the binary sidecar files of the FileBus player files on (the default) or off.
+    '''
+    global GLOBAL_PLAYER_SIDECAR
+    
+    GLOBAL_PLAYER_SIDECAR = enabled
+
 ######################################################################
 # UTILITY FUNCTIONS
 ######################################################################
 
+def _player_to_timeseries(filename):
+    '''
+    FileBus .player handler.  The loader (and pandas) is only imported when a FileBus reads a player file.
+    '''
+    from buspy.analyze.loaders.player import load_player
+    return load_player(filename, sidecar=GLOBAL_PLAYER_SIDECAR)
+
+def _csv_to_table(filename):
+    '''
+    FileBus .csv handler.  Returns a pandas.DataFrame; each output selects its column from it.
+    '''
+    from buspy.analyze.loaders.table import csv_to_table
+    return csv_to_table(filename)
+
+def _table_column(table,column):
+    from buspy.analyze.loaders.table import table_column
+    return table_column(table,column)
+
+def _glm_schedules(filename):
+    '''
+    FileBus .glm handler.  Returns the schedules of the file (an OrderedDict); each output selects one by name.
+    '''
+    from buspy.analyze.loaders.glm import glm_schedules
+    return glm_schedules(filename)
+
+def _glm_schedule(schedules,name):
+    if name not in schedules:
+        raise Exception('No schedule %s (schedules: %s)' % (name, ', '.join(schedules.keys()[:10]) + 
+                                                              (', ...' if len(schedules) > 10 else '')))
+    return schedules[name]
+
+def _h5_store(filename):
+    '''
+    FileBus .h5 handler.  Returns an open H5Store; each output reads its dataset column from it.
+    '''
+    from buspy.analyze.loaders.hdf5_store import H5Store
+    return H5Store(filename)
+
+def _stream_player(filename,column,rows):
+    '''
+    FileBus .player stream handler (column is ignored)
+    '''
+    from buspy.analyze.loaders.player import iter_player_chunks
+    from buspy.analyze.loaders.stream import StreamingTimeSeries
+    return StreamingTimeSeries(iter_player_chunks(filename, rows), name=filename)
+
+def _stream_csv(filename,column,rows):
+    '''
+    FileBus .csv stream handler
+    '''
+    from buspy.analyze.loaders.table import iter_table_column_chunks
+    from buspy.analyze.loaders.stream import StreamingTimeSeries
+    return StreamingTimeSeries(iter_table_column_chunks(filename, column, rows), name='%s[%s]' % (filename, column))
+
+def _to_complex(value):
+    '''
+    complex(value), or NaN if value is not a number (e.g., a string output or None)
+    '''
+    try:
+        return complex(value)
+    except (TypeError, ValueError):
+        return complex(np.nan)
+
 def positive_sequence_to_phase(pos_seq_volt):
     #NOTE: only true if the phases are balanced
     return (pos_seq_volt,pos_seq_volt*VOLTAGE_CONVERSION_A_SQUARED,pos_seq_volt*VOLTAGE_CONVERSION_A)
 
 def get_bus_from_classname(params):
-    return globals()[params[BusParams.BUS_KEY]](params)
+    bus = globals()[params[BusParams.BUS_KEY]](params)
+    if Bus._json_to_obj(params, BusParams.TRANSACTION_CACHE_KEY):
+        bus = CachedBus(bus)
+    if Bus._json_to_obj(params, BusParams.RECORD_FILE_KEY):
+        bus = RecordingBus(bus)
+    return bus
+
+def param_to_key(name,param):
+    '''
+    Column label used by Bus.run for the CommonParam name.param (just name if param is None)
+    '''
+    return str(name) if param == None else '%s.%s' % (name,param)
+
+def key_to_param(key):
+    '''
+    Inverse of param_to_key.  Takes a 'name.param' string or a (name,param) tuple and returns (name,param).
+
+    NOTE: splits on the last '.' as GridLAB-D object names may contain periods (e.g., 'R1-12.47-2_node_1')
+    '''
+    if isinstance(key,tuple):
+        return key
+
+    _split = key.rsplit('.',1)
+    if len(_split) == 2:
+        return _split[0], _split[1]
+    return key, None
+
+def _align_to_grid(frame,grid):
+    '''
+    Holds each row of frame until the next row (i.e., the value at the latest index <= grid time).
+
+    Returns the aligned frame and a boolean mask of the grid times that have a value.
+    '''
+    frame = frame.dropna(how='all')
+    frame.index = pd.to_datetime(frame.index)
+    frame = frame.sort_index()
+
+    if len(frame) == 0:
+        return frame.reindex(grid), np.zeros(len(grid),dtype=bool)
+
+    return frame.reindex(grid,method='ffill'), np.asarray(grid >= frame.index[0])
 
 def load_bus(path,fname=DEFAULT_BUS_FILENAME,debug=DEFAULT_DEBUG):
     loader = BusLoader(path, fname, path_params_to_absolute = True)
@@ -195,11 +374,14 @@ class BusLoader(object):
                  bus_dir, 
                  bus_filename = DEFAULT_BUS_FILENAME, 
                  bus_params = None,
-                 path_params_to_absolute = False):
+                 path_params_to_absolute = False,
+                 config_cache = None):
         """
         Constructor is robust to bus_dir actually being the json file
         to load. Raises a RuntimeError in the even that the bus_dir or
         the json file do not actually exist.
+        
+        config_cache is a BusParamsCache (default: the one set with set_config_cache, if any).
         """
         self.__dir = None
         self.__filename = None
@@ -207,6 +389,7 @@ class BusLoader(object):
         self.__bus_type = None
         self.__bus = None        
         self.path_params_to_absolute = path_params_to_absolute
+        self.config_cache = config_cache if config_cache is not None else GLOBAL_CONFIG_CACHE
         
         # params already loaded
         if bus_params is not None:
@@ -249,7 +432,10 @@ class BusLoader(object):
                 self.__params = GLOBAL_DEFAULT_BUS_INIT
             else:
                 try:
-                    self.__params = BusParams.load(self.json_path)
+                    if self.config_cache is not None:
+                        self.__params = self.config_cache.load(self.json_path)
+                    else:
+                        self.__params = BusParams.load(self.json_path)
                     new_bus_folder = self.__update_bus_folder() if self.path_params_to_absolute else None
                     msg = "Loaded bus from {}".format(self.json_path)
                     if new_bus_folder is not None:
@@ -275,7 +461,7 @@ class BusLoader(object):
             if self.params is None:
                 self.__bus = self.__fallback_bus()
             else:
-                self.__bus = globals()[self.params[BusParams.BUS_KEY]](self.params)
+                self.__bus = get_bus_from_classname(self.params)
         return self.__bus
         
     def __fallback_bus(self):
@@ -298,6 +484,224 @@ class BusLoader(object):
         return new_bus_folder
     
 
+class BusCatalog(object):
+    '''
+    Loads every bus JSON file under a scenario folder at once, for scenarios with thousands of
+    bus folders.
+    
+    The scenario tree is walked once, and the files (including the __bus_file children of 
+    MultiNodeBus configurations) are read and parsed by worker threads.  Files with identical 
+    contents are parsed into BusParams only once (cloned from one BusParams per class, so the schema
+    is not rebuilt for every file); each folder gets its own clone of that BusParams object.  The 
+    __bus_file children are replaced with their (cloned) BusParams, so the MultiNodeBus does not
+    parse them again.
+    
+    E.g.,:
+        catalog = BusCatalog(scenario_dir)
+        for folder in catalog:
+            bus = catalog.bus(folder)
+    '''
+    def __init__(self,
+                 root_dir,
+                 bus_filename = DEFAULT_BUS_FILENAME,
+                 path_params_to_absolute = True,
+                 threads = DEFAULT_CATALOG_THREADS):
+        self.root_dir = os.path.abspath(root_dir)
+        self.bus_filename = bus_filename
+        self.path_params_to_absolute = path_params_to_absolute
+        self.threads = threads
+        
+        #json path -> content hash (None if unreadable), content hash -> BusParams prototype (or the Exception parsing it)
+        self.__hashes = {}
+        self.__prototypes = {}
+        self.__errors = {}
+        
+        #class_name -> BusParams without values, cloned for each prototype (see BusParams.from_dict)
+        self.__blanks = {}
+        
+        #folder -> BusParams
+        self.__params = {}
+        
+        self.__load()
+    
+    def __len__(self):
+        return len(self.__params)
+    
+    def __iter__(self):
+        return iter(sorted(self.__params.keys()))
+    
+    def __contains__(self, folder):
+        return self.__key(folder) in self.__params
+    
+    @property
+    def folders(self):
+        return sorted(self.__params.keys())
+    
+    @property
+    def unique_configs(self):
+        '''
+        Number of distinct bus JSON contents that were parsed.
+        '''
+        return len(self.__prototypes)
+    
+    def params(self, folder):
+        '''
+        Returns the BusParams of the bus in folder (None if the folder has no bus JSON file).
+        '''
+        return self.__params.get(self.__key(folder), None)
+    
+    def loader(self, folder):
+        '''
+        Returns a BusLoader for folder that uses the already loaded BusParams.
+        '''
+        return BusLoader(os.path.join(self.__key(folder), self.bus_filename), 
+                         self.bus_filename, 
+                         bus_params = self.params(folder))
+    
+    def bus(self, folder):
+        '''
+        Returns the (not yet started) Bus of folder, or the fallback bus if folder has no bus JSON file.
+        '''
+        return self.loader(folder).bus
+    
+    def __key(self, folder):
+        return os.path.abspath(folder) if os.path.isabs(folder) else os.path.abspath(os.path.join(self.root_dir, folder))
+    
+    def __load(self):
+        _json_paths = []
+        for dirpath, _, filenames in os.walk(self.root_dir):
+            if self.bus_filename in filenames:
+                _json_paths.append(os.path.join(dirpath, self.bus_filename))
+        
+        self.__parse(_json_paths)
+        
+        #the __bus_file children, parsed in a second pass (they may live outside of the scanned folders)
+        self.__parse([child for path in _json_paths for child in self.__children(path)])
+        
+        for path in _json_paths:
+            try:
+                self.__params[os.path.dirname(path)] = self.__resolve(path, self.path_params_to_absolute)
+            except Exception as e:
+                logging.warning('WARNING: could not load bus (' + path + '). Exception message: ' + str(e))
+    
+    def __parse(self, paths):
+        '''
+        Reads and parses the paths that have not been parsed yet, each distinct content once, in worker threads.
+        '''
+        paths = sorted(set(p for p in paths if p not in self.__hashes))
+        if len(paths) == 0:
+            return
+        
+        from threading import Thread, Lock
+        _lock = Lock()
+        _claimed = set(self.__prototypes) | set(self.__errors)
+        
+        def _parse(path):
+            try:
+                with open(path, 'r') as f:
+                    raw = f.read()
+            except IOError as e:
+                logging.warning('WARNING: could not read bus (' + path + '). Exception message: ' + str(e))
+                self.__hashes[path] = None
+                return
+            
+            _hash = hashlib.sha1(raw).hexdigest()
+            self.__hashes[path] = _hash
+            with _lock:
+                if _hash in _claimed:
+                    return
+                _claimed.add(_hash)
+            
+            try:
+                _json = json.loads(raw)
+            except Exception as e:
+                self.__errors[_hash] = Exception('Could not load {} as a json file, because {}.'.format(path, e))
+                return
+            try:
+                self.__prototypes[_hash] = BusParams.from_dict(_json, self.__blanks)
+            except Exception as e:
+                self.__errors[_hash] = e
+        
+        def _parse_every(start, step):
+            for i in xrange(start, len(paths), step):
+                _parse(paths[i])
+        
+        #the file reads release the GIL, so the threads overlap the (shared filesystem) read latency with the 
+        #parsing, which holds it
+        _n = max(1, min(self.threads, len(paths)))
+        if _n > 1:
+            _threads = [Thread(target=_parse_every, args=(i, _n)) for i in xrange(_n)]
+            for t in _threads:
+                t.start()
+            for t in _threads:
+                t.join()
+        else:
+            _parse_every(0, 1)
+    
+    def __prototype(self, path):
+        '''
+        Returns the BusParams parsed from the contents of path, shared by every file with the same contents.
+        '''
+        #nested children that were not parsed ahead
+        if path not in self.__hashes:
+            self.__parse([path])
+        
+        _hash = self.__hashes[path]
+        if _hash is None:
+            raise Exception('Could not read ' + path)
+        if _hash in self.__errors:
+            raise self.__errors[_hash]
+        return self.__prototypes[_hash]
+    
+    def __children(self, path):
+        '''
+        Paths of the __bus_file children of the MultiNodeBus configuration in path (relative to its folder).
+        '''
+        ret = []
+        try:
+            _proto = self.__prototype(path)
+        except Exception:
+            return ret
+        
+        if isinstance(_proto, MultiNodeBusParams):
+            _folder = self.__folder(path, _proto)
+            for node in _proto[MultiNodeBusParams.NODE_KEY] or []:
+                if MultiNodeBusParams.BUS_FILE_KEY in node:
+                    ret.append(os.path.join(_folder, node[MultiNodeBusParams.BUS_FILE_KEY]))
+        return ret
+    
+    def __folder(self, path, params):
+        '''
+        The folder a bus loaded from path runs in, relative to the json file's directory.
+        '''
+        _dir = os.path.dirname(path)
+        _folder = params[BusParams.FOLDER_KEY]
+        if _folder is None or _folder == '' or _folder == '.':
+            return _dir
+        return os.path.join(_dir, _folder)
+    
+    def __resolve(self, path, to_absolute):
+        '''
+        Clones the prototype of path, with the __bus_file children replaced by their BusParams and (optionally) 
+        the folder set to an absolute path (as BusLoader does with path_params_to_absolute).
+        '''
+        params = self.__prototype(path).clone()
+        _folder = self.__folder(path, params)
+        
+        if isinstance(params, MultiNodeBusParams):
+            _nodes = []
+            for node in params[MultiNodeBusParams.NODE_KEY] or []:
+                if MultiNodeBusParams.BUS_FILE_KEY in node:
+                    node = self.__resolve(os.path.join(_folder, node[MultiNodeBusParams.BUS_FILE_KEY]), False)
+                _nodes.append(node)
+            params[MultiNodeBusParams.NODE_KEY] = _nodes
+        
+        if to_absolute:
+            params[BusParams.FOLDER_KEY] = _folder
+        
+        return params
+    
+
 
 ###############################################################
 # Bus Types
@@ -355,6 +759,13 @@ class Bus(object):
         
         self.__cwd = '.'
         
+        #phase timing, off unless requested (children of a timed MultiNodeBus are enabled by their parent)
+        self.timers      = DEFAULT_TIMERS
+        self.timing_file = None
+        if Bus._json_to_bool(json_file,BusParams.TIMING_KEY):
+            self.enable_timing()
+            self.timing_file = Bus._json_to_obj(json_file,BusParams.TIMING_FILE_KEY) or 'bus_timing.h5'
+        
         #get the BusTranslator object
         _ = self._json_to_obj(json_file, MultiNodeBusParams.BUS_TRANSLATOR_KEY)
         self.bus_translator = globals()[_](json_file) if _ != None else BusTranslator(json_file)
@@ -365,6 +776,40 @@ class Bus(object):
         '''
         pass
     
+    def enable_timing(self):
+        '''
+        enable_timing()
+        
+        Replaces the blank timers with a TimerCollection holding one timer per transaction phase.  Each
+        transaction (or Bus.run step) then appends the wall-clock seconds spent in each phase it executes.
+        '''
+        self.timers = TimerCollection()
+        for key in self._timer_phases():
+            self.timers.add_timer(key)
+        return self.timers
+    
+    def _timer_phases(self):
+        '''
+        The phase timers created by enable_timing.  May be overloaded by children.
+        '''
+        return TIMER_PHASES
+    
+    def _save_timing(self):
+        '''
+        Writes the phase timings to timing_file (relative to folder).  Called by stop_bus; does nothing unless
+        timing was requested in the bus parameters.
+        '''
+        if self.timing_file != None:
+            self._enter_folder()
+            self._write_timing(self.timing_file)
+            self._leave_folder()
+    
+    def _write_timing(self,filename,access_flag='w',group=''):
+        '''
+        Writes the phase timings under group in filename.
+        '''
+        self.timers.to_hdf5(filename, access_flag=access_flag, group=group)
+    
     def start_bus(self):
         '''
         start_bus()
@@ -420,47 +865,95 @@ class Bus(object):
         
         if (trans_state == Bus.TRANSACTION_ALL) or (trans_state == Bus.TRANSACTION_INPUTS):
             if inputs != None:
-                _trans_inputs = self.bus_translator.translate_input(inputs)
-                
+                with self.timers.timed(TIMER_TRANSLATE_INPUT):
+                    _trans_inputs = self.bus_translator.translate_input(inputs)
+
                 #check for special inputs
-                additional_inputs = []
-                for param in _trans_inputs.itervalues():
-                    if param.name == 'special':
-                        additional_inputs.append(param)
+                with self.timers.timed(TIMER_SPECIAL_INPUT):
+                    additional_inputs = []
+                    for param in _trans_inputs.itervalues():
+                        if param.name == 'special':
+                            additional_inputs.append(param)
                         
-                for param in additional_inputs:
-                    _trans_inputs.gld_io[param.name].pop(param.param)
-                    for new_param in Bus.param_dict_itervalues(self.check_special(param)):
-                        _trans_inputs.add_param(new_param)
-                del additional_inputs
-                
-                for param in _trans_inputs.itervalues():
-                    self.debug_instance.write('[SEND]: ' + str(_trans_inputs.time) + '\t' + str(param.name) + '.' + str(param.param) + ' = ' + str(param.value), self.folder)
-                
+                    for param in additional_inputs:
+                        _trans_inputs.gld_io[param.name].pop(param.param)
+                        for new_param in Bus.param_dict_itervalues(self.check_special(param)):
+                            _trans_inputs.add_param(new_param)
+                    del additional_inputs
+
+                if self.debug_instance.trace_level >= TRACE_IO:
+                    for param in _trans_inputs.itervalues():
+                        self.debug_instance.trace(TRACE_SEND, _trans_inputs.time, self.folder, param.name, param.param, param.value)
+
                 #send the new inputs, advance to our sim_time to the next time step, and run to said time step
-                self._local_bus_send(_trans_inputs)
-                
+                with self.timers.timed(TIMER_SEND):
+                    self._local_bus_send(_trans_inputs)
+
                 self._local_advance_time(_trans_inputs.time)
             else:
                 self._local_advance_time(time=None)
-        
+
         if (trans_state == Bus.TRANSACTION_ALL) or (trans_state == Bus.TRANSACTION_RUNTO):
-            self._local_bus_runto(self.sim_time)
-            
+            with self.timers.timed(TIMER_RUNTO):
+                self._local_bus_runto(self.sim_time)
+
         if (trans_state == Bus.TRANSACTION_ALL) or (trans_state == Bus.TRANSACTION_RUNTO_POLL):
-            self._local_bus_runto_poll(self.sim_time)
-            
+            with self.timers.timed(TIMER_POLL):
+                self._local_bus_runto_poll(self.sim_time)
+
         if (trans_state == Bus.TRANSACTION_ALL) or (trans_state == Bus.TRANSACTION_OUTPUTS):
             _out_params = self._get_outputs(outputs, overwrite_output)
-            _out = self.bus_translator.translate_output(self._local_bus_recv(_out_params))
-        
+
+            with self.timers.timed(TIMER_RECV):
+                _recv = self._local_bus_recv(_out_params)
+
+            with self.timers.timed(TIMER_TRANSLATE_OUTPUT):
+                _out = self.bus_translator.translate_output(_recv)
+
         self._leave_folder()
-        
+
         return _out
-    
+
+    def run(self,inputs_frame=None,outputs=None):
+        '''
+        run(inputs_frame)
+
+        Drives the bus from the current time (sim_time.start_time for a newly started bus) to sim_time.end_time.
+        Replaces the 'while not bus.finished: bus.transaction(...)' loop when all of the inputs are known ahead of
+        time (e.g., a voltage schedule).  The input and output messages are built once and reused at each step,
+        and the outputs are written into a preallocated (time x output) array.
+
+        Parameters:
+            inputs_frame - (optional) pandas.DataFrame indexed by time.  Each row is held until the next row (i.e., the
+                    row at the latest index <= the simulation time is sent).  The columns are translated with
+                    bus_translator.translate_input_frame, so they should be 'name.param' labels for the default
+                    BusTranslator, or the aggregator keys (e.g., 'voltage_real') for the AggregatorBusTranslator.
+
+            outputs - (optional) MessageCommonData object specifying additional outputs (CommonParam) other than what was
+                     requested in the initialization
+
+        Returns:
+            pandas.DataFrame - indexed by simulation time with a column for each output ('name.param'), translated
+                     with bus_translator.translate_output_frame
+        '''
+        self._enter_folder()
+
+        _grid = self._run_time_grid()
+        _run = _BusRun(self, self._run_input_frame(inputs_frame, _grid), _grid, outputs)
+
+        for k in xrange(len(_grid)):
+            _run.step(k)
+
+        self._leave_folder()
+
+        with self.timers.timed(TIMER_TRANSLATE_OUTPUT):
+            _out = self.bus_translator.translate_output_frame(_run.to_frame())
+
+        return _out
+
     def get_time(self):
         return self.sim_time.current_time
-    
+
     
     def _local_bus_send(self,inputs):
         '''
@@ -488,8 +981,22 @@ class Bus(object):
         
         Local receive function.  Subclasses need to implement this.
         '''
-        raise Exception('Bus objects should implement _local_bus_recv()')    
-    
+        raise Exception('Bus objects should implement _local_bus_recv()')
+
+    def _local_bus_recv_into(self,outputs,out_params,row):
+        '''
+        _local_bus_recv_into(outputs,out_params,row)
+
+        Receive function for Bus.run.  Writes the value of each CommonParam in out_params into row (one row of the
+        run result).  Defaults to _local_bus_recv; subclasses can overload this to skip building the output message.
+        '''
+        _recv = self._local_bus_recv(outputs)
+        for i, param in enumerate(out_params):
+            try:
+                row[i] = _recv[param.name][param.param].value
+            except (KeyError, TypeError, ValueError):
+                row[i] = np.nan
+
     def _local_advance_time(self,time):
         '''
         advance time in the simulation by either (a) using the provided timestep, or (b) advancing our current kept time
@@ -595,6 +1102,12 @@ class Bus(object):
     def _leave_folder(self):
         if self.__cwd != None:
             os.chdir(self.__cwd)
+    
+    def _folder_path(self,filename):
+        '''
+        filename relative to the bus folder (the working directory if the bus has no folder, as in _enter_folder)
+        '''
+        return os.path.join(self.folder if self.folder != None else os.path.abspath(os.path.curdir), filename)
         
     def check_special(self,param):
         ret = {}
@@ -620,9 +1133,138 @@ class Bus(object):
                     _out.add_param(o)
                     
         _out.time = self.sim_time
-                    
+
         return _out
-            
+
+    def _run_time_grid(self):
+        '''
+        Returns the simulation times Bus.run will step through (the same times advance_time will produce).
+        '''
+        _times = []
+        _t = self.sim_time.current_time
+        while _t < self.sim_time.end_time:
+            _t = min(_t + self.sim_time.delta, self.sim_time.end_time)
+            _times.append(_t)
+        return pd.DatetimeIndex(_times)
+
+    def _run_input_frame(self,inputs_frame,grid):
+        '''
+        Translates, expands the special inputs of, and aligns the Bus.run inputs_frame to the grid.
+
+        Returns the aligned frame and a mask of the grid times that have inputs (None, None if there are no inputs).
+        '''
+        if inputs_frame is None:
+            return None, None
+
+        with self.timers.timed(TIMER_TRANSLATE_INPUT):
+            _frame = self.bus_translator.translate_input_frame(inputs_frame)
+
+        with self.timers.timed(TIMER_SPECIAL_INPUT):
+            _frame = self._expand_special_frame(_frame)
+
+        return _align_to_grid(_frame, grid)
+
+    def _expand_special_frame(self,frame):
+        '''
+        Column-wise version of the special input check in transaction.
+        '''
+        for col in frame.columns:
+            _name, _param = key_to_param(col)
+            if _name == 'special':
+                _special = self.check_special(message.CommonParam(name=_name, param=_param, value=frame[col].values))
+                frame = frame.drop(col, axis=1)
+                for new_param in Bus.param_dict_itervalues(_special):
+                    frame[param_to_key(new_param.name, new_param.param)] = new_param.value
+        return frame
+
+    def _run_outputs(self,outputs=None):
+        '''
+        Returns the output message used at every step of Bus.run and the list of its CommonParams (the result columns).
+        '''
+        _out = self._get_outputs(outputs, False)
+        return _out, list(_out.itervalues())
+
+    def _run_step(self,inputs,outputs,out_params,row,trans_state=TRANSACTION_ALL):
+        '''
+        One step of Bus.run.  Same flow as transaction, without the translation and special input checks, which
+        Bus.run does once for the whole inputs_frame.
+        '''
+        if (trans_state == Bus.TRANSACTION_ALL) or (trans_state == Bus.TRANSACTION_INPUTS):
+            if inputs != None:
+                with self.timers.timed(TIMER_SEND):
+                    self._local_bus_send(inputs)
+            self._local_advance_time(time=None)
+
+        if (trans_state == Bus.TRANSACTION_ALL) or (trans_state == Bus.TRANSACTION_RUNTO):
+            with self.timers.timed(TIMER_RUNTO):
+                self._local_bus_runto(self.sim_time)
+
+        if (trans_state == Bus.TRANSACTION_ALL) or (trans_state == Bus.TRANSACTION_RUNTO_POLL):
+            with self.timers.timed(TIMER_POLL):
+                self._local_bus_runto_poll(self.sim_time)
+
+        if (trans_state == Bus.TRANSACTION_ALL) or (trans_state == Bus.TRANSACTION_OUTPUTS):
+            with self.timers.timed(TIMER_RECV):
+                self._local_bus_recv_into(outputs, out_params, row)
+
+class _BusRun(object):
+    '''
+    Preallocated state for driving one Bus through Bus.run: the input CommonParams (reused at every step), the aligned
+    input columns, the output CommonParams, and the (time x output) result array.
+    '''
+
+    def __init__(self,bus,aligned_inputs,grid,outputs=None):
+        self.bus = bus
+        self.grid = grid
+
+        self.inputs = None
+        self._in_params = []
+        self._in_values = []
+        self._has_input = None
+
+        _frame, self._has_input = aligned_inputs
+        if _frame is not None and len(_frame.columns) > 0:
+            self.inputs = message.MessageCommonData()
+            for col in _frame.columns:
+                _name, _param = key_to_param(col)
+                _p = message.CommonParam(name=_name, param=_param)
+                self.inputs.add_param(_p)
+                self._in_params.append(_p)
+                #python lists so the values sent are python scalars
+                self._in_values.append(_frame[col].tolist())
+
+        self.outputs, self.out_params = bus._run_outputs(outputs)
+        self.result = np.empty((len(grid), len(self.out_params)), dtype=complex)
+
+    def step(self,k,trans_state=Bus.TRANSACTION_ALL):
+        _inputs = None
+        if self.inputs is not None and self._has_input[k]:
+            for i in xrange(len(self._in_params)):
+                self._in_params[i].value = self._in_values[i][k]
+            _inputs = self.inputs
+
+        self.bus._run_step(_inputs, self.outputs, self.out_params, self.result[k], trans_state)
+
+        #traced after the step, when the bus time has advanced to the step time grid[k]
+        if _inputs is not None and self.bus.debug_instance.trace_level >= TRACE_IO and \
+                trans_state in (Bus.TRANSACTION_ALL, Bus.TRANSACTION_INPUTS):
+            for param in self._in_params:
+                self.bus.debug_instance.trace(TRACE_SEND, self.bus.sim_time, self.bus.folder, param.name, param.param, param.value)
+
+    def columns(self):
+        '''
+        The result as a gld_io-like dict of CommonParams whose values are whole columns (for actions)
+        '''
+        ret = {}
+        for i, param in enumerate(self.out_params):
+            ret.setdefault(param.name,{})[param.param] = message.CommonParam(name=param.name, param=param.param,
+                                                                             value=self.result[:,i])
+        return ret
+
+    def to_frame(self):
+        return pd.DataFrame(self.result, index=self.grid,
+                            columns=[param_to_key(p.name, p.param) for p in self.out_params])
+
 ##########################################################
 # GridlabBus
 ##########################################################
@@ -644,6 +1286,15 @@ class GridlabBus(Bus):
         self._default_return = float('NaN') if self.params[GridlabBusParams.NAN_KEY] else 0.0
         self.gld_port = self.params[GridlabBusParams.PORT_KEY]
         
+        self._validate = self.params[GridlabBusParams.VALIDATE_KEY]
+        if self._validate not in (GridlabBusParams.VALIDATE_OFF, GridlabBusParams.VALIDATE_WARN, 
+                                  GridlabBusParams.VALIDATE_DROP, GridlabBusParams.VALIDATE_ERROR):
+            raise Exception('Unknown GridlabBus %s: %s' % (GridlabBusParams.VALIDATE_KEY, self._validate))
+        
+        #(name, param) -> None if valid, else the reason it is not (see validate_io)
+        self._io_checked = {}
+        self._glm_index = None
+        
         print self._default_return
         
     def set_path(self,path):
@@ -661,12 +1312,19 @@ class GridlabBus(Bus):
         
         Starts a GridLAB-D instance.
         
+        The outputs are checked against the objects of the .glm file before GridLAB-D is started, and against the
+        values GridLAB-D returns once it is (see validate_io).
+        
         Throws:
             Exception
         '''
         self.debug_instance.open()
         #Add node name info to debug file
         self.debug_instance.write('Running on host %s with python pid %s'%(socket.gethostname(),os.getpid()), self.folder)
+        
+        self._io_checked = {}
+        self._glm_index = self._load_glm_index()
+        self._check_outputs()
         #TODO: some switch for the GridlabComm object.  currently assuming HTTP   
         
         logging.debug("%s-- EXT_GLD=%s, Port=%d", self.gld_path, self._ext_gld, self.gld_port)
@@ -686,6 +1344,8 @@ class GridlabBus(Bus):
             logging.debug(no_init_err_str)
             self.debug_instance.write(no_init_err_str, self.folder)
 #BP: possible source of hang            raise Exception('GridLAB-D failed to open.')
+        else:
+            self._check_outputs(probe=True)
     
     
     def stop_bus(self):
@@ -703,16 +1363,27 @@ class GridlabBus(Bus):
             self.debug_instance.write('WARNING: GridLAB-D already shutdown.', self.folder)
         finally:
             self._comm.close()
+            self._save_timing()
             self.debug_instance.close()
         
     def _local_bus_send(self,inputs):
         '''
         _local_bus_send(inputs)
         
-        Sends the inputs to GridLAB-D.
+        Sends the inputs to GridLAB-D.  Inputs that are not in the model are dropped if validate_io is drop.
         '''
         assert isinstance(inputs,message.MessageCommonData)
         
+        if self._validate != GridlabBusParams.VALIDATE_OFF:
+            _invalid = self._check_io(inputs.itervalues(), 'input', probe=self._comm.connected)
+            if len(_invalid) > 0 and self._validate == GridlabBusParams.VALIDATE_DROP:
+                _valid = message.MessageCommonData()
+                _valid.time = inputs.time
+                for param in inputs.itervalues():
+                    if (param.name, param.param) not in _invalid:
+                        _valid.add_param(param)
+                inputs = _valid
+        
         self._comm.send(inputs)
       
     
@@ -748,11 +1419,98 @@ class GridlabBus(Bus):
                 o.value = self._default_return
                 
         return _out
-            
-   
-    @staticmethod
-    def generate_template(filename):
-        Bus.generate_template(filename, template=GridlabBusParams)
+    
+    def _get_outputs(self,outputs,overwrite_output):
+        '''
+        Bus._get_outputs.  The outputs passed in at transaction time (e.g., by a MultiNodeBus) are checked the first time
+        each one appears, and the ones that are not in the model are dropped if validate_io is drop.
+        '''
+        _out = super(GridlabBus,self)._get_outputs(outputs,overwrite_output)
+        
+        if outputs != None and self._validate != GridlabBusParams.VALIDATE_OFF:
+            _invalid = self._check_io(outputs.itervalues(), 'output', probe=self._comm.connected)
+            if len(_invalid) > 0 and self._validate == GridlabBusParams.VALIDATE_DROP:
+                _valid = message.MessageCommonData()
+                _valid.time = _out.time
+                for param in _out.itervalues():
+                    if (param.name, param.param) not in _invalid:
+                        _valid.add_param(param)
+                _out = _valid
+        
+        return _out
+            
+   
+    @staticmethod
+    def generate_template(filename):
+        Bus.generate_template(filename, template=GridlabBusParams)
+    
+    def _load_glm_index(self):
+        '''
+        Returns the GlmIndex of the .glm file (see buspy.analyze.loaders.glm), or None if validate_io is off or the 
+        file cannot be indexed.
+        '''
+        if self._validate == GridlabBusParams.VALIDATE_OFF:
+            return None
+        
+        from buspy.analyze.loaders.glm import glm_index
+        _filename = os.path.join(self.folder or '', self.params[GridlabBusParams.FILE_KEY])
+        try:
+            return glm_index(_filename)
+        except Exception as e:
+            self.debug_instance.write('WARNING: the outputs and inputs are not checked against %s, because %s' % (_filename, e), self.folder)
+            return None
+    
+    def _check_outputs(self,probe=False):
+        '''
+        Checks the outputs (see _check_io), and removes the invalid ones from bus_out if validate_io is drop.
+        '''
+        if self._validate == GridlabBusParams.VALIDATE_OFF:
+            return
+        
+        _invalid = self._check_io(Bus.param_dict_itervalues(self.bus_out), 'output', probe)
+        if self._validate == GridlabBusParams.VALIDATE_DROP:
+            for name, param in _invalid:
+                self.bus_out[name].pop(param, None)
+                if len(self.bus_out[name]) == 0:
+                    del self.bus_out[name]
+    
+    def _check_io(self,params,kind,probe=False):
+        '''
+        Returns the set of (name, param) of params that are not in the model, and logs (or raises an Exception for,
+        if validate_io is error) each one the first time it is found.  Each (name, param) is checked once: the object
+        name against the .glm index (unless GlmIndex.complete is False, e.g., the file includes other files or uses
+        macros), and, if probe, the property with one GET (again later if GridLAB-D does not answer).
+        '''
+        _invalid = set()
+        for _p in params:
+            _key = (_p.name, _p.param)
+            if _key in self._io_checked:
+                if self._io_checked[_key] is not None:
+                    _invalid.add(_key)
+                continue
+            
+            _reason = None
+            if (_p.param is not None and self._glm_index is not None and self._glm_index.complete 
+                and _p.name not in self._glm_index):
+                _reason = 'there is no object %s in %s' % (_p.name, self._glm_index.filename)
+            elif probe:
+                _has_value = self._comm.has_value(_p.name, _p.param)
+                if _has_value is None:
+                    #no answer (not a missing property), so it is checked again the next time
+                    continue
+                if not _has_value:
+                    _reason = 'GridLAB-D has no such object or property'
+            
+            if probe or _reason is not None:
+                self._io_checked[_key] = _reason
+            if _reason is not None:
+                _invalid.add(_key)
+                _msg = 'GridlabBus %s %s is not in the model: %s' % (kind, param_to_key(_p.name, _p.param), _reason)
+                if self._validate == GridlabBusParams.VALIDATE_ERROR:
+                    raise Exception(_msg)
+                self.debug_instance.write('WARNING: ' + _msg + ('' if self._validate == GridlabBusParams.VALIDATE_WARN else ' (dropped)'), self.folder)
+                logging.warning(_msg)
+        return _invalid
     
     def _to_cff_init(self):
         ret = message.MessageCommonGridlabInit()
@@ -785,20 +1543,64 @@ class GridlabBus(Bus):
 # FileBus
 ##########################################################
 
-def _file_error(filename):
+def _file_error(filename,*args):
     raise Exception('ERROR: ' + str(filename) + ' not a supported file type')
 
+#shared by every FileBus in the process
+FILE_DATA_CACHE = DataFileCache()
+
+def _align_to_sim_grid(data,grid,interpolation):
+    '''
+    Resamples the FileBus output data (an object indexed by time, e.g., a TimeSeries) onto grid (int64 ns).
+    
+    Returns the complex values at each grid time and the first grid index with a value (the grid times before the
+    first time of the data have none).  Series are resampled with numpy (hold: the value at the latest time <= the
+    grid time, linear: interpolated, and held after the last time), objects with a true vectorized attribute (e.g., 
+    a Schedule, which is defined at any time) by indexing them with the grid as a DatetimeIndex, and other objects by
+    indexing them at each time.
+    '''
+    if getattr(data, 'vectorized', False) is True:
+        return np.asarray(data[pd.DatetimeIndex(grid)], dtype=complex), 0
+    
+    if not isinstance(data, pd.Series):
+        if interpolation != FileBusParams.INTERPOLATION_HOLD:
+            raise Exception('FileBus %s interpolation requires a time series' % interpolation)
+        _values = np.empty(len(grid), dtype=complex)
+        _first = len(grid)
+        for k in range(len(grid) - 1, -1, -1):
+            try:
+                _values[k] = data[pd.Timestamp(grid[k])]
+                _first = k
+            except (IndexError, KeyError):
+                break
+        return _values, _first
+    
+    _times = np.asarray(data.index.asi8)
+    _data = np.asarray(data.values, dtype=complex)
+    _first = int(np.searchsorted(grid, _times[0])) if len(_times) > 0 else len(grid)
+    
+    if interpolation == FileBusParams.INTERPOLATION_LINEAR:
+        #relative to the first grid time so the float conversion keeps the resolution
+        _x, _xp = (grid - grid[0]).astype(float), (_times - grid[0]).astype(float)
+        _values = np.interp(_x, _xp, _data.real) + 1j * np.interp(_x, _xp, _data.imag)
+    else:
+        _values = _data[np.maximum(np.searchsorted(_times, grid, side='right') - 1, 0)]
+    
+    _values[:_first] = np.nan
+    return np.ascontiguousarray(_values), _first
+
 class CommonFileParam(message.CommonParam):
-    def __init__(self, name=None, param=None, fmt=None, unit=None, value=None, filename=None):
+    def __init__(self, name=None, param=None, fmt=None, unit=None, value=None, filename=None, column=None, dataset=None):
         super(CommonFileParam,self).__init__(name, param, fmt, unit, value)
         self.filename = filename
+        self.column = column
+        self.dataset = dataset
         self._val_data = None
 
 class FileBus(Bus):
     '''
     The interface between the GridLAB-D aggregator and a load specified by the given file.
     
-    TODO: schedule .glm support
     TODO: other (?) file support
     '''
     
@@ -807,17 +1609,49 @@ class FileBus(Bus):
     EXTENSION_HANDLER
     
     A python dictionary that takes a file extension as a key and a function name as a parameter.  
-    The function should take a filename and return an object that takes time as an index.
+    The function should take a filename and return an object that takes time as an index, a pandas.DataFrame 
+    (a table) the outputs select their column from, a dict the outputs select their object from by column (e.g., 
+    the schedules of a .glm file), or an object with a dataset_column(dataset,column) method the outputs read their
+    column from as the simulation advances (e.g., an H5Store).
     To add support for other filenames, add a new extension:function entry into the dict.
     '''
-    EXTENSION_HANDLER = {'.glm'     : _file_error,
-                         '.player'  : player_to_timeseries,
-                         '.csv'     : _file_error}
+    EXTENSION_HANDLER = {'.glm'     : _glm_schedules,
+                         '.player'  : _player_to_timeseries,
+                         '.csv'     : _csv_to_table,
+                         '.h5'      : _h5_store}
+    
+    '''
+    STREAM_HANDLER
+    
+    Same as EXTENSION_HANDLER when the files are streamed.  The function takes a filename, the column of the output
+    (for tables), and the number of rows in each chunk, and returns an object that takes non-decreasing times as an
+    index and has a close() method (e.g., buspy.analyze.loaders.stream.StreamingTimeSeries).
+    '''
+    STREAM_HANDLER = {'.player' : _stream_player,
+                      '.csv'    : _stream_csv}
     
     
     def __init__(self, json_file):
         super(FileBus,self).__init__(json_file)
         self._save = self._json_to_obj(json_file, FileBusParams.SAVE_INPUT_KEY)
+        self._save_file = self._json_to_obj(json_file, FileBusParams.SAVE_INPUT_FILE_KEY) or FileBusParams.DEFAULT_SAVE_INPUT_FILE
+        self._recorder = None
+        
+        self._interpolation = self._json_to_obj(json_file, FileBusParams.INTERPOLATION_KEY) or FileBusParams.INTERPOLATION_HOLD
+        if self._interpolation not in (FileBusParams.INTERPOLATION_HOLD, FileBusParams.INTERPOLATION_LINEAR):
+            raise Exception('Unknown FileBus interpolation: %s' % self._interpolation)
+        
+        self._stream = self._json_to_bool(json_file, FileBusParams.STREAM_KEY)
+        self._stream_rows = self._json_to_obj(json_file, FileBusParams.STREAM_ROWS_KEY) or FileBusParams.DEFAULT_STREAM_ROWS
+        if self._stream and self._interpolation != FileBusParams.INTERPOLATION_HOLD:
+            raise Exception('FileBus stream requires %s interpolation' % FileBusParams.INTERPOLATION_HOLD)
+        
+        #FILE_DATA_CACHE keys held between start_bus and stop_bus
+        self._data_keys = []
+        
+        #the simulation times (int64 ns) the outputs are resampled onto, and the index of the current time in it
+        self._grid = None
+        self._step = -1
         
     '''
     Bus interface implementation
@@ -827,12 +1661,64 @@ class FileBus(Bus):
         start_bus()
         
         Loads each output file into a data structure that takes a datetime as an input to __getitem__ (i.e., output[time]).
+        The files are shared with the other FileBus objects in the process through FILE_DATA_CACHE, and the outputs of
+        a table (e.g., a .csv file) select their column from it.
+        
+        Each output is then resampled (see interpolation) onto the simulation times (current time to end time by delta),
+        so receiving an output at one of them is an array index.  Other times (e.g., set by the inputs) are looked up
+        in the file data.  The outputs of a store (e.g., a .h5 file, see dataset) are instead read in time slices as 
+        the simulation advances.
+        
+        If stream is set, each output instead reads its file in chunks on a background thread (see STREAM_HANDLER).
+        
+        If save_input is set, the inputs are recorded to save_input_file (see buspy.utils.input_recorder).
         '''
+        from buspy.analyze.timeseries import to_i8
+        self._to_i8 = to_i8
+        
         self._enter_folder()
         self.debug_instance.open()
+        
+        if self._save:
+            from buspy.utils.input_recorder import InputRecorder
+            self._recorder = InputRecorder(os.path.abspath(self._save_file))
+        
+        if self._stream:
+            self._start_streams()
+            self._leave_folder()
+            return
+        
+        self._grid = np.array([to_i8(t) for t in [self.sim_time.current_time] + list(self._run_time_grid())], dtype=np.int64)
+        self._step = 0
+        _grid_key = (self._grid[0], self._grid[-1], len(self._grid), self._interpolation)
+        
         #for each provided input file, load it using the functor provided in EXTENSION_HANDLER
+        _loaded = {}
         for output in FileBus.param_dict_itervalues(self.bus_out):
-            output._val_data = self.EXTENSION_HANDLER.setdefault(FileBus._get_file_extension(output.filename),_file_error)(output.filename)
+            if output.filename not in _loaded:
+                _loaded[output.filename] = FILE_DATA_CACHE.acquire(output.filename, 
+                        self.EXTENSION_HANDLER.setdefault(FileBus._get_file_extension(output.filename),_file_error))
+                self._data_keys.append(_loaded[output.filename][0])
+            _file_key, output._val_data = _loaded[output.filename]
+            
+            _column = None
+            if isinstance(output._val_data, pd.DataFrame):
+                _column = output.column or param_to_key(output.name, output.param)
+                output._val_data = _table_column(output._val_data, _column)
+            elif isinstance(output._val_data, dict):
+                _column = output.column or param_to_key(output.name, output.param)
+                output._val_data = _glm_schedule(output._val_data, _column)
+            elif hasattr(output._val_data, 'dataset_column'):
+                #read in time slices as the simulation advances instead of resampled up front
+                if self._interpolation != FileBusParams.INTERPOLATION_HOLD:
+                    raise Exception('FileBus %s interpolation is not supported for %s' % (self._interpolation, output.filename))
+                output._val_data = output._val_data.dataset_column(output.dataset, output.column or param_to_key(output.name, output.param))
+                output._aligned, output._first_step = None, -1
+                continue
+            
+            _key, (output._aligned, output._first_step) = FILE_DATA_CACHE.acquire_key((_file_key, _column, _grid_key), 
+                        _align_to_sim_grid, output._val_data, self._grid, self._interpolation)
+            self._data_keys.append(_key)
         self._leave_folder()
     
     
@@ -840,26 +1726,40 @@ class FileBus(Bus):
         '''
         stop_bus()
         
-        Stops the GridLAB-D instance.
+        Releases the output files (the memory is freed once no other FileBus uses them), and writes the rest of the
+        saved inputs.
         '''
+        if self._recorder is not None:
+            self._recorder.close()
+            self._recorder = None
+        
         #free the memory after stopping as these might take a lot of memory
+        for output in FileBus.param_dict_itervalues(self.bus_out):
+            if self._stream and output._val_data is not None:
+                output._val_data.close()
+            output._val_data = None
+            output._aligned = None
+        for key in self._data_keys:
+            FILE_DATA_CACHE.release(key)
+        self._data_keys = []
+        
+        self._save_timing()
         self.debug_instance.close()
         
     def _local_bus_send(self,inputs):
         '''
         _local_bus_send(inputs)
         
-        Saves the inputs if self._save is True.
+        Saves the inputs if self._save is True.  They are recorded at the time the bus runs to next.
         '''
-        #TODO: save inputs
-        if self._save:
-            pass
-        
-        pass
+        if self._recorder is not None:
+            for param in inputs.itervalues():
+                self._recorder.set(param_to_key(param.name, param.param), _to_complex(param.value))
       
     
     def _local_bus_runto(self,time=None):
-        pass
+        if self._recorder is not None:
+            self._recorder.next_row(time.current_time)
      
     
     def _local_bus_recv(self,outputs):
@@ -868,17 +1768,36 @@ class FileBus(Bus):
         
         Local receive function.  Sends back the value at the given time from the specified files.
         '''
+        _k = self._grid_step()
         ret = message.MessageCommonData()
         for output in outputs.itervalues():
             _param = output.copy()
             #TODO: translate output into correct value (e.g., complex-string to complex float), strip unit, etc.
-            _param.value = output._val_data[self.sim_time.current_time]
+            _param.value = self._output_value(output, _k)
             ret.add_param(_param)
             
         ret.time = self.sim_time
         
         return ret
-        
+
+    def _local_bus_recv_into(self,outputs,out_params,row):
+        '''
+        _local_bus_recv_into(outputs,out_params,row)
+
+        Writes the value at the current time from the specified files directly into row.
+        '''
+        _k = self._grid_step()
+        for i, output in enumerate(out_params):
+            row[i] = output._aligned[_k] if 0 <= output._first_step <= _k else self._output_value(output, _k)
+
+    def _run_outputs(self,outputs=None):
+        '''
+        Additional outputs are ignored (see transaction), so use the loaded outputs directly instead of a copy.
+        '''
+        _out = message.MessageCommonData()
+        _out.gld_io = self.bus_out
+        _out.time = self.sim_time
+        return _out, list(FileBus.param_dict_itervalues(self.bus_out))
         
     def transaction(self,inputs,outputs=None,overwrite_output=False,trans_state=Bus.TRANSACTION_ALL):
         '''
@@ -896,6 +1815,8 @@ class FileBus(Bus):
         param.unit      = Bus._json_to_obj(in_param, BusParams.IO_UNIT_KEY)
         param.value     = Bus._json_to_obj(in_param, BusParams.IO_VALUE_KEY)
         param.filename  = Bus._json_to_obj(in_param, FileBusParams.IO_FILE_KEY)
+        param.column    = Bus._json_to_obj(in_param, FileBusParams.IO_COLUMN_KEY)
+        param.dataset   = Bus._json_to_obj(in_param, FileBusParams.IO_DATASET_KEY)
         return param
         
     @staticmethod
@@ -905,6 +1826,49 @@ class FileBus(Bus):
     '''
     Local functions
     '''
+    def _start_streams(self):
+        '''
+        Opens a stream of the file of each output.  There is no simulation grid, so every value is looked up in the
+        stream.
+        '''
+        self._grid = np.empty(0, dtype=np.int64)
+        self._step = -1
+        for output in FileBus.param_dict_itervalues(self.bus_out):
+            output._aligned, output._first_step = None, -1
+            output._val_data = self.STREAM_HANDLER.get(FileBus._get_file_extension(output.filename), _file_error)(
+                        output.filename, output.column or param_to_key(output.name, output.param), self._stream_rows)
+    
+    def _grid_step(self):
+        '''
+        Index of the current time in the simulation grid (-1 if it is not on the grid).  Checks the step after the 
+        last one first.
+        '''
+        _t = self._to_i8(self.sim_time.current_time)
+        _k = self._step + 1
+        if not (0 <= _k < len(self._grid) and self._grid[_k] == _t):
+            _k = self._step
+            if not (0 <= _k < len(self._grid) and self._grid[_k] == _t):
+                _k = int(np.searchsorted(self._grid, _t))
+                if _k >= len(self._grid) or self._grid[_k] != _t:
+                    return -1
+        self._step = _k
+        return _k
+    
+    def _output_value(self,output,k):
+        '''
+        Value of output at the current time, which is grid step k (-1 if not on the grid)
+        '''
+        if 0 <= output._first_step <= k:
+            return output._aligned[k]
+        
+        #off the grid, or before the first time of the file
+        if self._interpolation == FileBusParams.INTERPOLATION_HOLD:
+            return output._val_data[self.sim_time.current_time]
+        _values, _first = _align_to_sim_grid(output._val_data, np.array([self._to_i8(self.sim_time.current_time)]), self._interpolation)
+        if _first > 0:
+            raise IndexError('index out of bounds')
+        return _values[0]
+    
     @staticmethod
     def _get_file_extension(filename):
         #NOTE: this only returns the last extension in the file.  e.g., 'file.tar.gz' returns '.gz'
@@ -939,6 +1903,7 @@ class ConstantBus(Bus):
         self.debug_instance.write('Running on host %s with python pid %s'%(socket.gethostname(),os.getpid()), self.folder)
 
     def stop_bus(self):
+        self._save_timing()
         self.debug_instance.close()
     
     def transaction(self,inputs,outputs=None,overwrite_output=False,trans_state=Bus.TRANSACTION_ALL):
@@ -949,13 +1914,33 @@ class ConstantBus(Bus):
         
         if (trans_state == Bus.TRANSACTION_ALL) or (trans_state == Bus.TRANSACTION_OUTPUTS):
             #return the constant output stored in memory
-            ret = self.bus_translator.translate_output(self._get_outputs(None, False))
+            with self.timers.timed(TIMER_RECV):
+                ret = self._get_outputs(None, False)
+
+            with self.timers.timed(TIMER_TRANSLATE_OUTPUT):
+                ret = self.bus_translator.translate_output(ret)
             
             if outputs != None:
-                self.debug_instance.write('WARNING: additional outputs are ignored in ConstantBus.transaction', 
+                self.debug_instance.write('WARNING: additional outputs are ignored in ConstantBus.transaction',
                                             self.folder)
         return ret
-   
+
+    def _local_bus_runto(self,time=None):
+        pass
+
+    def _local_bus_recv_into(self,outputs,out_params,row):
+        '''
+        Writes the constant outputs into row.
+        '''
+        for i, param in enumerate(out_params):
+            row[i] = param.value if param.value != None else np.nan
+
+    def _run_outputs(self,outputs=None):
+        '''
+        Additional outputs are ignored (see transaction).
+        '''
+        return super(ConstantBus,self)._run_outputs(None)
+
     @staticmethod
     def generate_template(filename):
         Bus.generate_template(filename, template=ConstantBusParams)
@@ -971,20 +1956,102 @@ class ConstantBus(Bus):
 
 class ResistorBus(Bus):
     '''
-    The interface between the GridLAB-D aggregator and a resistance-based load.
+    The interface between the GridLAB-D aggregator and algebraic (ZIP: constant impedance, current and power) loads.
+    
+    Each entry of the io_map is one three-phase ZIP load.  Its voltage is the voltage_A/B/C inputs of in_name (e.g., 
+    the expanded special/positive_sequence_voltage), and its power and current are the outputs of out_name.  All of the
+    loads are computed at once with numpy.  Until a voltage is received, the loads are at their nominal voltage.
     '''
     
+    PHASES = ['A', 'B', 'C']
+    
+    #supported output params (the total, or with a _A/_B/_C phase suffix)
+    OUTPUT_POWER    = 'measured_power'
+    OUTPUT_CURRENT  = 'measured_current'
     
     def __init__(self,json_file):
         '''
-        Initialize the resistor-like actions
+        Build the ZIP coefficient arrays (loads x phases) from the io_map
         '''
         super(ResistorBus,self).__init__(json_file)
         
+        _map = Bus._json_to_arr(json_file, ResistorBusParams.MAPPING_KEY)
+        if len(_map) == 0:
+            raise Exception('ResistorBus requires at least one load in %s' % ResistorBusParams.MAPPING_KEY)
+        
+        _n = len(_map)
+        self._in_names = []
+        self._out_names = []
+        self._nominal = np.empty((_n,1))
+        self._base = np.empty((_n,len(self.PHASES)))
+        _fractions = np.empty((3,_n,1))
+        _pfs = np.empty((3,_n,1))
+        
+        for k, load in enumerate(_map):
+            _get = lambda key, default=None: load[key] if load.get(key, None) is not None else default
+            
+            self._in_names.append(_get(ResistorBusParams.IN_NAME_KEY, 'network_node'))
+            self._out_names.append(_get(ResistorBusParams.OUT_NAME_KEY, self._in_names[-1]))
+            
+            if _get(ResistorBusParams.NOMINAL_VOLTAGE_KEY) is None or _get(ResistorBusParams.BASE_POWER_KEY) is None:
+                raise Exception('ResistorBus load %d requires %s and %s' % (k, ResistorBusParams.NOMINAL_VOLTAGE_KEY, ResistorBusParams.BASE_POWER_KEY))
+            self._nominal[k] = float(_get(ResistorBusParams.NOMINAL_VOLTAGE_KEY))
+            self._base[k] = _get(ResistorBusParams.BASE_POWER_KEY)
+            
+            _fractions[:,k] = [[_get(ResistorBusParams.IMPEDANCE_FRACTION_KEY, 0.0)],
+                               [_get(ResistorBusParams.CURRENT_FRACTION_KEY, 0.0)],
+                               [_get(ResistorBusParams.POWER_FRACTION_KEY, 1.0)]]
+            _pfs[:,k] = [[_get(ResistorBusParams.IMPEDANCE_PF_KEY, 1.0)],
+                         [_get(ResistorBusParams.CURRENT_PF_KEY, 1.0)],
+                         [_get(ResistorBusParams.POWER_PF_KEY, 1.0)]]
+        
+        self._zip = tuple(zip_coefficient(_fractions[i], _pfs[i]) for i in range(3))
+        
+        #phase voltages (loads x phases), nominal magnitude with the usual phase angles until inputs are received
+        self._voltage = self._nominal * np.array([1.0, VOLTAGE_CONVERSION_A_SQUARED, VOLTAGE_CONVERSION_A])
+        
+        #(input name, param) -> [(load, phase)] for _local_bus_send
+        self._in_index = {}
+        for k, name in enumerate(self._in_names):
+            for j, phase in enumerate(self.PHASES):
+                self._in_index.setdefault((name, 'voltage_' + phase), []).append((k, j))
+        
+        #[(bus_out param, load, output, phase)] for _update_outputs
+        self._out_index = []
+        for param in Bus.param_dict_itervalues(self.bus_out):
+            self._out_index.append((param,) + self._output_index(param))
+        
+        self._update_outputs()
+    
+    def _output_index(self,param):
+        '''
+        Returns the (load, output, phase) of a bus_out param.  phase is None for the total over the phases.
+        '''
+        if param.name not in self._out_names:
+            raise Exception('ResistorBus has no load with out_name %s (output %s.%s)' % (param.name, param.name, param.param))
+        
+        _load = self._out_names.index(param.name)
+        if param.param == self.OUTPUT_POWER:
+            return _load, self.OUTPUT_POWER, None
+        for output in (self.OUTPUT_POWER, self.OUTPUT_CURRENT):
+            for j, phase in enumerate(self.PHASES):
+                if param.param == output + '_' + phase:
+                    return _load, output, j
+        raise Exception('ResistorBus output %s.%s is not supported (measured_power, measured_power_A/B/C, measured_current_A/B/C)' % (param.name, param.param))
+    
+    def _update_outputs(self):
         '''
-        TODO: create input-to-output function mapping
+        Computes the power and current of every load and phase, and writes the bus_out values.
         '''
-        #TODO: !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+        _power = zip_load_power(self._voltage, self._nominal, self._base, self._zip)
+        _current = np.conj(_power / self._voltage)
+        _total = _power.sum(axis=1)
+        
+        for param, load, output, phase in self._out_index:
+            if output == self.OUTPUT_POWER:
+                param.value = complex(_total[load] if phase is None else _power[load,phase])
+            else:
+                param.value = complex(_current[load,phase])
     
     '''
     Bus interface implementation
@@ -995,26 +2062,29 @@ class ResistorBus(Bus):
         self.debug_instance.write('Running on host %s with python pid %s'%(socket.gethostname(),os.getpid()), self.folder)
 
     def stop_bus(self):
+        self._save_timing()
         self.debug_instance.close()
     
-    def transaction(self,inputs,outputs=None,overwrite_output=False):
+    def transaction(self,inputs,outputs=None,overwrite_output=False,trans_state=Bus.TRANSACTION_ALL):
         '''
         Do not allow additional outputs as we do not have a correct mapping for them.
         '''
         if outputs != None:
             self.debug_instance.write('WARNING: additional outputs are ignored in ResistorBus.transaction', self.folder)
             
-        super(ResistorBus,self).transaction(inputs,None,False)
+        return super(ResistorBus,self).transaction(inputs,None,False,trans_state)
         
     def _local_bus_send(self,inputs):
         '''
         _local_bus_send(inputs)
         
-        Maps the inputs to outputs given the init.
+        Sets the phase voltages from the inputs and recomputes the outputs (bus_out values).
         '''
-        #TODO: map inputs to outputs.  overwrite bus_out.gld_io[].value
-        raise Exception('ResistorBus transaction is not yet implemented. Do not Use ResistorBus.')
-        pass
+        for param in inputs.itervalues():
+            for load, phase in self._in_index.get((param.name, param.param), ()):
+                self._voltage[load,phase] = param.value
+        
+        self._update_outputs()
       
     
     def _local_bus_runto(self,time=None):
@@ -1028,6 +2098,16 @@ class ResistorBus(Bus):
         Local receive function.  Sends back the outputs as is as they should have already been set by _local_bus_send.
         '''
         return outputs
+
+    def _run_outputs(self,outputs=None):
+        '''
+        Additional outputs are ignored (see transaction), and _local_bus_send updates the bus_out values, so use them
+        directly instead of a copy.
+        '''
+        _out = message.MessageCommonData()
+        _out.gld_io = self.bus_out
+        _out.time = self.sim_time
+        return _out, list(ResistorBus.param_dict_itervalues(self.bus_out))
     
     @staticmethod
     def generate_template(filename):
@@ -1038,6 +2118,326 @@ class ResistorBus(Bus):
     '''
 
 
+##########################################################
+# SurrogateBus
+##########################################################
+
+class SurrogateBus(Bus):
+    '''
+    A fitted stand-in for another bus (e.g., a GridlabBus feeder).  The model (see fit_surrogate) is fitted offline
+    from the recorded inputs and outputs of the bus with SurrogateBus.fit, and maps the inputs held at each time step
+    and the time of day to the outputs, so each transaction is a handful of numpy operations.
+    
+    Inputs outside of the range seen during training (plus envelope_margin times the range) raise an Exception rather
+    than extrapolate, as do inputs and outputs the model was not fitted with.  Until an input is received, it is held
+    at its training mean.
+    '''
+    
+    #relative tolerance of the envelope check
+    ENVELOPE_TOLERANCE = 1e-9
+    
+    def __init__(self,json_file):
+        super(SurrogateBus,self).__init__(json_file)
+        self.model_file = self._json_to_obj(json_file, SurrogateBusParams.MODEL_KEY)
+        self.margin     = float(self._json_to_obj(json_file, SurrogateBusParams.MARGIN_KEY) or 0.0)
+        self.model      = None
+        self.fit_error  = None
+    
+    @staticmethod
+    def fit(bus,inputs_frame,filename=None,degree=2,harmonics=2):
+        '''
+        fit(bus,inputs_frame,filename=None,degree=2,harmonics=2)
+        
+        Drives the started bus with inputs_frame (as Bus.run, from its current time to its end time), records the inputs
+        it was sent and its outputs at every step with inputs, and fits a model to them with fit_surrogate.  The model
+        is in the bus's own (untranslated) name.param labels, so the SurrogateBus should use the same bus_translator.
+        
+        Returns the model dict, which is also written to filename (the SurrogateBus model_file) as JSON if given.
+        '''
+        bus._enter_folder()
+        
+        _grid = bus._run_time_grid()
+        _inputs, _has_input = bus._run_input_frame(inputs_frame, _grid)
+        if _inputs is None:
+            raise Exception('SurrogateBus.fit requires an inputs_frame')
+        
+        _run = _BusRun(bus, (_inputs, _has_input), _grid)
+        for k in xrange(len(_grid)):
+            _run.step(k)
+        
+        bus._leave_folder()
+        
+        _outputs = _run.to_frame()
+        _keep = _has_input & _inputs.notnull().all(axis=1).values & _outputs.notnull().all(axis=1).values
+        model = fit_surrogate(_inputs[_keep], _outputs[_keep], degree, harmonics)
+        
+        if filename is not None:
+            with open(filename, 'w') as f:
+                json.dump(model, f)
+        
+        return model
+    
+    def load_model(self,model):
+        '''
+        load_model(model)
+        
+        Loads the model (a dict from fit_surrogate, or the JSON file it was saved to) and checks that it has every
+        bus output.
+        '''
+        if not isinstance(model, dict):
+            with open(model, 'r') as f:
+                model = json.load(f)
+        
+        self.model      = model
+        self.fit_error  = model['fit_error']
+        
+        self._in_index  = dict((key_to_param(key), i) for i, key in enumerate(model['inputs']))
+        self._out_index = dict((key_to_param(key), j) for j, key in enumerate(model['outputs']))
+        
+        self._mean      = np.array(model['mean'])
+        self._scale     = np.array(model['scale'])
+        self._terms     = model['terms']
+        self._harmonics = model['harmonics']
+        self._coef      = np.array(model['coefficients'])
+        
+        _lo = np.array(model['envelope_min'])
+        _hi = np.array(model['envelope_max'])
+        _pad = self.margin * (_hi - _lo) + self.ENVELOPE_TOLERANCE * np.maximum(1.0, np.maximum(np.abs(_lo), np.abs(_hi)))
+        self._lo = (_lo - _pad).tolist()
+        self._hi = (_hi + _pad).tolist()
+        
+        #held inputs (real and imaginary components) and the outputs at the current time
+        self._x = self._mean.copy()
+        self._y = np.zeros(len(self._out_index), dtype=complex)
+        
+        for param in SurrogateBus.param_dict_itervalues(self.bus_out):
+            self._output(param)
+    
+    def _output(self,param):
+        '''
+        Index of the CommonParam in the model outputs
+        '''
+        try:
+            return self._out_index[(param.name, param.param)]
+        except KeyError:
+            raise Exception('SurrogateBus model %s has no output %s' % (self.model_file, param_to_key(param.name, param.param)))
+    
+    '''
+    Bus interface implementation
+    '''
+    def start_bus(self):
+        self._enter_folder()
+        self.debug_instance.open()
+        self.debug_instance.write('Running on host %s with python pid %s'%(socket.gethostname(),os.getpid()), self.folder)
+        
+        if self.model is None:
+            self.load_model(self.model_file)
+        self._leave_folder()
+        
+        self.debug_instance.write('SurrogateBus model %s fit error: %s' % (self.model_file, json.dumps(self.fit_error)), self.folder)
+
+    def stop_bus(self):
+        self._save_timing()
+        self.debug_instance.close()
+        
+    def _local_bus_send(self,inputs):
+        '''
+        _local_bus_send(inputs)
+        
+        Holds the input values.  Throws an Exception for inputs the model does not have or that are outside of the
+        training envelope.
+        '''
+        for param in inputs.itervalues():
+            try:
+                i = self._in_index[(param.name, param.param)]
+            except KeyError:
+                raise Exception('SurrogateBus model %s has no input %s' % (self.model_file, param_to_key(param.name, param.param)))
+            
+            _value = complex(param.value)
+            for k, v in ((2 * i, _value.real), (2 * i + 1, _value.imag)):
+                if not (self._lo[k] <= v <= self._hi[k]):
+                    raise Exception('SurrogateBus input %s = %s is outside of the training envelope of model %s' % 
+                                    (param_to_key(param.name, param.param), _value, self.model_file))
+                self._x[k] = v
+      
+    
+    def _local_bus_runto(self,time=None):
+        '''
+        _local_bus_runto(time)
+        
+        Evaluates the model at the held inputs and the current time of day.
+        '''
+        _t = self.sim_time.current_time
+        _f = surrogate_design((self._x - self._mean) / self._scale, _t.hour * 3600 + _t.minute * 60 + _t.second,
+                               self._terms, self._harmonics)
+        _y = _f.dot(self._coef)[0]
+        _n = len(self._y)
+        self._y = _y[:_n] + 1j * _y[_n:]
+     
+    
+    def _local_bus_recv(self,outputs):
+        '''
+        _local_bus_recv(outputs)
+        
+        Local receive function.  Sends back the model outputs at the current time.
+        '''
+        ret = message.MessageCommonData()
+        for output in outputs.itervalues():
+            _param = output.copy()
+            _param.value = complex(self._y[self._output(output)])
+            ret.add_param(_param)
+            
+        ret.time = self.sim_time
+        
+        return ret
+
+    def _local_bus_recv_into(self,outputs,out_params,row):
+        '''
+        _local_bus_recv_into(outputs,out_params,row)
+
+        Writes the model outputs at the current time directly into row.
+        '''
+        for i, output in enumerate(out_params):
+            row[i] = self._y[self._output(output)]
+    
+    @staticmethod
+    def generate_template(filename):
+        Bus.generate_template(filename, template=SurrogateBusParams)
+    
+    '''
+    Local functions
+    '''
+
+
+##########################################################
+# ReplayBus
+##########################################################
+
+class ReplayBus(Bus):
+    '''
+    Serves the outputs recorded by a RecordingBus (replay_file), so the aggregator side can be developed and
+    benchmarked against a recorded (e.g., GridLAB-D) run without the simulator.  The output at a simulation time
+    is the one recorded at the latest time <= it.
+    
+    The outputs are recorded as the wrapped bus returned them (i.e., already translated), so the ReplayBus should
+    use the default BusTranslator.  Inputs are ignored unless check_inputs is set, in which case a transaction input 
+    that differs from the recorded one raises an Exception.
+    '''
+    
+    def __init__(self,json_file):
+        super(ReplayBus,self).__init__(json_file)
+        self.replay_file  = self._json_to_obj(json_file, ReplayBusParams.REPLAY_FILE_KEY)
+        self.check_inputs = self._json_to_bool(json_file, ReplayBusParams.CHECK_INPUTS_KEY)
+        if self.replay_file is None:
+            raise Exception('ReplayBus requires %s' % ReplayBusParams.REPLAY_FILE_KEY)
+        
+        self._k = -1
+    
+    def load_record(self,filename):
+        '''
+        load_record(filename)
+        
+        Reads the recorded times, outputs and inputs.  Throws an Exception if a bus output was not recorded.
+        '''
+        from buspy.analyze.loaders.record import read_record
+        _record = read_record(filename)
+        self._times = _record['time']
+        self._out = _record['outputs']
+        self._in = _record['inputs']
+        
+        for param in ReplayBus.param_dict_itervalues(self.bus_out):
+            self._output(param)
+    
+    def _output(self,param):
+        '''
+        The recorded column of the CommonParam
+        '''
+        try:
+            return self._out[(param.name, param.param)]
+        except KeyError:
+            raise Exception('ReplayBus record %s has no output %s' % (self.replay_file, param_to_key(param.name, param.param)))
+    
+    '''
+    Bus interface implementation
+    '''
+    def start_bus(self):
+        self._enter_folder()
+        self.debug_instance.open()
+        self.debug_instance.write('Running on host %s with python pid %s'%(socket.gethostname(),os.getpid()), self.folder)
+        self.load_record(self.replay_file)
+        self._leave_folder()
+
+    def stop_bus(self):
+        self._save_timing()
+        self.debug_instance.close()
+    
+    def transaction(self,inputs=None,outputs=None,overwrite_output=False,trans_state=Bus.TRANSACTION_ALL):
+        '''
+        Checks the (untranslated, as recorded) inputs against the record after the time step if check_inputs is set.
+        '''
+        #transaction expands the special inputs in place, so take the inputs as sent first
+        _sent = []
+        if self.check_inputs and inputs is not None and trans_state in (Bus.TRANSACTION_ALL, Bus.TRANSACTION_INPUTS):
+            _sent = [((param.name, param.param), param.value) for param in inputs.itervalues()]
+        
+        _out = super(ReplayBus,self).transaction(inputs,outputs,overwrite_output,trans_state)
+        
+        for key, value in _sent:
+            _recorded = self._in[key][self._row()] if key in self._in else np.nan
+            if not np.isclose(_to_complex(value), _recorded):
+                raise Exception('ReplayBus input %s = %s at %s differs from the recorded input %s' % 
+                                (param_to_key(*key), value, self.sim_time.current_time, _recorded))
+        
+        return _out
+        
+    def _local_bus_send(self,inputs):
+        pass
+    
+    def _local_bus_runto(self,time=None):
+        self._k = self._row()
+    
+    def _local_bus_recv(self,outputs):
+        '''
+        _local_bus_recv(outputs)
+        
+        Local receive function.  Sends back the recorded outputs at the current time.
+        '''
+        ret = message.MessageCommonData()
+        for output in outputs.itervalues():
+            _param = output.copy()
+            _param.value = self._output(output)[self._k]
+            ret.add_param(_param)
+            
+        ret.time = self.sim_time
+        
+        return ret
+
+    def _local_bus_recv_into(self,outputs,out_params,row):
+        '''
+        _local_bus_recv_into(outputs,out_params,row)
+
+        Writes the recorded outputs at the current time directly into row.
+        '''
+        for i, output in enumerate(out_params):
+            row[i] = self._output(output)[self._k]
+    
+    @staticmethod
+    def generate_template(filename):
+        Bus.generate_template(filename, template=ReplayBusParams)
+    
+    '''
+    Local functions
+    '''
+    def _row(self):
+        '''
+        Index of the latest recorded time <= the current time
+        '''
+        _k = np.searchsorted(self._times, pd.Timestamp(self.sim_time.current_time).value, side='right') - 1
+        if _k < 0:
+            raise Exception('ReplayBus record %s starts after %s' % (self.replay_file, self.sim_time.current_time))
+        return _k
+
+
 ##########################################################
 # MultiNodeBus
 ##########################################################
@@ -1078,6 +2478,10 @@ class MultiNodeBus(Bus):
         
         for a in json_file[MultiNodeBusParams.ACTION_KEY]:
             self._actions.append(action.json_to_action(a))
+        
+        #the sub-Bus objects did not exist when Bus.__init__ enabled timing
+        if self.timing_file != None:
+            self.enable_timing()
             
         self._leave_folder()
         
@@ -1091,6 +2495,29 @@ class MultiNodeBus(Bus):
             except Exception as e:
                 self.debug_instance.write('failed to set_path for %s (%s)' % (str(bus),str(e)))
     
+    def enable_timing(self):
+        '''
+        Enables the phase timers of the MultiNodeBus and all sub-Bus objects.  The MultiNodeBus phases are
+        the totals across the sub-Bus objects; each sub-Bus keeps its own per-phase times.
+        '''
+        super(MultiNodeBus,self).enable_timing()
+        for bus in getattr(self,'_buses',[]):
+            bus.enable_timing()
+        return self.timers
+    
+    def _timer_phases(self):
+        return [TIMER_TRANSLATE_INPUT, TIMER_SEND, TIMER_RUNTO, TIMER_POLL, TIMER_RECV, 
+                TIMER_ACTIONS, TIMER_TRANSLATE_OUTPUT]
+    
+    def _write_timing(self,filename,access_flag='w',group=''):
+        '''
+        Writes the MultiNodeBus timings, and those of each sub-Bus under children/<index>/ (recursively, so a nested
+        MultiNodeBus writes its own children under children/<index>/children/<index>/).
+        '''
+        self.timers.to_hdf5(filename, access_flag=access_flag, group=group)
+        for b_num in range(len(self._buses)):
+            self._buses[b_num]._write_timing(filename, access_flag='a', group='%schildren/%d/' % (group, b_num))
+    
     '''
     Bus interface implementation
     '''
@@ -1109,6 +2536,7 @@ class MultiNodeBus(Bus):
     def stop_bus(self):
         for bus in self._buses:
             bus.stop_bus()
+        self._save_timing()
         self.debug_instance.close()
     
     def transaction(self,inputs,run_serial=False,*args,**kwargs):
@@ -1126,14 +2554,16 @@ class MultiNodeBus(Bus):
         '''
         self._enter_folder()
         
-        _trans_inputs = self.bus_translator.translate_input(inputs)
+        with self.timers.timed(TIMER_TRANSLATE_INPUT):
+            _trans_inputs = self.bus_translator.translate_input(inputs)
         output_list = [_trans_inputs.gld_io]
         
         #advance time in the simulation
         self._local_advance_time(_trans_inputs.time)
         
-        for io in _trans_inputs.itervalues():
-            self.debug_instance.write('[SEND]: ' + str(_trans_inputs.time) + '\t' + str(io.name) + '.' + str(io.param) + ' = ' + str(io.value), self.folder)
+        if self.debug_instance.trace_level >= TRACE_IO:
+            for io in _trans_inputs.itervalues():
+                self.debug_instance.trace(TRACE_SEND, _trans_inputs.time, self.folder, io.name, io.param, io.value)
         
         #do the old method of serially running sub-Bus objects
         if run_serial:
@@ -1142,37 +2572,99 @@ class MultiNodeBus(Bus):
         else:
             #do the transaction for each of the sub-Bus objects ONE STEP AT A TIME
             #INPUTS
-            for bus in self._buses:
-                bus.transaction(_trans_inputs,outputs=self.bus_out,overwrite_output=False,trans_state=Bus.TRANSACTION_INPUTS)
+            with self.timers.timed(TIMER_SEND):
+                for bus in self._buses:
+                    bus.transaction(_trans_inputs,outputs=self.bus_out,overwrite_output=False,trans_state=Bus.TRANSACTION_INPUTS)
                 
             #RUN_START
-            for bus in self._buses:
-                bus.transaction(_trans_inputs,outputs=self.bus_out,overwrite_output=False,trans_state=Bus.TRANSACTION_RUNTO)
+            with self.timers.timed(TIMER_RUNTO):
+                for bus in self._buses:
+                    bus.transaction(_trans_inputs,outputs=self.bus_out,overwrite_output=False,trans_state=Bus.TRANSACTION_RUNTO)
             
             #RUN_CHECK
-            for bus in self._buses:
-                bus.transaction(_trans_inputs,outputs=self.bus_out,overwrite_output=False,trans_state=Bus.TRANSACTION_RUNTO_POLL)
+            with self.timers.timed(TIMER_POLL):
+                for bus in self._buses:
+                    bus.transaction(_trans_inputs,outputs=self.bus_out,overwrite_output=False,trans_state=Bus.TRANSACTION_RUNTO_POLL)
             
             #OUTPUTS
-            for bus in self._buses:
-                output_list.append(bus.transaction(_trans_inputs,outputs=self.bus_out,overwrite_output=False,trans_state=Bus.TRANSACTION_OUTPUTS).gld_io)
+            with self.timers.timed(TIMER_RECV):
+                for bus in self._buses:
+                    output_list.append(bus.transaction(_trans_inputs,outputs=self.bus_out,overwrite_output=False,trans_state=Bus.TRANSACTION_OUTPUTS).gld_io)
                 
         #perform the actions on the outputs.  
-        output_list.append({})
-        for a in self._actions:
-            param = a.execute(output_list)
-            output_list[-1].setdefault(param.name,{})[param.param] = param
+        with self.timers.timed(TIMER_ACTIONS):
+            output_list.append({})
+            for a in self._actions:
+                param = a.execute(output_list)
+                output_list[-1].setdefault(param.name,{})[param.param] = param
             
         ret = message.MessageCommonData()
         ret.gld_io = output_list[-1]
         ret.time = self.sim_time
         
-        for io in ret.itervalues():
-            self.debug_instance.write('[RECV]: ' + str(_trans_inputs.time) + '\t' + str(io.name) + '.' + str(io.param) + ' = ' + str(io.value), self.folder)
+        if self.debug_instance.trace_level >= TRACE_IO:
+            for io in ret.itervalues():
+                self.debug_instance.trace(TRACE_RECV, _trans_inputs.time, self.folder, io.name, io.param, io.value)
         
         self._leave_folder()
-        return self.bus_translator.translate_output(ret)
-    
+        
+        with self.timers.timed(TIMER_TRANSLATE_OUTPUT):
+            ret = self.bus_translator.translate_output(ret)
+        return ret
+
+    def run(self,inputs_frame=None,outputs=None):
+        '''
+        Bus.run for the MultiNodeBus.  The sub-Bus objects are stepped ONE STEP AT A TIME (as in transaction) into their
+        own result arrays, then the actions are performed once on the whole columns.
+        '''
+        if outputs != None:
+            self.debug_instance.write('WARNING: additional outputs are ignored in MultiNodeBus.run', self.folder)
+
+        self._enter_folder()
+
+        _grid = self._run_time_grid()
+
+        _translated, _frame = None, None
+        if inputs_frame is not None:
+            with self.timers.timed(TIMER_TRANSLATE_INPUT):
+                _translated = self.bus_translator.translate_input_frame(inputs_frame)
+                _frame = _align_to_grid(_translated, _grid)[0]
+
+        #as in transaction, each sub-Bus translates and expands the special inputs itself
+        _runs = [_BusRun(bus, bus._run_input_frame(_translated, _grid), _grid, self.bus_out) for bus in self._buses]
+
+        for k in xrange(len(_grid)):
+            self._local_advance_time(time=None)
+            for trans_state, timer in ((Bus.TRANSACTION_INPUTS, TIMER_SEND), (Bus.TRANSACTION_RUNTO, TIMER_RUNTO),
+                                       (Bus.TRANSACTION_RUNTO_POLL, TIMER_POLL), (Bus.TRANSACTION_OUTPUTS, TIMER_RECV)):
+                with self.timers.timed(timer):
+                    for _run in _runs:
+                        _run.step(k, trans_state)
+
+        #perform the actions on the output columns
+        _inputs = {}
+        if _frame is not None:
+            for col in _frame.columns:
+                _name, _param = key_to_param(col)
+                _inputs.setdefault(_name,{})[_param] = message.CommonParam(name=_name, param=_param, value=_frame[col].values)
+
+        with self.timers.timed(TIMER_ACTIONS):
+            output_list = [_inputs] + [_run.columns() for _run in _runs]
+            output_list.append({})
+            for a in self._actions:
+                param = a.execute(output_list)
+                output_list[-1].setdefault(param.name,{})[param.param] = param
+
+        _ret = pd.DataFrame(index=_grid)
+        for param in Bus.param_dict_itervalues(output_list[-1]):
+            _ret[param_to_key(param.name, param.param)] = param.value if param.value is not None else np.nan
+
+        self._leave_folder()
+
+        with self.timers.timed(TIMER_TRANSLATE_OUTPUT):
+            _ret = self.bus_translator.translate_output_frame(_ret)
+        return _ret
+
     @staticmethod
     def generate_template(filename):
         Bus.generate_template(filename, template=MultiNodeBusParams)
@@ -1180,6 +2672,341 @@ class MultiNodeBus(Bus):
     '''
     Local functions
     '''
+
+
+##########################################################
+# CachedBus
+##########################################################
+
+class CachedBus(object):
+    '''
+    Wraps a Bus so that runs repeating an earlier run of the same bus (e.g., the shared prefix of the scenarios of a
+    sensitivity sweep) are served from a persistent TransactionCache instead of simulated.
+    
+    Each result is keyed by a chain of hashes: the bus params (without its folder) and the contents of the files they 
+    name, then for every transaction the simulation time, the inputs (quantized to QUANTIZE_DIGITS significant digits)
+    and the requested outputs.  So a result is only reused when the whole input history up to it is the same.
+    
+    The wrapped bus is not started until the first miss.  As its state depends on every input it has been sent, the
+    transactions served from the cache so far are then replayed into it before it continues the run.  Any other
+    attribute is that of the wrapped bus.
+    
+    As a MultiNodeBus sub-Bus, the one trans_state at a time transactions and the Bus.run steps (_run_step) are 
+    cached too: the inputs are hashed at TRANSACTION_INPUTS and the result is looked up (or stored) at 
+    TRANSACTION_OUTPUTS.  Until the first miss the other states do nothing, and a miss at TRANSACTION_OUTPUTS runs
+    that whole transaction on the wrapped bus.
+    '''
+    
+    QUANTIZE_DIGITS = 9
+    
+    #params naming files the bus writes (so their contents are not part of the params hash)
+    OUTPUT_FILE_KEYS = (BusParams.DEBUG_ARGS_KEY, BusParams.TIMING_FILE_KEY, BusParams.RECORD_FILE_KEY,
+                        BusParams.TRANSACTION_CACHE_KEY, FileBusParams.SAVE_INPUT_FILE_KEY)
+    
+    def __init__(self,bus,cache=None):
+        '''
+        cache is a TransactionCache (default: the transaction_cache of the bus params)
+        '''
+        self.bus = bus
+        if cache is None:
+            _size = Bus._json_to_obj(bus.params, BusParams.TRANSACTION_CACHE_SIZE_KEY)
+            if _size is None:
+                _size = DEFAULT_TRANSACTION_CACHE_SIZE
+            cache = TransactionCache(bus._folder_path(bus.params[BusParams.TRANSACTION_CACHE_KEY]),
+                                     int(_size * 1024 * 1024))
+        self.cache = cache
+        
+        self.sim_time = deepcopy(bus.sim_time)
+        self.finished = bus.finished
+        
+        self.__key = self.__params_hash()
+        self.__started = False
+        self.__live = False
+        
+        #(method, args) of the transactions/runs served from the cache but not yet sent to the bus
+        self.__pending = []
+        
+        #(key, args, live) of the transaction being stepped one trans_state at a time
+        self.__staged = None
+    
+    def __getattr__(self,name):
+        return getattr(self.bus, name)
+    
+    @property
+    def live(self):
+        '''
+        True once the wrapped bus has been started (i.e., after the first miss)
+        '''
+        return self.__live
+    
+    def start_bus(self):
+        self.__started = True
+    
+    def stop_bus(self):
+        if self.__live:
+            self.bus.stop_bus()
+        self.cache.flush()
+    
+    def transaction(self,inputs=None,outputs=None,overwrite_output=False,trans_state=Bus.TRANSACTION_ALL):
+        '''
+        Same as Bus.transaction.
+        '''
+        _args = (inputs, outputs, overwrite_output)
+        if trans_state == Bus.TRANSACTION_ALL:
+            return self.__cached(self.__next_key('transaction', self.__messages_hash(*_args)), self.bus.transaction, _args)
+        
+        if trans_state == Bus.TRANSACTION_INPUTS:
+            self.__stage('transaction', _args, inputs, outputs, overwrite_output)
+        
+        _key, _args, _live = self.__staged
+        if _live:
+            _out = self.bus.transaction(inputs, outputs, overwrite_output, trans_state)
+            if trans_state == Bus.TRANSACTION_OUTPUTS:
+                self.__store(_key, _out)
+            return _out
+        
+        if trans_state == Bus.TRANSACTION_OUTPUTS:
+            return self.__cached(_key, self.bus.transaction, _args)
+        return None
+    
+    def _run_step(self,inputs,outputs,out_params,row,trans_state=Bus.TRANSACTION_ALL):
+        '''
+        Bus.run step of a MultiNodeBus sub-Bus (see _BusRun), cached as transaction.
+        '''
+        if trans_state in (Bus.TRANSACTION_ALL, Bus.TRANSACTION_INPUTS):
+            #the args of the whole step, for a miss (or a replay) before the wrapped bus is live
+            _args = None
+            if not self.__live:
+                _args = (deepcopy(inputs), outputs, out_params, np.empty(len(out_params), dtype=complex), Bus.TRANSACTION_ALL)
+            self.__stage('step', _args, inputs, outputs, False)
+        
+        _key, _args, _live = self.__staged
+        if _live:
+            self.bus._run_step(inputs, outputs, out_params, row, trans_state)
+            if trans_state in (Bus.TRANSACTION_ALL, Bus.TRANSACTION_OUTPUTS):
+                self.__store(_key, row.copy())
+        elif trans_state in (Bus.TRANSACTION_ALL, Bus.TRANSACTION_OUTPUTS):
+            row[:] = self.__cached(_key, self.__step, _args)
+    
+    def run(self,inputs_frame=None,outputs=None):
+        '''
+        Same as Bus.run.  The whole run is a single cache entry.
+        '''
+        _args = (inputs_frame, outputs)
+        _key = self.__next_key('run', frame_hash(inputs_frame, self.QUANTIZE_DIGITS) + self.__messages_hash(None, outputs, False))
+        return self.__cached(_key, self.bus.run, _args)
+    
+    '''
+    Local functions
+    '''
+    def __cached(self,key,method,args):
+        if not self.__live:
+            _hit = self.cache.get(key)
+            if _hit is not None:
+                _out, _time, self.finished = pickle.loads(_hit)
+                self.sim_time.current_time = _time
+                self.__pending.append((method, deepcopy(args)))
+                self.__key = key
+                return _out
+            self.__go_live()
+        
+        _out = method(*args)
+        self.__store(key, _out)
+        return _out
+    
+    def __store(self,key,out):
+        self.__key = key
+        self.finished = self.bus.finished
+        self.cache.put(key, pickle.dumps((out, self.bus.sim_time.current_time, self.bus.finished), pickle.HIGHEST_PROTOCOL))
+    
+    def __stage(self,method,args,inputs,outputs,overwrite_output):
+        '''
+        Keys the transaction stepped one trans_state at a time.  Hashed before the inputs reach the wrapped bus, which
+        expands the special inputs in place.
+        '''
+        self.__staged = (self.__next_key(method, self.__messages_hash(inputs, outputs, overwrite_output)), args, self.__live)
+    
+    def __step(self,inputs,outputs,out_params,row,trans_state):
+        self.bus._run_step(inputs, outputs, out_params, row, trans_state)
+        return row.copy()
+    
+    def __go_live(self):
+        '''
+        Starts the wrapped bus and replays the transactions served from the cache so far.
+        '''
+        if self.__live:
+            return
+        
+        self.__live = True
+        if self.__started:
+            self.bus.start_bus()
+        for method, args in self.__pending:
+            method(*args)
+        self.__pending = []
+        
+        self.sim_time = self.bus.sim_time
+        self.finished = self.bus.finished
+    
+    def __next_key(self,method,data):
+        return hashlib.sha1('%s|%s|%s|%s' % (self.__key, method, self.sim_time.current_time, data)).hexdigest()
+    
+    def __params_hash(self):
+        '''
+        Hash of the bus params (without folder and the transaction cache settings) and of the input files they name
+        '''
+        _params = dict(self.bus.params)
+        for key in (BusParams.FOLDER_KEY, BusParams.TRANSACTION_CACHE_KEY, BusParams.TRANSACTION_CACHE_SIZE_KEY):
+            _params.pop(key, None)
+        
+        _hash = hashlib.sha1(self.bus.__class__.__name__)
+        _hash.update(json.dumps(_params, sort_keys=True, default=str))
+        
+        def _files(value):
+            if isinstance(value, dict):
+                for key, item in value.iteritems():
+                    if key not in self.OUTPUT_FILE_KEYS:
+                        _files(item)
+            elif isinstance(value, (list, tuple)):
+                for item in value:
+                    _files(item)
+            elif isinstance(value, basestring):
+                _path = self.bus._folder_path(value)
+                if os.path.isfile(_path):
+                    with open(_path, 'rb') as f:
+                        _hash.update(value)
+                        _hash.update(f.read())
+        _files(_params)
+        
+        return _hash.hexdigest()
+    
+    def __messages_hash(self,inputs,outputs,overwrite_output):
+        _hash = hashlib.sha1(str(overwrite_output))
+        def _update(*items):
+            for item in items:
+                #names loaded from json are unicode, the quantized values are bytes
+                _hash.update(item.encode('utf-8') if isinstance(item, unicode) else item)
+                _hash.update('|')
+        
+        if isinstance(inputs, dict):
+            #e.g., the AggregatorBusTranslator inputs
+            for key in sorted(inputs):
+                _update(str(key), quantize(inputs[key], self.QUANTIZE_DIGITS))
+        elif inputs is not None:
+            _update(str(inputs.time))
+            for param in sorted(inputs.itervalues(), key=lambda p: (p.name, p.param)):
+                _update(param_to_key(param.name, param.param), quantize(param.value, self.QUANTIZE_DIGITS))
+        if outputs is not None:
+            #a MessageCommonData, or the gld_io dict of one (e.g., the bus_out a MultiNodeBus passes on)
+            _outputs = Bus.param_dict_itervalues(outputs) if isinstance(outputs, dict) else outputs.itervalues()
+            _update('outputs')
+            for param in sorted(_outputs, key=lambda p: (p.name, p.param)):
+                _update(param_to_key(param.name, param.param))
+        return _hash.hexdigest()
+
+
+##########################################################
+# RecordingBus
+##########################################################
+
+def _message_values(message):
+    '''
+    ('name.param', complex value) of each CommonParam of a MessageCommonData, or (key, complex value) of each entry of a 
+    dict message (e.g., of the AggregatorBusTranslator, without its time entry)
+    '''
+    if isinstance(message, dict):
+        return [(str(key), _to_complex(value)) for key, value in message.iteritems() 
+                if key != AggregatorBusTranslator.IN_TIME_KEY]
+    return [(param_to_key(param.name, param.param), _to_complex(param.value)) for param in message.itervalues()]
+
+class RecordingBus(object):
+    '''
+    Wraps a Bus and records every input sent to it and every output it returns (by simulation time) to an HDF5 file
+    when the bus is stopped.  The file is read by ReplayBus.  Any other attribute is that of the wrapped bus.
+    
+    The file holds 'time' (int64 nanoseconds since the epoch), and 'outputs' and 'inputs' (time x column complex
+    arrays, NaN where nothing was recorded) with a 'columns' attribute of 'name.param' labels (see 
+    buspy.analyze.loaders.record).  Inputs are recorded as sent (before translation) at the time of the step they were
+    sent in, and outputs as returned (after translation).  The columns of dict messages (e.g., of the AggregatorBusTranslator) are their keys.
+    
+    As a MultiNodeBus sub-Bus in MultiNodeBus.run, each step is recorded through _run_step, with the inputs as 
+    translated (and their special inputs expanded) for the sub-Bus.
+    '''
+    
+    def __init__(self,bus,filename=None):
+        '''
+        filename defaults to the record_file of the bus params (relative to its folder)
+        '''
+        self.bus = bus
+        if filename is None:
+            filename = bus._folder_path(bus.params[BusParams.RECORD_FILE_KEY])
+        self.filename = filename
+        
+        #chunks of (times, input columns, input values, output columns, output values)
+        self.__chunks = []
+        self.__inputs = {}
+    
+    def __getattr__(self,name):
+        return getattr(self.bus, name)
+    
+    def start_bus(self):
+        self.bus.start_bus()
+    
+    def stop_bus(self):
+        self.bus.stop_bus()
+        self.save()
+    
+    def transaction(self,inputs=None,outputs=None,overwrite_output=False,trans_state=Bus.TRANSACTION_ALL):
+        #before the transaction, which expands the special inputs in place
+        if inputs is not None and trans_state in (Bus.TRANSACTION_ALL, Bus.TRANSACTION_INPUTS):
+            self.__inputs.update(_message_values(inputs))
+        
+        _out = self.bus.transaction(inputs, outputs, overwrite_output, trans_state)
+        
+        if _out is not None:
+            self.__record_outputs(_message_values(_out))
+        
+        return _out
+    
+    def _run_step(self,inputs,outputs,out_params,row,trans_state=Bus.TRANSACTION_ALL):
+        '''
+        Bus.run step of a MultiNodeBus sub-Bus (see _BusRun)
+        '''
+        if inputs is not None and trans_state in (Bus.TRANSACTION_ALL, Bus.TRANSACTION_INPUTS):
+            self.__inputs.update(_message_values(inputs))
+        
+        self.bus._run_step(inputs, outputs, out_params, row, trans_state)
+        
+        if trans_state in (Bus.TRANSACTION_ALL, Bus.TRANSACTION_OUTPUTS):
+            self.__record_outputs([(param_to_key(param.name, param.param), row[i]) for i, param in enumerate(out_params)])
+    
+    def run(self,inputs_frame=None,outputs=None):
+        _out = self.bus.run(inputs_frame, outputs)
+        
+        _in_cols, _in_values = [], np.empty((len(_out), 0))
+        if inputs_frame is not None:
+            _aligned, _has_input = _align_to_grid(inputs_frame, _out.index)
+            _in_cols = [str(col) for col in _aligned.columns]
+            _in_values = np.asarray(_aligned.values, dtype=complex)
+        
+        self.__chunks.append((list(_out.index), _in_cols, _in_values,
+                              [str(col) for col in _out.columns], np.asarray(_out.values, dtype=complex)))
+        return _out
+    
+    def __record_outputs(self,outputs):
+        '''
+        Records the outputs [(column, value)] and the inputs sent since the last outputs at the bus time.
+        '''
+        self.__chunks.append(([self.bus.sim_time.current_time], self.__inputs.keys(), [self.__inputs.values()],
+                              [col for col, _ in outputs], [[value for _, value in outputs]]))
+        self.__inputs = {}
+    
+    def save(self):
+        '''
+        Writes everything recorded so far to filename.
+        '''
+        from buspy.analyze.loaders.record import write_record
+        write_record(self.filename, self.__chunks)
+        return self.filename
         
         
 ###############################################################
@@ -1212,6 +3039,23 @@ class BusTranslator(object):
         Default behavior is to do nothing.  Subclasses should change this if different behavior is required.
         '''
         return outputs
+
+    def translate_input_frame(self,inputs):
+        '''
+        Translates the inputs_frame (pandas.DataFrame indexed by time) to a Bus.run.  The translated columns
+        are 'name.param' labels.
+
+        Default behavior is to do nothing.  Subclasses should change this if different behavior is required.
+        '''
+        return inputs
+
+    def translate_output_frame(self,outputs):
+        '''
+        Translates the (time x output) pandas.DataFrame returned by a Bus.run.
+
+        Default behavior is to do nothing.  Subclasses should change this if different behavior is required.
+        '''
+        return outputs
     
     def translate_init(self,init):
         '''
@@ -1276,6 +3120,28 @@ class AggregatorBusTranslator(object):
         _new_out[AggregatorBusTranslator.IN_TIME_KEY] = str(outputs.time.current_time)
         
         return _new_out
+
+    def translate_input_frame(self,inputs):
+        '''
+        Translates the voltage_real and voltage_imag columns of a pandas.DataFrame to the positive sequence voltage column
+        '''
+        _voltage = (inputs[AggregatorBusTranslator.IN_V_RE_KEY].values + inputs[AggregatorBusTranslator.IN_V_IM_KEY].values * 1.0j) * self.BASE_KV * 1000 / np.sqrt(3.0)
+
+        return pd.DataFrame({param_to_key(AggregatorBusTranslator.BUS_VOLTAGE_NAME, AggregatorBusTranslator.BUS_VOLTAGE_PARAM) : _voltage},
+                            index=inputs.index)
+
+    def translate_output_frame(self,outputs):
+        '''
+        Translates the summed power column of a pandas.DataFrame to the load_real and load_imag columns (in MW)
+        '''
+        _key = param_to_key(AggregatorBusTranslator.BUS_POWER_NAME, None)
+        _val = outputs[_key].values if _key in outputs else np.zeros(len(outputs.index), dtype=complex)
+
+        _new_out = pd.DataFrame(index=outputs.index)
+        _new_out[AggregatorBusTranslator.OUT_P_RE_KEY] = _val.real/1e6
+        _new_out[AggregatorBusTranslator.OUT_P_IM_KEY] = _val.imag/1e6
+
+        return _new_out
     
     def translate_init(self,init):
         '''
@@ -70,20 +70,22 @@ To-Do List:
 # IMPORTS
 ######################################################################
 from __future__ import print_function
-import pandas as pd
-import xml.etree.ElementTree as ET
 import buspy.comm.message as message
 
+#pandas, the XML parser, the http client and subprocess are imported on first use (see buspy.utils.lazy)
+from buspy.utils.lazy import lazy_import
+pd = lazy_import('pandas')
+ET = lazy_import('xml.etree.ElementTree')
+
 #for GridLAB-D subprocess
 import sys
 
-#Use the new python3.2 version of subprocess that is better for multi-threaded. Only works on Linux
-try:
-    import subprocess32 as subprocess
-except ImportError:
-    import subprocess
+def _subprocess32_warning():
     print("WARNING Importing subprocess32 failed. Using subprocess which is known unstable for multi-threaded environments")
 
+#Use the new python3.2 version of subprocess that is better for multi-threaded. Only works on Linux
+subprocess = lazy_import('subprocess32', fallback='subprocess', on_fallback=_subprocess32_warning)
+
 try:
     from Queue import Empty
 except ImportError:
@@ -92,14 +94,7 @@ from buspy.utils.debug import DebugThread
 
 #for http connection to gridlab
 import urllib
-try:
-    import httplib as http
-    from httplib import CannotSendRequest
-    from httplib import BadStatusLine
-except ImportError:
-    import http.client as http
-    from http.client import CannotSendRequest
-    from http.client import BadStatusLine
+http = lazy_import('httplib', fallback='http.client')
 
 import os
 import re
@@ -116,7 +111,6 @@ import socket
 
 #errors
 from socket import error as socket_error
-from xml.etree.ElementTree import ParseError as xml_parse_error
 
 import atexit
 
@@ -399,7 +393,7 @@ class GridlabHttpControlStrings:
     def xml_to_valstr(self,txt):
         try:
             xml = ET.fromstring(txt).find('value').text
-        except xml_parse_error:
+        except ET.ParseError:
             xml = ''  
         return xml
     
@@ -424,6 +418,9 @@ class GridlabCommHttp(GridlabCommBase):
         self._gld_instance = None
         self.connected = False
         
+        #HTTP status of the last reply (None if the last request failed)
+        self.last_status = None
+        
         self.GLD_START_TIMEOUT = 20 #Number of seconds to keep trying to connect via http
         self.GLD_START_CHECK_DELAY = 0.1 #Number of seconds after starting to pause before checking
         self.GLD_START_RETRYS = 10
@@ -685,11 +682,14 @@ class GridlabCommHttp(GridlabCommBase):
         self._gld_instance.wait()
     
     def _gridlab_comm(self,msg,xml=True,write_log=True):
+        self.last_status = None
         try:
             if write_log:
                 self.debug.write('[RAW SEND]: ' + str(msg), self.debug_label)
             self.connection.request('GET', msg)
-            out = self.connection.getresponse().read()
+            _response = self.connection.getresponse()
+            self.last_status = _response.status
+            out = _response.read()
             if write_log:
                 self.debug.write('[RAW RECV]: ' + str(out), self.debug_label)
         except socket_error as e:
@@ -697,12 +697,12 @@ class GridlabCommHttp(GridlabCommBase):
                 self.debug.write('WARNING: GridLAB-D Socket closed: ' + e.strerror, self.debug_label)
             out = ''
             self.connected = False
-        except CannotSendRequest as err:
+        except http.CannotSendRequest as err:
             if write_log:
                 self.debug.write('WARNING: GridLAB-D Comm error: CannotSendRequest ' + str(err), self.debug_label)
             out = ''
             self.connected = False
-        except BadStatusLine as err:
+        except http.BadStatusLine as err:
             if write_log:
                 self.debug.write('WARNING: GridLAB-D Comm error: BadStatusLine (' + str(err.line) + ') ' + str(err), self.debug_label)
             out = ''
@@ -718,6 +718,17 @@ class GridlabCommHttp(GridlabCommBase):
         else:
             return out
     
+    def has_value(self,obj,param):
+        '''
+        Returns True if GridLAB-D has obj.param (its value may be empty, e.g., an unset parent), False if it answers 
+        that there is no such object or property (HTTP 404), or None if it does not answer (the connection failed or
+        any other status)
+        '''
+        self._get_object(obj, param)
+        if not self.connected or self.last_status not in (http.OK, http.NOT_FOUND):
+            return None
+        return self.last_status == http.OK
+    
     def _set_object(self,obj,param,val,unit=None):
         self._gridlab_comm(self._control.obj_to_str(obj,param,val,unit),xml=False)
     
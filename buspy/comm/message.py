@@ -61,8 +61,9 @@ To-Do List:
 ######################################################################
 # IMPORTS
 ######################################################################
-import pandas as pd
 from datetime import timedelta
+from buspy.utils.lazy import lazy_import
+pd = lazy_import('pandas')
 
 ######################################################################
 # UTILITY FUNCTIONS
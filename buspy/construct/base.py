@@ -52,9 +52,10 @@ import copy
 import datetime as dt
 import json
 import marshal
-import numpy
 import os
-import pandas as pds
+from buspy.utils.lazy import lazy_import
+numpy = lazy_import('numpy')
+pds = lazy_import('pandas')
 import re
     
 class ParamDescriptor(object):
@@ -289,6 +290,21 @@ class ParamsEncoder(json.JSONEncoder):
             result += "{:s}\n\n".format(str(descriptor))
         return result
         
+    def clone(self):
+        """
+        Returns a copy of this Params object without rebuilding its schema.  The values 
+        are copied (containers recursively), but the schema is shared with this object, so
+        set_parse_args on either affects both.
+        
+        @rtype: Params
+        @return: copy of this Params object
+        """
+        result = self.__class__.__new__(self.__class__)
+        result.__dict__.update(self.__dict__)
+        for key, value in self.items():
+            dict.__setitem__(result, key, copy_json_value(value))
+        return result
+        
     def schema(self):
         """
         Returns a deep copy of the schema. (A Params schema cannot be modified, but others 
@@ -441,6 +457,26 @@ def load_json_file(p):
     assert(isinstance(obj,dict))
     return obj
     
+def copy_json_value(value):
+    """
+    Copies a JSON-like value (nested dicts and lists).  Much faster than copy.deepcopy
+    for the values held by Params objects.
+    
+    @type value: any
+    @param value: value to copy
+    
+    @rtype: same type as value
+    @return: copy of the dicts and lists in value; other objects are shared
+    """
+    if isinstance(value, dict):
+        result = value.__class__()
+        for key, item in value.items():
+            result[key] = copy_json_value(item)
+        return result
+    if isinstance(value, list):
+        return [copy_json_value(item) for item in value]
+    return value
+    
 def print_choice_list(choices):
     """
     @type choices: list
@@ -68,6 +68,10 @@ To-Do List:
 # IMPORTS
 ######################################################################
 import logging
+import os
+import json
+import hashlib
+import marshal
 
 from buspy.construct.base import Params
 from buspy.construct.base import ParamDescriptor
@@ -133,6 +137,11 @@ class BusParams(Params):
     DEBUG_KEY   = 'debug'
     DEBUG_TYPE_KEY = 'debug_type'
     DEBUG_ARGS_KEY = 'debug_args'
+    TIMING_KEY  = 'timing'
+    TIMING_FILE_KEY = 'timing_file'
+    TRANSACTION_CACHE_KEY = 'transaction_cache'
+    TRANSACTION_CACHE_SIZE_KEY = 'transaction_cache_size'
+    RECORD_FILE_KEY = 'record_file'
     
     #time keys
     TIME_START_KEY  = 'start'
@@ -178,7 +187,29 @@ class BusParams(Params):
                            
             DEBUG_ARGS_KEY  :   {'description'      : 'Additional arguments to the debug_type constructor',
                                  'required'         : False,
-                                 'default_value'    : {}}    
+                                 'default_value'    : {}},
+                           
+            TIMING_KEY      :   {'description'      : 'Time each phase of every transaction (translate, send, runto, poll, recv).  The times are written to timing_file when the bus is stopped.',
+                                 'required'         : False,
+                                 'default_value'    : False},
+                           
+            TIMING_FILE_KEY :   {'description'      : 'HDF5 file, relative to folder, the phase timings are written to when timing is true.',
+                                 'required'         : False,
+                                 'parser'           : str,
+                                 'default_value'    : 'bus_timing.h5'},
+                           
+            TRANSACTION_CACHE_KEY :   {'description'      : 'SQLite file, relative to folder, of transaction results shared across runs (see CachedBus).  Transactions whose inputs, since the start of the run, match a previous run of the same bus are served from it.  Off when not set.',
+                                 'required'         : False,
+                                 'default_value'    : None},
+                           
+            TRANSACTION_CACHE_SIZE_KEY :   {'description'      : 'Size limit (MB) of transaction_cache.  The least recently used results are evicted past it.',
+                                 'required'         : False,
+                                 'parser'           : float,
+                                 'default_value'    : 512.0},
+                           
+            RECORD_FILE_KEY :   {'description'      : 'HDF5 file, relative to folder, every input and output of the bus is recorded to (see RecordingBus and ReplayBus).  Off when not set.',
+                                 'required'         : False,
+                                 'default_value'    : None}
                                              
     }
 
@@ -217,13 +248,31 @@ class BusParams(Params):
         except Exception as e:
             raise Exception('Could not load {} as a json file, because {}.'.format(filename, e))
         
+        return BusParams.from_dict(_json)
+
+    @staticmethod
+    def from_dict(_json, blanks=None):
+        '''
+        Converts an already parsed bus JSON (dict) into the BusParams class specified by the value at key='class_name'
+        
+        blanks - (optional) dict of class_name -> BusParams without values, filled in as needed.  The BusParams is 
+                 cloned from it instead of constructed, which skips building the schema (shared with the blank, see
+                 Params.clone).
+        '''
+        _json = dict(_json)
+        
         #get the name of the class we are interested in
         _bus_type = _json.pop(BusParams.CLASS_KEY,None)
         
         _bus_params = None
         try:
-            #call its constructor
-            _bus_params = globals()[_bus_type]()
+            if blanks is None:
+                #call its constructor
+                _bus_params = globals()[_bus_type]()
+            else:
+                if _bus_type not in blanks:
+                    blanks.setdefault(_bus_type, globals()[_bus_type]())
+                _bus_params = blanks[_bus_type].clone()
         except:
             raise Exception('Invalid class_name provided in JSON file: ' + str(_bus_type))
         
@@ -254,6 +303,12 @@ class GridlabBusParams(BusParams):
     POLL_KEY    = 'poll'
     EXT_GLD_KEY = 'external_gld'
     NAN_KEY     = 'use_NaN'
+    VALIDATE_KEY = 'validate_io'
+    
+    VALIDATE_OFF    = 'off'
+    VALIDATE_WARN   = 'warn'
+    VALIDATE_DROP   = 'drop'
+    VALIDATE_ERROR  = 'error'
     
     #gld parameter keys
     GLD_FORMAT_KEY  = 'format'
@@ -294,6 +349,11 @@ class GridlabBusParams(BusParams):
                                                            'parser'           : bool,
                                                            'default_value'    : False}
         
+        self._param_descriptions[self.VALIDATE_KEY]     = {'description'      : 'What to do with outputs and inputs that are not in the GridLAB-D model (objects missing from the .glm file, or properties GridLAB-D answers are not found), checked once when the bus starts (inputs and outputs added at transaction time when first used): off, warn (log them), drop (log them and never send or get them), or error (raise an Exception).',
+                                                           'required'         : False,
+                                                           'parser'           : str,
+                                                           'default_value'    : self.VALIDATE_DROP}
+        
         
         #Change GridLAB-D specific default ParamDescriptors
         self._param_descriptions[self.FOLDER_KEY]['description'] = 'Folder where the GridLAB-D *.glm is located.'
@@ -322,8 +382,20 @@ class FileBusParams(BusParams):
     
     #CONSTANTS###############
     SAVE_INPUT_KEY = 'save_input'
+    SAVE_INPUT_FILE_KEY = 'save_input_file'
+    INTERPOLATION_KEY = 'interpolation'
+    STREAM_KEY = 'stream'
+    STREAM_ROWS_KEY = 'stream_rows'
+    
+    DEFAULT_STREAM_ROWS = 100000
+    DEFAULT_SAVE_INPUT_FILE = 'inputs.h5'
+    
+    INTERPOLATION_HOLD = 'hold'
+    INTERPOLATION_LINEAR = 'linear'
     
     IO_FILE_KEY = 'filename'
+    IO_COLUMN_KEY = 'column'
+    IO_DATASET_KEY = 'dataset'
 
     def __init__(self, *arg, **kw):
         schema = OrderedDict()
@@ -332,13 +404,32 @@ class FileBusParams(BusParams):
         self._param_descriptions[self.BUS_KEY]['default_value'] = 'FileBus'
         
         self._param_descriptions[self.OUTPUT_KEY]['template_value'] = [{'name':'network_node','param':'measured_power',self.IO_FILE_KEY:'power.player'}]
-        self._param_descriptions[self.OUTPUT_KEY]['description'] = 'Parameters that will be OUTPUT FROM the bus using the specified file.  In the form of a list of JSON-objects with the following keys: name, param, filename.'
+        self._param_descriptions[self.OUTPUT_KEY]['description'] = 'Parameters that will be OUTPUT FROM the bus using the specified file.  In the form of a list of JSON-objects with the following keys: name, param, filename, column, dataset.  Column selects the column of a .csv or .h5 file, or the schedule of a .glm file (default: name.param); each file is only loaded once.  Dataset selects the dataset of a .h5 store (see buspy.analyze.loaders.hdf5_store).'
         
         #Add FileBus unique descriptors
         self._param_descriptions[self.SAVE_INPUT_KEY] = {'description'      : 'Flag determining whether the FileBus will save the provided inputs to transaction.',
                                                          'required'         : False,
                                                          'default_value'    : False} 
         
+        self._param_descriptions[self.SAVE_INPUT_FILE_KEY] = {'description'     : 'The file (.h5 or .csv, relative to folder) the inputs are saved to when save_input is set.  Inputs are buffered in memory and written in large chunks.',
+                                                              'required'        : False,
+                                                              'parser'          : str,
+                                                              'default_value'   : self.DEFAULT_SAVE_INPUT_FILE}
+        
+        self._param_descriptions[self.INTERPOLATION_KEY] = {'description'   : 'How the files are resampled onto the simulation times: hold (the value at the latest time <= the simulation time) or linear.',
+                                                            'required'      : False,
+                                                            'parser'        : str,
+                                                            'default_value' : self.INTERPOLATION_HOLD}
+        
+        self._param_descriptions[self.STREAM_KEY] = {'description'      : 'Flag determining whether the output files are read in chunks on a background thread, keeping only the rows around the simulation time in memory (for very large files).  Requires hold interpolation.',
+                                                     'required'         : False,
+                                                     'default_value'    : False}
+        
+        self._param_descriptions[self.STREAM_ROWS_KEY] = {'description'     : 'The number of rows in each chunk read by stream.',
+                                                          'required'        : False,
+                                                          'parser'          : int,
+                                                          'default_value'   : self.DEFAULT_STREAM_ROWS}
+        
         super(FileBusParams,self).__init__(schema, *arg, **kw)
     
     '''
@@ -391,18 +482,44 @@ class ResistorBusParams(BusParams):
     
     MAPPING_KEY = 'io_map'
     
+    #io_map keys (one JSON-object per ZIP load)
+    IN_NAME_KEY             = 'in_name'
+    OUT_NAME_KEY            = 'out_name'
+    NOMINAL_VOLTAGE_KEY     = 'nominal_voltage'
+    BASE_POWER_KEY          = 'base_power'
+    IMPEDANCE_FRACTION_KEY  = 'impedance_fraction'
+    CURRENT_FRACTION_KEY    = 'current_fraction'
+    POWER_FRACTION_KEY      = 'power_fraction'
+    IMPEDANCE_PF_KEY        = 'impedance_pf'
+    CURRENT_PF_KEY          = 'current_pf'
+    POWER_PF_KEY            = 'power_pf'
+    
     def __init__(self, *arg, **kw):
         schema = OrderedDict()
         
         self._param_descriptions[self.BUS_KEY]['default_value']    = 'ResistorBus'
-        #TODO: FINISH RESISTORBUS
         self._param_descriptions[self.OUTPUT_KEY]['template_value'] =  [{'name':'network_node','param':'measured_current_A'},
                                                                         {'name':'network_node','param':'measured_power'}]
         
         
-        self._param_descriptions[self.MAPPING_KEY] = {'description'      : 'Map of inputs to outputs.',
+        self._param_descriptions[self.MAPPING_KEY] = {'description'      : 'List of ZIP loads, one JSON-object each, with the keys (as in the GridLAB-D ZIPload): ' + 
+                                                                           'in_name (name of the voltage_A/B/C inputs, default network_node), ' +
+                                                                           'out_name (name of the outputs, default in_name), ' + 
+                                                                           'nominal_voltage (line-to-neutral V), ' +
+                                                                           'base_power (VA per phase, a number or [A,B,C]), ' +
+                                                                           'impedance_fraction, current_fraction, power_fraction (default 0, 0, 1), and ' +
+                                                                           'impedance_pf, current_pf, power_pf (negative is leading, default 1).  ' +
+                                                                           'The outputs may be measured_power, measured_power_A/B/C and measured_current_A/B/C.',
                                                       'required'         : True,
-                                                      'template_value'   : [{'in_name':''}]} 
+                                                      'template_value'   : [{self.IN_NAME_KEY            : 'network_node',
+                                                                             self.NOMINAL_VOLTAGE_KEY    : 7200.0,
+                                                                             self.BASE_POWER_KEY         : [1000.0, 1000.0, 1000.0],
+                                                                             self.IMPEDANCE_FRACTION_KEY : 0.2,
+                                                                             self.CURRENT_FRACTION_KEY   : 0.4,
+                                                                             self.POWER_FRACTION_KEY     : 0.4,
+                                                                             self.IMPEDANCE_PF_KEY       : 0.97,
+                                                                             self.CURRENT_PF_KEY         : 0.97,
+                                                                             self.POWER_PF_KEY           : 0.97}]} 
         
         super(ResistorBusParams,self).__init__(schema, *arg, **kw)
     
@@ -416,6 +533,85 @@ class ResistorBusParams(BusParams):
     '''
 
 
+##########################################################
+# SurrogateBusParams
+##########################################################
+
+class SurrogateBusParams(BusParams):
+    '''
+    The initialization parameters for the surrogate (fitted model) bus implementation.
+    '''
+    
+    MODEL_KEY   = 'model_file'
+    MARGIN_KEY  = 'envelope_margin'
+    
+    def __init__(self, *arg, **kw):
+        schema = OrderedDict()
+        
+        self._param_descriptions[self.BUS_KEY]['default_value']    = 'SurrogateBus'
+        self._param_descriptions[self.OUTPUT_KEY]['template_value'] =  [{'name':'network_node','param':'measured_power'}]
+        
+        self._param_descriptions[self.MODEL_KEY]  = {'description'      : 'JSON file (relative to folder) holding the model written by SurrogateBus.fit.',
+                                                     'required'         : True,
+                                                     'parser'           : str,
+                                                     'template_value'   : 'surrogate.json'}
+        
+        self._param_descriptions[self.MARGIN_KEY] = {'description'      : 'Inputs may exceed the training range by this fraction of the range before they are refused.',
+                                                     'required'         : False,
+                                                     'parser'           : float,
+                                                     'default_value'    : 0.0}
+        
+        super(SurrogateBusParams,self).__init__(schema, *arg, **kw)
+    
+    '''
+    Params interface implementation
+    '''
+    
+    
+    '''
+    Local functions
+    '''
+
+
+##########################################################
+# ReplayBusParams
+##########################################################
+
+class ReplayBusParams(BusParams):
+    '''
+    The initialization parameters for the replay (recorded outputs) bus implementation.
+    '''
+    
+    REPLAY_FILE_KEY  = 'replay_file'
+    CHECK_INPUTS_KEY = 'check_inputs'
+    
+    def __init__(self, *arg, **kw):
+        schema = OrderedDict()
+        
+        self._param_descriptions[self.BUS_KEY]['default_value']    = 'ReplayBus'
+        self._param_descriptions[self.OUTPUT_KEY]['template_value'] =  [{'name':'network_node','param':'measured_power'}]
+        
+        self._param_descriptions[self.REPLAY_FILE_KEY]  = {'description'      : 'HDF5 file (relative to folder) written by a RecordingBus (record_file).',
+                                                           'required'         : True,
+                                                           'parser'           : str,
+                                                           'template_value'   : 'bus_record.h5'}
+        
+        self._param_descriptions[self.CHECK_INPUTS_KEY] = {'description'      : 'Raise an Exception when a transaction input differs from the recorded input.',
+                                                           'required'         : False,
+                                                           'default_value'    : False}
+        
+        super(ReplayBusParams,self).__init__(schema, *arg, **kw)
+    
+    '''
+    Params interface implementation
+    '''
+    
+    
+    '''
+    Local functions
+    '''
+
+
 ##########################################################
 # MultiNodeBusParams
 ##########################################################
@@ -483,6 +679,164 @@ class MultiNodeBusParams(BusParams):
     '''
 
 
+##########################################################
+# BusParamsCache
+##########################################################
+
+class BusParamsCache(object):
+    '''
+    On-disk cache of parsed BusParams, keyed by the SHA-1 of the JSON file contents.  A hit skips the
+    JSON parse and the Params.__setitem__ parsers, and the schema is only built once per class.
+    
+    The __bus_file children of a MultiNodeBusParams are loaded (through the cache) and stored inline,
+    so the MultiNodeBus does not parse them again.  Their paths (relative to the json file, so identical
+    files in different folders share an entry) and hashes are stored with the entry, and a change to 
+    any of them invalidates it.  The children are found relative to the json file's
+    directory joined with the MultiNodeBus folder.
+    
+    Entries are marshal files written atomically, so several processes may share one cache_dir.
+    '''
+    VERSION = 1
+    EXTENSION = '.bpc'
+    
+    #marks the inline child BusParams in a stored nodes list
+    _NODE_PARAMS_KEY = '__bus_params'
+    
+    def __init__(self, cache_dir):
+        self.cache_dir = os.path.abspath(cache_dir)
+        if not os.path.isdir(self.cache_dir):
+            try:
+                os.makedirs(self.cache_dir)
+            except OSError:
+                #another process created it first
+                if not os.path.isdir(self.cache_dir):
+                    raise
+        
+        #class_name -> empty BusParams, cloned so the schema is only built once
+        self.__empty = {}
+        
+        self.hits = 0
+        self.misses = 0
+    
+    def load(self, filename):
+        '''
+        Same as BusParams.load(filename), through the cache.
+        '''
+        return self.__load(filename)[0]
+    
+    def __load(self, filename):
+        '''
+        Returns the BusParams and the [(path, hash)] of the files it was built from.
+        '''
+        filename = os.path.abspath(filename)
+        _file_dir = os.path.dirname(filename)
+        
+        raw = self.__read(filename)
+        key = hashlib.sha1(raw).hexdigest()
+        
+        entry = self.__read_entry(key)
+        if entry is not None:
+            deps = [(os.path.normpath(os.path.join(_file_dir, path)), _key) for path, _key in entry['deps']]
+            if self.__unchanged(deps):
+                self.hits += 1
+                return self.__from_entry(entry['params']), [(filename, key)] + deps
+        
+        self.misses += 1
+        try:
+            _json = json.loads(raw)
+        except Exception as e:
+            raise Exception('Could not load {} as a json file, because {}.'.format(filename, e))
+        params = BusParams.from_dict(_json)
+        
+        deps = []
+        if isinstance(params, MultiNodeBusParams):
+            _dir = _file_dir
+            _folder = params[BusParams.FOLDER_KEY]
+            if _folder is not None and _folder != '' and _folder != '.':
+                _dir = os.path.join(_dir, _folder)
+            
+            _nodes = []
+            for node in params[MultiNodeBusParams.NODE_KEY] or []:
+                if MultiNodeBusParams.BUS_FILE_KEY in node:
+                    node, _deps = self.__load(os.path.join(_dir, node[MultiNodeBusParams.BUS_FILE_KEY]))
+                    deps.extend(_deps)
+                _nodes.append(node)
+            params[MultiNodeBusParams.NODE_KEY] = _nodes
+        
+        self.__write_entry(key, {'version' : self.VERSION, 
+                                 'params'  : self.__to_entry(params), 
+                                 'deps'    : [(os.path.relpath(path, _file_dir), _key) for path, _key in deps]})
+        return params, [(filename, key)] + deps
+    
+    def __read(self, filename):
+        try:
+            with open(filename, 'rb') as f:
+                return f.read()
+        except Exception as e:
+            raise Exception('Could not load {} as a json file, because {}.'.format(filename, e))
+    
+    def __unchanged(self, deps):
+        for path, key in deps:
+            try:
+                if hashlib.sha1(self.__read(path)).hexdigest() != key:
+                    return False
+            except Exception:
+                return False
+        return True
+    
+    def __entry_path(self, key):
+        return os.path.join(self.cache_dir, key + self.EXTENSION)
+    
+    def __read_entry(self, key):
+        try:
+            with open(self.__entry_path(key), 'rb') as f:
+                entry = marshal.load(f)
+            if entry['version'] != self.VERSION:
+                return None
+            return entry
+        except Exception:
+            #missing, or unreadable (e.g., written by another python version)
+            return None
+    
+    def __write_entry(self, key, entry):
+        _tmp = '%s.%d.tmp' % (self.__entry_path(key), os.getpid())
+        try:
+            with open(_tmp, 'wb') as f:
+                marshal.dump(entry, f)
+            os.rename(_tmp, self.__entry_path(key))
+        except Exception as e:
+            logging.warning('Could not write the bus config cache entry {}, because {}.'.format(self.__entry_path(key), e))
+            if os.path.exists(_tmp):
+                os.remove(_tmp)
+    
+    def __to_entry(self, params):
+        '''
+        BusParams (and inline child BusParams) -> plain dicts marshal can write
+        '''
+        ret = {BusParams.CLASS_KEY : params.get_class_name()}
+        for key, value in params.items():
+            if key == MultiNodeBusParams.NODE_KEY and isinstance(params, MultiNodeBusParams):
+                value = [{self._NODE_PARAMS_KEY : self.__to_entry(n)} if isinstance(n, BusParams) else n for n in value]
+            ret[key] = value
+        return ret
+    
+    def __from_entry(self, entry):
+        '''
+        Plain dicts -> BusParams.  The values were already parsed, so Params.__setitem__ is bypassed.
+        '''
+        _class = entry[BusParams.CLASS_KEY]
+        if _class not in self.__empty:
+            self.__empty[_class] = globals()[_class]()
+        params = self.__empty[_class].clone()
+        
+        for key, value in entry.items():
+            if key == BusParams.CLASS_KEY:
+                continue
+            if key == MultiNodeBusParams.NODE_KEY and isinstance(params, MultiNodeBusParams):
+                value = [self.__from_entry(n[self._NODE_PARAMS_KEY]) if self._NODE_PARAMS_KEY in n else n for n in value]
+            dict.__setitem__(params, key, value)
+        return params
+
 
 #####################################################################################################################
 # TEST MAIN
@@ -0,0 +1,121 @@
+'''
+[LICENSE]
+Copyright (c) 2015, Alliance for Sustainable Energy.
+All rights reserved.
+
+Redistribution and use in source and binary forms, 
+with or without modification, are permitted provided 
+that the following conditions are met:
+
+1. Redistributions of source code must retain the above 
+copyright notice, this list of conditions and the 
+following disclaimer.
+
+2. Redistributions in binary form must reproduce the 
+above copyright notice, this list of conditions and the 
+following disclaimer in the documentation and/or other 
+materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the 
+names of its contributors may be used to endorse or 
+promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND 
+CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, 
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF 
+MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR 
+CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, 
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) 
+HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE 
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+If you use this work or its derivatives for research publications, please cite:
+Timothy M. Hansen, Bryan Palmintier, Siddharth Suryanarayanan, 
+Anthony A. Maciejewski, and Howard Jay Siegel, "Bus.py: A GridLAB-D 
+Communication Interface for Smart Distribution Grid Simulations," 
+in IEEE PES General Meeting 2015, Denver, CO, July 2015, 5 pages.
+[/LICENSE]
+Created on Oct 19, 2026
+
+@author: Tim Hansen
+
+data_file_cache.py
+
+Reference-counted cache of loaded data files, shared by the FileBus objects of a process (see 
+buspy.bus.FILE_DATA_CACHE).
+'''
+
+######################################################################
+# IMPORTS
+######################################################################
+
+import os
+import threading
+
+######################################################################
+# CLASSES
+######################################################################
+
+class DataFileCache(object):
+    '''
+    Process-wide, reference-counted cache of the data files loaded by FileBus.  Files are keyed by their absolute
+    path and mtime, so every FileBus output pointing at the same (unchanged) file shares one in-memory copy, which is
+    released when the last bus using it is stopped.
+    '''
+    
+    def __init__(self):
+        self.__entries = {}
+        self.__lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+    
+    def __len__(self):
+        return len(self.__entries)
+    
+    def acquire(self,filename,handler):
+        '''
+        Returns the key and data of filename (relative to the current directory), loading it with handler(filename)
+        if it is not cached.  Every acquire must be paired with a release of the key.
+        '''
+        _path = os.path.abspath(filename)
+        return self.acquire_key((_path, os.path.getmtime(_path)), handler, filename)
+    
+    def acquire_key(self,key,load,*args):
+        '''
+        Same as acquire for data derived from a file (e.g., resampled onto a simulation grid) under any hashable key.
+        The data is created with load(*args) if it is not cached.
+        '''
+        _key = key
+        with self.__lock:
+            _entry = self.__entries.get(_key)
+            if _entry is not None:
+                _entry[1] += 1
+                self.hits += 1
+                return _key, _entry[0]
+        
+        #load outside of the lock (another bus may load the same file at the same time, the first one is kept)
+        _data = load(*args)
+        
+        with self.__lock:
+            _entry = self.__entries.setdefault(_key, [_data, 0])
+            _entry[1] += 1
+            self.misses += 1
+            return _key, _entry[0]
+    
+    def release(self,key):
+        with self.__lock:
+            _entry = self.__entries.get(key)
+            if _entry is not None:
+                _entry[1] -= 1
+                if _entry[1] <= 0:
+                    del self.__entries[key]
+                    #e.g., an open HDF5 file
+                    if callable(getattr(type(_entry[0]), 'close', None)):
+                        _entry[0].close()
@@ -49,6 +49,14 @@ debug.py
 
 A debug thread class for logging debug output to a queue and/or a file.
 
+Structured tracing:
+    The per-parameter transaction logs ([SEND]/[RECV]) are recorded with DebugBase.trace into a preallocated
+    TraceBuffer and only formatted when the buffer is flushed (when it is full, before the next write, and on close).
+    Callers should check trace_level before tracing so nothing is done when tracing is off, e.g.:
+    
+        if debug.trace_level >= TRACE_IO:
+            debug.trace(TRACE_SEND, time, label, name, param, value)
+
 '''
 
 from threading import Thread
@@ -64,6 +72,16 @@ import atexit
 
 DEBUG_ENUM = ['dFile','dConsole','dNone']
 
+#trace levels
+TRACE_OFF   = 0     #no structured tracing
+TRACE_IO    = 1     #trace the transaction inputs and outputs
+
+#trace tags
+TRACE_SEND  = '[SEND]'
+TRACE_RECV  = '[RECV]'
+
+DEFAULT_TRACE_SIZE = 4096
+
 
 def enqueue_output(out, queue):
     for line in iter(out.readline, b''):
@@ -231,9 +249,78 @@ class DebugThread(Thread):
     def __timestamp(self):
         return '[%5.3f] : ' % (clock()-self.__start_clock)
     
+class TraceBuffer(object):
+    '''
+    Preallocated ring buffer of structured trace events (clock, tag, time, timezone, label, name, param, value).
+    
+    Once the buffer is full, recording overwrites the oldest event (counted in dropped).  Owners that cannot lose
+    events should drain the buffer when it is full.
+    '''
+    
+    def __init__(self,size=DEFAULT_TRACE_SIZE):
+        self.size = size
+        self._clock = [0.0] * size
+        self._tag = [None] * size
+        self._time = [None] * size
+        self._timezone = [None] * size
+        self._label = [None] * size
+        self._name = [None] * size
+        self._param = [None] * size
+        self._value = [None] * size
+        
+        self._start = 0
+        self._count = 0
+        self.dropped = 0
+        
+    @property
+    def full(self):
+        return self._count == self.size
+    
+    def __len__(self):
+        return self._count
+        
+    def record(self,clk,tag,time,timezone,label,name,param,value):
+        i = (self._start + self._count) % self.size
+        
+        self._clock[i] = clk
+        self._tag[i] = tag
+        self._time[i] = time
+        self._timezone[i] = timezone
+        self._label[i] = label
+        self._name[i] = name
+        self._param[i] = param
+        self._value[i] = value
+        
+        if self._count == self.size:
+            self._start = (self._start + 1) % self.size
+            self.dropped += 1
+        else:
+            self._count += 1
+            
+    def drain(self):
+        '''
+        Yields the events from oldest to newest as tuples and empties the buffer.
+        '''
+        for n in xrange(self._count):
+            i = (self._start + n) % self.size
+            yield (self._clock[i], self._tag[i], self._time[i], self._timezone[i],
+                   self._label[i], self._name[i], self._param[i], self._value[i])
+            #release the references
+            self._value[i] = None
+            self._time[i] = None
+            
+        self._start = 0
+        self._count = 0
+    
 class DebugBase(object):
-    def __init__(self,*args,**kwargs):
+    
+    #DebugEmpty does not call the constructor, so default to no tracing
+    trace_level = TRACE_OFF
+    
+    def __init__(self,trace_level=TRACE_IO,trace_size=DEFAULT_TRACE_SIZE,*args,**kwargs):
         self._start_clock = clock()
+        self.trace_level = trace_level
+        self._trace = TraceBuffer(trace_size)
         atexit.register(DebugFileNonthread._on_shutdown,self)
     
     def open(self):
@@ -242,12 +329,45 @@ class DebugBase(object):
     def write(self,*args,**kwargs):
         pass
     
+    def trace(self,tag,time,label,name,param,value):
+        '''
+        Records a structured trace event.  Nothing is formatted until flush.
+        
+        Parameters:
+            tag - TRACE_SEND or TRACE_RECV
+            time - CommonTimeInfo of the transaction (or None)
+            label - debug label (e.g., the bus folder)
+            name, param, value - the CommonParam being sent or received
+        '''
+        if self._trace.full:
+            self.flush()
+        
+        if time is None:
+            self._trace.record(clock(), tag, None, None, label, name, param, value)
+        else:
+            self._trace.record(clock(), tag, time.current_time, time.timezone, label, name, param, value)
+    
+    def flush(self):
+        '''
+        Formats and outputs the recorded trace events.
+        '''
+        for event in self._trace.drain():
+            self._write_line(self._format_trace(*event))
+        
     def close(self):
         pass
     
-    def _timestamp(self,item=''):
+    def _write_line(self,s):
+        pass
+    
+    def _format_trace(self,clk,tag,time,timezone,label,name,param,value):
+        _time = str(time) if timezone is None else str(time) + ' ' + timezone
+        return self._timestamp(label,clk) + tag + ': ' + _time + '\t' + str(name) + '.' + str(param) + ' = ' + str(value)
+    
+    def _timestamp(self,item='',clk=None):
         i = item if item == '' else '\t' + item
-        return '[%5.3f%s] : ' % ((clock()-self._start_clock), i)
+        clk = clock() if clk is None else clk
+        return '[%5.3f%s] : ' % ((clk-self._start_clock), i)
     
     @staticmethod
     def _on_shutdown(debug):
@@ -258,8 +378,8 @@ class DebugBase(object):
     
 class DebugFileNonthread(DebugBase):
     
-    def __init__(self,print_output=False,output_filename='debug.log'):
-        super(DebugFileNonthread,self).__init__()
+    def __init__(self,print_output=False,output_filename='debug.log',*args,**kwargs):
+        super(DebugFileNonthread,self).__init__(*args,**kwargs)
 
         self._out_fname = output_filename
         self._print_output = print_output
@@ -272,20 +392,24 @@ class DebugFileNonthread(DebugBase):
         self._flush()
     
     def write(self,s,label=''):
-        _out = self._timestamp(label) + s
-        
-        if self._print_output:
-            print _out
-            
-        self._file.write(_out + '\n')
+        #keep the trace events in order with the other output
+        self.flush()
+        self._write_line(self._timestamp(label) + s)
         self._flush()
     
     def close(self):
         try:
+            self.flush()
             self._file.close()
         except:
             #do nothing
             pass
+    
+    def _write_line(self,s):
+        if self._print_output:
+            print s
+            
+        self._file.write(s + '\n')
         
     def _flush(self):
         try:
@@ -305,6 +429,12 @@ class DebugEmpty(DebugBase):
     def write(self,*args,**kwargs):
         pass
     
+    def trace(self,*args,**kwargs):
+        pass
+    
+    def flush(self):
+        pass
+    
     def close(self):
         pass
     
@@ -317,10 +447,14 @@ class DebugConsole(DebugBase):
         pass
     
     def write(self,s,label=''):
-        print self._timestamp(label) + s
+        self.flush()
+        self._write_line(self._timestamp(label) + s)
     
     def close(self):
-        pass
+        self.flush()
+    
+    def _write_line(self,s):
+        print s
     
 DEBUG_MAP = {
              
@@ -0,0 +1,193 @@
+'''
+[LICENSE]
+Copyright (c) 2015, Alliance for Sustainable Energy.
+All rights reserved.
+
+Redistribution and use in source and binary forms, 
+with or without modification, are permitted provided 
+that the following conditions are met:
+
+1. Redistributions of source code must retain the above 
+copyright notice, this list of conditions and the 
+following disclaimer.
+
+2. Redistributions in binary form must reproduce the 
+above copyright notice, this list of conditions and the 
+following disclaimer in the documentation and/or other 
+materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the 
+names of its contributors may be used to endorse or 
+promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND 
+CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, 
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF 
+MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR 
+CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, 
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) 
+HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE 
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+If you use this work or its derivatives for research publications, please cite:
+Timothy M. Hansen, Bryan Palmintier, Siddharth Suryanarayanan, 
+Anthony A. Maciejewski, and Howard Jay Siegel, "Bus.py: A GridLAB-D 
+Communication Interface for Smart Distribution Grid Simulations," 
+in IEEE PES General Meeting 2015, Denver, CO, July 2015, 5 pages.
+[/LICENSE]
+Created on Oct 19, 2026
+
+@author: Tim Hansen
+
+Buffered recorder of the inputs sent to a bus (see FileBusParams.SAVE_INPUT_KEY).  Each step writes its inputs into
+a preallocated (rows x column) numpy buffer, which is only written to the file when full (or on flush/close), so
+recording every step does not slow the simulation down with small writes.
+
+The file format is chosen by its extension:
+    .h5  - an HDF5 store (see buspy.analyze.loaders.hdf5_store): 'time' (int64 nanoseconds since the epoch) and 
+           'inputs' (time x column complex values, NaN where nothing was sent) with a 'columns' attribute
+    .csv - a columnar CSV file (see buspy.analyze.loaders.table): the time, then one complex column per input
+Both can be read back by a FileBus.
+'''
+
+######################################################################
+# IMPORTS
+######################################################################
+
+import os
+import h5py
+import numpy as np
+import pandas as pd
+from buspy.analyze.timeseries import to_i8
+
+######################################################################
+# CONSTANTS
+######################################################################
+
+#nothing was sent
+_NAN = complex(np.nan, np.nan)
+
+######################################################################
+# CLASSES
+######################################################################
+
+class InputRecorder(object):
+    '''
+    Records inputs by column ('name.param' labels) and time.  set(column, value) sets the inputs of the current row,
+    and next_row(time) ends it.
+    '''
+    
+    BUFFER_ROWS = 10000
+    DATASET = 'inputs'
+    
+    def __init__(self, filename, buffer_rows=BUFFER_ROWS):
+        self.filename = filename
+        self.buffer_rows = buffer_rows
+        
+        self._format = os.path.splitext(filename)[1].lower()
+        if self._format not in ('.h5', '.csv'):
+            raise Exception('Inputs can only be saved to .h5 or .csv files, not %s' % filename)
+        
+        self.columns = []
+        self._index = {}
+        self._times = np.empty(buffer_rows, dtype=np.int64)
+        self._values = np.full((buffer_rows, 0), _NAN, dtype=complex)
+        self._row = 0
+        self._row_set = False
+        
+        #rows and columns written to the file so far
+        self._written = 0
+        self._written_columns = None
+    
+    def __len__(self):
+        return self._written + self._row
+    
+    def set(self, column, value):
+        _col = self._index.get(column)
+        if _col is None:
+            _col = self._add_column(column)
+        self._values[self._row, _col] = value
+        self._row_set = True
+    
+    def next_row(self, time):
+        '''
+        Ends the current row at time (skipped if no input was set).  Writes the buffer to the file once it is full.
+        '''
+        if not self._row_set:
+            return
+        self._times[self._row] = to_i8(time)
+        self._row += 1
+        self._row_set = False
+        if self._row == self.buffer_rows:
+            self.flush()
+    
+    def flush(self):
+        '''
+        Writes the buffered rows to the file.
+        '''
+        if self._row == 0:
+            return
+        
+        _times = self._times[:self._row]
+        _values = self._values[:self._row]
+        if self._format == '.h5':
+            self._write_h5(_times, _values)
+        else:
+            self._write_csv(_times, _values)
+        
+        self._written += self._row
+        self._written_columns = list(self.columns)
+        self._values.fill(_NAN)
+        self._row = 0
+    
+    def close(self):
+        '''
+        Flushes the buffer (a row that was not ended with next_row is dropped).
+        '''
+        self._row_set = False
+        self.flush()
+    
+    def _add_column(self, column):
+        _col = len(self.columns)
+        self.columns.append(column)
+        self._index[column] = _col
+        
+        #columns are rare compared to rows, grow by more than one
+        if _col == self._values.shape[1]:
+            _values = np.full((self.buffer_rows, max(1, 2 * _col)), _NAN, dtype=complex)
+            _values[:,:_col] = self._values
+            self._values = _values
+        return _col
+    
+    def _write_h5(self, times, values):
+        _cols = len(self.columns)
+        with h5py.File(self.filename, 'w' if self._written_columns is None else 'a') as f:
+            if self._written_columns is None:
+                f.create_dataset('time', shape=(0,), maxshape=(None,), chunks=(self.buffer_rows,), dtype=np.int64)
+                f.create_dataset(self.DATASET, shape=(0, _cols), maxshape=(None, None), chunks=(self.buffer_rows, max(1, _cols)), 
+                                 dtype=complex, fillvalue=_NAN)
+            _time, _inputs = f['time'], f[self.DATASET]
+            
+            _time.resize((self._written + len(times),))
+            _time[self._written:] = times
+            _inputs.resize((self._written + len(times), _cols))
+            _inputs[self._written:,:] = values[:,:_cols]
+            _inputs.attrs['columns'] = np.array([col.encode('utf-8') for col in self.columns], dtype='S')
+    
+    def _write_csv(self, times, values):
+        _frame = pd.DataFrame(values[:,:len(self.columns)], index=pd.DatetimeIndex(times), columns=self.columns)
+        if self._written_columns is None:
+            _frame.to_csv(self.filename, mode='w', na_rep='')
+            return
+        
+        #the header holds every column, so the file is rewritten when columns were added since the last write
+        if self._written_columns != self.columns:
+            _written = pd.read_csv(self.filename, index_col=0, dtype=str, na_filter=False)
+            _written.reindex(columns=self.columns).to_csv(self.filename, na_rep='')
+        _frame.to_csv(self.filename, mode='a', header=False, na_rep='')
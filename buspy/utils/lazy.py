@@ -0,0 +1,132 @@
+'''
+[LICENSE]
+Copyright (c) 2015, Alliance for Sustainable Energy.
+All rights reserved.
+
+Redistribution and use in source and binary forms, 
+with or without modification, are permitted provided 
+that the following conditions are met:
+
+1. Redistributions of source code must retain the above 
+copyright notice, this list of conditions and the 
+following disclaimer.
+
+2. Redistributions in binary form must reproduce the 
+above copyright notice, this list of conditions and the 
+following disclaimer in the documentation and/or other 
+materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the 
+names of its contributors may be used to endorse or 
+promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND 
+CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, 
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF 
+MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR 
+CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, 
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) 
+HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE 
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+If you use this work or its derivatives for research publications, please cite:
+Timothy M. Hansen, Bryan Palmintier, Siddharth Suryanarayanan, 
+Anthony A. Maciejewski, and Howard Jay Siegel, "Bus.py: A GridLAB-D 
+Communication Interface for Smart Distribution Grid Simulations," 
+in IEEE PES General Meeting 2015, Denver, CO, July 2015, 5 pages.
+[/LICENSE]
+Created on Oct 19, 2026
+
+@author: Tim Hansen
+
+Deferred imports.  buspy.bus is imported on every rank of large MPI jobs, most of which
+never touch pandas, numpy, h5py or the GridLAB-D HTTP/XML stack.  lazy_import returns a 
+module object that imports the real module the first time one of its attributes is used:
+
+    pd = lazy_import('pandas')
+    ...
+    pd.to_datetime(x)   #pandas is imported here
+'''
+
+######################################################################
+# IMPORTS
+######################################################################
+
+import importlib
+import sys
+import types
+
+######################################################################
+# UTILITY FUNCTIONS
+######################################################################
+
+def lazy_import(name, fallback=None, on_fallback=None):
+    '''
+    Returns the module if it is already imported, else a LazyModule standing in for it.
+    
+    Parameters:
+        name        - module name (e.g., 'pandas', 'xml.etree.ElementTree')
+        fallback    - (optional) module to import instead if name cannot be imported
+        on_fallback - (optional) function called (once) when the fallback is used
+    '''
+    if name in sys.modules and sys.modules[name] is not None:
+        return sys.modules[name]
+    return LazyModule(name, fallback, on_fallback)
+
+def is_loaded(module):
+    '''
+    Returns False if module is a LazyModule that has not been imported yet.
+    '''
+    return not isinstance(module, LazyModule) or module.__dict__['_lazy_module'] is not None
+
+######################################################################
+# CLASSES
+######################################################################
+
+class LazyModule(types.ModuleType):
+    '''
+    Stand-in for a module that is imported on first attribute access.  After the import, the
+    module's attributes are copied into this object so later lookups do not go through __getattr__.
+    '''
+    def __init__(self, name, fallback=None, on_fallback=None):
+        super(LazyModule, self).__init__(name)
+        self.__dict__['_lazy_fallback'] = fallback
+        self.__dict__['_lazy_on_fallback'] = on_fallback
+        self.__dict__['_lazy_module'] = None
+    
+    def _lazy_load(self):
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            try:
+                module = importlib.import_module(self.__name__)
+            except ImportError:
+                if self.__dict__['_lazy_fallback'] is None:
+                    raise
+                module = importlib.import_module(self.__dict__['_lazy_fallback'])
+                if self.__dict__['_lazy_on_fallback'] is not None:
+                    self.__dict__['_lazy_on_fallback']()
+            
+            self.__dict__['_lazy_module'] = module
+            for key, value in module.__dict__.items():
+                if key not in ('__name__', '__doc__'):
+                    self.__dict__[key] = value
+        return module
+    
+    def __getattr__(self, attr):
+        #only called for attributes that are not (yet) in __dict__
+        return getattr(self._lazy_load(), attr)
+    
+    def __setattr__(self, attr, value):
+        setattr(self._lazy_load(), attr, value)
+        self.__dict__[attr] = value
+    
+    def __repr__(self):
+        if self.__dict__['_lazy_module'] is None:
+            return "<lazy module '%s' (not loaded)>" % self.__name__
+        return repr(self.__dict__['_lazy_module'])
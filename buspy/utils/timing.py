@@ -47,17 +47,45 @@ Created on Apr 6, 2015
 '''
 
 import time
-import h5py
+from buspy.utils.lazy import lazy_import
+h5py = lazy_import('h5py')
 
 class TimerError(Exception):
     pass
 
+class _TimedBlock(object):
+    '''
+    Context manager that times a with block.  The timer is stopped even if the block raises (so the next start does 
+    not fail), but only the blocks that finish are recorded.
+    '''
+    __slots__ = ('timer',)
+    
+    def __init__(self,timer=None):
+        self.timer = timer
+    
+    def __enter__(self):
+        if self.timer is not None:
+            self.timer.start()
+        return self
+    
+    def __exit__(self,exc_type,exc_value,tb):
+        if self.timer is not None:
+            if exc_type is None:
+                self.timer.stop()
+            else:
+                self.timer.is_timing = False
+        return False
+
+#shared by the BlankTimerCollection
+_NOT_TIMED = _TimedBlock()
+
 class Timer(object):
     def __init__(self,timing_func=time.time,multiplier=1.0):
         self.timing_func = timing_func
         self.multiplier = multiplier
         self.times = []
         self.is_timing = False
+        self.block = _TimedBlock(self)
     
     def start(self,restart=False):
         #throw error if the timer is already timing and restart is not specified.
@@ -111,11 +139,27 @@ class TimerCollection(object):
         except TimerError as e:
             raise TimerError('Error stopping %s: %s' % (key,str(e)))
     
+    def timed(self,key):
+        '''
+        Returns a context manager that times a with block on the key timer, e.g.:
+            with timers.timed('send'):
+                ...
+        '''
+        if key not in self.timers:
+            raise KeyError('%s is not a timer' % key)
+        
+        return self.timers[key].block
     
-    def to_hdf5(self,fname,access_flag='w'):
+    
+    def to_hdf5(self,fname,access_flag='w',group=''):
+        '''
+        Write each timer's list of times as a dataset named by its key.
+        If group is given, the datasets are created under that group 
+        (e.g., 'children/0/') so several collections can share one file.
+        '''
         with h5py.File(fname,access_flag) as f:
             for key,timer in self.timers.iteritems():
-                f.create_dataset(key,data=timer.times)
+                f.create_dataset(group + key,data=timer.times)
     
 
 class BlankTimerCollection(TimerCollection):
@@ -125,16 +169,19 @@ class BlankTimerCollection(TimerCollection):
     def __init__(self):
         pass
     
-    def add_timer(self,key):
+    def add_timer(self,key,*args,**kwargs):
         pass
     
-    def start_timer(self,key):
+    def start_timer(self,key,*args,**kwargs):
         pass
     
     def stop_timer(self,key):
         pass
     
-    def to_hdf5(self,fname):
+    def timed(self,key):
+        return _NOT_TIMED
+    
+    def to_hdf5(self,fname,*args,**kwargs):
         pass
 
 
@@ -0,0 +1,234 @@
+'''
+[LICENSE]
+Copyright (c) 2015, Alliance for Sustainable Energy.
+All rights reserved.
+
+Redistribution and use in source and binary forms, 
+with or without modification, are permitted provided 
+that the following conditions are met:
+
+1. Redistributions of source code must retain the above 
+copyright notice, this list of conditions and the 
+following disclaimer.
+
+2. Redistributions in binary form must reproduce the 
+above copyright notice, this list of conditions and the 
+following disclaimer in the documentation and/or other 
+materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the 
+names of its contributors may be used to endorse or 
+promote products derived from this software without 
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND 
+CONTRIBUTORS "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, 
+INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES OF 
+MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE 
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR 
+CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, 
+SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, 
+BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR 
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) 
+HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN 
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE 
+OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+If you use this work or its derivatives for research publications, please cite:
+Timothy M. Hansen, Bryan Palmintier, Siddharth Suryanarayanan, 
+Anthony A. Maciejewski, and Howard Jay Siegel, "Bus.py: A GridLAB-D 
+Communication Interface for Smart Distribution Grid Simulations," 
+in IEEE PES General Meeting 2015, Denver, CO, July 2015, 5 pages.
+[/LICENSE]
+Created on Oct 19, 2026
+
+@author: Tim Hansen
+
+Persistent, size-bounded store of bus transaction results (see buspy.bus.CachedBus).  Entries
+are kept in a SQLite file so several processes of a sweep can share one cache, and the least 
+recently used entries are evicted once the stored values exceed max_bytes.
+'''
+
+######################################################################
+# IMPORTS
+######################################################################
+
+import os
+import sqlite3
+import time
+import hashlib
+
+#numpy and pandas are imported on first use (see buspy.utils.lazy)
+from buspy.utils.lazy import lazy_import
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+######################################################################
+# UTILITY FUNCTIONS
+######################################################################
+
+def quantize(value,digits):
+    '''
+    Rounds the real and imaginary parts of value (a number or array) to digits significant digits, so inputs that
+    only differ by floating point noise share a key.  Returns a str.
+    '''
+    _v = np.asarray(value)
+    if _v.dtype.kind not in 'biufc':
+        return repr(value)
+    
+    _v = _v.astype(complex).ravel()
+    _x = np.concatenate((_v.real, _v.imag))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        _ok = np.isfinite(_x) & (_x != 0)
+        _scale = np.where(_ok, 10.0 ** (digits - 1 - np.floor(np.log10(np.abs(_x)))), 1.0)
+    return np.where(_ok, np.round(_x * _scale) / _scale, _x).tobytes()
+
+def frame_hash(frame,digits):
+    '''
+    Hash of the columns, times and values (see quantize) of a DataFrame
+    '''
+    if frame is None:
+        return 'None'
+    _hash = hashlib.sha1(repr([str(col) for col in frame.columns]))
+    _hash.update(np.asarray(pd.to_datetime(frame.index).values, dtype='int64').tobytes())
+    for col in frame.columns:
+        _hash.update(quantize(frame[col].values, digits))
+    return _hash.hexdigest()
+
+######################################################################
+# CLASSES
+######################################################################
+
+class TransactionCache(object):
+    '''
+    key (str) -> value (str) store with least recently used eviction.
+    
+    Each put is committed in its own short transaction, so processes sharing the file only hold its write lock 
+    briefly.  A get does not write: the last used times of the hits are kept in memory and written with the next put, 
+    every USED_BATCH hits, and on flush/close.
+    '''
+    
+    VERSION = 1
+    USED_BATCH = 100
+    
+    def __init__(self, filename, max_bytes=512*1024*1024):
+        self.filename = os.path.abspath(filename)
+        self.max_bytes = max_bytes
+        
+        _dir = os.path.dirname(self.filename)
+        if not os.path.isdir(_dir):
+            try:
+                os.makedirs(_dir)
+            except OSError:
+                #another process created it first
+                if not os.path.isdir(_dir):
+                    raise
+        
+        self.__db = sqlite3.connect(self.filename, timeout=60.0)
+        self.__db.text_factory = str
+        self.__db.execute('CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB, size INTEGER, used REAL)')
+        self.__db.execute('CREATE INDEX IF NOT EXISTS entries_used ON entries (used)')
+        self.__db.execute('CREATE TABLE IF NOT EXISTS info (version INTEGER)')
+        
+        _version = self.__db.execute('SELECT version FROM info').fetchone()
+        if _version is None:
+            self.__db.execute('INSERT INTO info VALUES (?)', (self.VERSION,))
+        elif _version[0] != self.VERSION:
+            #older layout, start over
+            self.__db.execute('DELETE FROM entries')
+            self.__db.execute('UPDATE info SET version = ?', (self.VERSION,))
+        self.__db.commit()
+        
+        self.__size = self.__db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        
+        #key -> last used time of the hits not yet written
+        self.__used = {}
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __len__(self):
+        return self.__db.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+    
+    def get(self, key):
+        '''
+        Returns the value stored at key (None if there is none), and marks it as recently used.
+        '''
+        row = self.__db.execute('SELECT value FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        self.__used[key] = time.time()
+        if len(self.__used) >= self.USED_BATCH:
+            self.flush()
+        return str(row[0])
+    
+    def put(self, key, value):
+        '''
+        Stores value at key, evicting the least recently used entries if the cache is over max_bytes.
+        '''
+        try:
+            self.__write_used()
+            
+            _old = self.__db.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+            if _old is not None:
+                self.__size -= _old[0]
+            
+            self.__db.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)', (key, sqlite3.Binary(value), len(value), time.time()))
+            self.__size += len(value)
+            
+            if self.__size > self.max_bytes:
+                self.__evict()
+            self.__db.commit()
+        except:
+            self.__db.rollback()
+            raise
+    
+    def flush(self):
+        '''
+        Writes the last used times of the hits.
+        '''
+        if len(self.__used) > 0:
+            try:
+                self.__write_used()
+                self.__db.commit()
+            except:
+                self.__db.rollback()
+                raise
+    
+    def close(self):
+        self.flush()
+        self.__db.close()
+    
+    '''
+    Local functions
+    '''
+    def __write_used(self):
+        '''
+        Updates the last used times of the hits (in the current transaction).
+        '''
+        self.__db.executemany('UPDATE entries SET used = ? WHERE key = ?', [(t, key) for key, t in self.__used.iteritems()])
+        self.__used = {}
+    
+    def __evict(self):
+        '''
+        Deletes the least recently used entries until the cache is at most max_bytes.
+        '''
+        #other processes may have written to the file, so start from its actual size
+        self.__size = self.__db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        
+        _evict = []
+        _rows = self.__db.execute('SELECT key, size FROM entries ORDER BY used')
+        for key, size in _rows:
+            if self.__size <= self.max_bytes:
+                break
+            _evict.append((key,))
+            self.__size -= size
+        _rows.close()
+        
+        self.__db.executemany('DELETE FROM entries WHERE key = ?', _evict)
+        self.evictions += len(_evict)
@@ -37,7 +37,29 @@ Test cases:
     testConstantBusManualOpen - uses manual start, stop of the bus (instead of 'with' statement)
     testConstantBusTranslator - constant bus with a BusTranslator object attached
     testFileBus
+    testFileBusCsv - file bus reading columnar .csv files
+    testFileBusStream - file bus streaming its input files in chunks
+    testFileBusH5 - file bus reading HDF5 stores
+    testFileBusSchedule - file bus reading the schedules of a .glm file
+    testGridlabBusValidate - checks GridlabBus outputs against its .glm file (without GridLAB-D)
+    testGlmIndex - indexes the objects of a .glm file
+    testCsvGridlab - loads a GridLAB-D recorder .csv file
+    testPlayerSidecar - loads a player file through its binary sidecar
+    testFileBusSaveInput - file bus saving the inputs it is sent to a .csv file
     testFileBusTranslator - file bus with a BusTranslator object attached
+    testFileBusRun - checks Bus.run against the Bus.transaction loop
+    testResistorBus - ZIP load bus driven by a voltage schedule
+    testSurrogateBus - surrogate model fitted to the ResistorBus
+    testMultiNodeBusResistor - checks MultiNodeBus.run of ResistorBus sub-Buses against the transaction loop
+    testCachedBus - ResistorBus served from a transaction cache
+    testCachedMultiNodeBus - transaction caches on a MultiNodeBus and its sub-Buses
+    testReplayBus - records a ResistorBus and replays it
+    testRecordingBusTranslator - records a MultiNodeBus with the AggregatorBusTranslator
+    testGridlabBus
+    testGridlabBusWithPath - GridLAB-D bus with the path to gridlabd set
+    testGridlabBusExternal - GridLAB-D bus using an already running GridLAB-D
+    testMultiNodeBusTranslator - multi-node bus with the AggregatorBusTranslator
+    testMultiNodeBusInline - multi-node bus with its sub-Buses inline in its json file
 '''
 
 #######################################################################################
@@ -48,11 +70,29 @@ from unittest import TestCase
 
 from buspy.bus import open_bus
 from buspy.bus import load_bus
+from buspy.bus import SurrogateBus
+from buspy.bus import CachedBus
+from buspy.bus import RecordingBus
+from buspy.bus import get_bus_from_classname
+from buspy.utils.transaction_cache import TransactionCache
+from buspy.analyze.loaders.hdf5_store import frame_to_h5
+from buspy.analyze.loaders.record import read_record
+from buspy.analyze.loaders.table import csv_to_table
+from buspy.analyze.loaders.glm import glm_index
+from buspy.analyze.loaders.glm import INDEX_EXTENSION as GLM_INDEX_EXTENSION
+from buspy.analyze.loaders.gld_csv import CsvGridlab
+from buspy.analyze.loaders.gld_csv import INDEX_EXTENSION as CSV_INDEX_EXTENSION
+from buspy.analyze.loaders.player import load_player
+from buspy.analyze.loaders.player import SIDECAR_EXTENSION
 from buspy.comm.message import CommonParam
 from buspy.comm.message import MessageCommonData
+from buspy.comm.gridlabcomm import GridlabCommHttp
 from buspy.bus import AggregatorBusTranslator
 
 from numpy import random
+import numpy as np
+import pandas as pd
+import os
 
 #######################################################################################
 # Utility Functions
@@ -83,6 +123,36 @@ def translator_multinode_input():
     __dict[AggregatorBusTranslator.IN_V_IM_KEY] = random.normal(0,0.1)
     return __dict
 
+def translator_multinode_frame(time_info):
+    '''
+    Random voltages for the whole simulation (for Bus.run).
+    '''
+    times = pd.date_range(time_info.start_time,time_info.end_time,freq=time_info.delta)
+    
+    __frame = pd.DataFrame(index=times)
+    __frame[AggregatorBusTranslator.IN_V_RE_KEY] = random.normal(1.0,0.05,len(times))
+    __frame[AggregatorBusTranslator.IN_V_IM_KEY] = random.normal(0,0.1,len(times))
+    return __frame
+
+def message_gld_frame(time_info):
+    '''
+    Randomly assigns a temperature to the GridLAB-D climate for the whole simulation (for Bus.run).
+    '''
+    NAME = 'example_climate'
+    PARAM = 'temperature'
+    
+    times = pd.date_range(time_info.start_time,time_info.end_time,freq=time_info.delta)
+    
+    return pd.DataFrame({'%s.%s' % (NAME,PARAM) : abs(random.normal(80.0,10.0,len(times)))}, index=times)
+
+def message_voltage_frame(time_info, base_kv=138.0):
+    '''
+    Random positive sequence voltages (around 1 p.u.) for the whole simulation (for Bus.run).
+    '''
+    times = pd.date_range(time_info.start_time,time_info.end_time,freq=time_info.delta)
+    
+    return pd.DataFrame({'special.positive_sequence_voltage' : random.normal(1.0,0.05,len(times)) * base_kv * 1000 / np.sqrt(3.0)}, index=times)
+
 def message_gld_input():
     '''
     Randomly assigns a kW power rating to the GridLAB-D house load.
@@ -124,9 +194,7 @@ class TestBus( TestCase ):
         FILENAME = 'constant_bus.json'
         
         with open_bus(FILENAME) as bus:
-            while not bus.finished:
-                __out = bus.transaction(inputs=None)
-                print out_to_string(__out)
+            print bus.run()
     
         print 'bus finished'
         
@@ -152,9 +220,7 @@ class TestBus( TestCase ):
         FILENAME = 'constant_bus_translator.json'
         
         with open_bus(FILENAME) as bus:
-            while not bus.finished:
-                __out = bus.transaction(inputs=None)
-                print translator_out_to_string(__out)
+            print bus.run()
     
         print 'bus finished'
         
@@ -166,12 +232,223 @@ class TestBus( TestCase ):
         FILENAME = 'file_bus.json'
         
         with open_bus(FILENAME) as bus:
-            while not bus.finished:
-                __out = bus.transaction(inputs=None)
-                print out_to_string(__out)
+            print bus.run()
     
         print 'bus finished'
         
+    def testFileBusCsv(self):
+        '''
+        Example using a FileBus with a columnar .csv file.  Every output selects its column of the same file.
+        '''
+        FILENAME = 'file_bus_csv.json'
+        
+        with open_bus(FILENAME) as bus:
+            __run = bus.run()
+            print __run
+            self.assertTrue(bus.bus_out['house_1']['base_power']._val_data.index is bus.bus_out['house_2']['base_power']._val_data.index)
+        
+        __csv = pd.read_csv('loadshapes.csv', index_col=0, parse_dates=True)
+        self.assertTrue(np.allclose(__run['house_1.base_power'].values, __csv['house_1'].values[1:]))
+        self.assertTrue(np.allclose(__run['network_node.measured_power'].values, 
+                                    __csv['network_node.measured_power'].map(complex).values[1:]))
+        
+    def testFileBusStream(self):
+        '''
+        Example using a FileBus that reads its files in chunks of 16 rows on a background thread.
+        '''
+        FILENAME = 'file_bus_stream.json'
+        
+        with open_bus(FILENAME) as bus:
+            __run = bus.run()
+            print __run
+            self.assertTrue(len(bus.bus_out['network_node']['measured_power']._val_data) <= 2 * 16)
+        
+        with open_bus('file_bus.json') as bus:
+            __loaded = bus.run()
+        self.assertTrue((__run['network_node.measured_power'] == __loaded['network_node.measured_power']).all())
+        
+        __csv = pd.read_csv('loadshapes.csv', index_col=0, parse_dates=True)
+        self.assertTrue(np.allclose(__run['house_1.base_power'].values, __csv['house_1'].values[1:]))
+        
+    def testFileBusH5(self):
+        '''
+        Example using a FileBus reading the columns of an HDF5 store (written from loadshapes.csv).
+        '''
+        frame_to_h5(csv_to_table('loadshapes.csv'), 'loadshapes.h5', 'feeder/loads', mode='w')
+        
+        with open_bus('file_bus_h5.json') as bus:
+            __run = bus.run()
+            print __run
+        
+        with open_bus('file_bus_csv.json') as bus:
+            __expected = bus.run()
+        self.assertTrue(np.allclose(__run.values, __expected[__run.columns].values))
+        
+        os.remove('loadshapes.h5')
+        
+    def testFileBusSchedule(self):
+        '''
+        Example using a FileBus with the GridLAB-D schedules of a .glm file.
+        '''
+        FILENAME = 'file_bus_schedule.json'
+        
+        with open_bus(FILENAME) as bus:
+            __run = bus.run()
+            print __run
+        
+        __hours = __run.index.hour
+        self.assertTrue(np.allclose(__run['house_test.base_power'].values[__hours == 6], 0.58614214034444))
+        self.assertTrue(np.allclose(__run['house_test.base_power'].values[(__hours >= 18) & (__hours <= 20)], 1.4653553508611))
+        self.assertTrue(np.allclose(__run['house_test.heating_setpoint'].values, 60))
+        
+    def testGridlabBusValidate(self):
+        '''
+        Example checking the outputs of a GridlabBus against its .glm file (without starting GridLAB-D): the 
+        misspelled object is dropped.
+        '''
+        bus = load_bus('.', 'gridlabd_bus.json')
+        bus.bus_out['house_tset'] = {'air_temperature' : CommonParam(name='house_tset',param='air_temperature')}
+        
+        bus._glm_index = bus._load_glm_index()
+        bus._check_outputs()
+        
+        self.assertTrue('house_tset' not in bus.bus_out)
+        self.assertTrue('air_temperature' in bus.bus_out['house_test'])
+        
+        #so are the outputs passed in at transaction time (e.g., by a MultiNodeBus)
+        bus._comm = GridlabCommHttp(bus._to_cff_init(), register_shutdown=False)
+        __outputs = MessageCommonData()
+        __outputs.add_param(CommonParam(name='house_tset',param='air_temperature'))
+        __outputs.add_param(CommonParam(name='house_test',param='cooling_setpoint'))
+        __out = bus._get_outputs(__outputs, False)
+        
+        self.assertTrue('house_tset' not in __out.gld_io)
+        self.assertTrue('cooling_setpoint' in __out.gld_io['house_test'])
+        
+        #GridLAB-D answers 404 for a missing property, and 200 for a property with an empty value (e.g., an unset parent)
+        class _Connection(object):
+            def __init__(self, status):
+                self.status = status
+            def request(self, method, url):
+                pass
+            def getresponse(self):
+                return self
+            def read(self):
+                return '<property><value></value></property>'
+        
+        bus._comm.connected = True
+        bus._comm.connection = _Connection(200)
+        self.assertTrue(bus._comm.has_value('house_test', 'parent'))
+        bus._comm.connection = _Connection(404)
+        self.assertFalse(bus._comm.has_value('house_test', 'parnet'))
+        bus._comm.connection = None
+        self.assertEqual(bus._comm.has_value('house_test', 'parent'), None)
+        
+        #names of a .glm file with macros are not checked
+        with open('macro.glm', 'w') as f:
+            f.write('#define H=house_tset\nobject house {\n    name ${H};\n}\nobject house:1..3 {\n    floor_area 1500;\n}\n')
+        bus.bus_out['house_tset'] = {'air_temperature' : CommonParam(name='house_tset',param='air_temperature')}
+        bus._io_checked = {}
+        bus._glm_index = glm_index('macro.glm', cache=False)
+        bus._check_outputs()
+        
+        self.assertFalse(bus._glm_index.complete)
+        self.assertEqual(sorted(bus._glm_index.objects.keys()), ['${H}', 'house:1..3'])
+        self.assertTrue('house_tset' in bus.bus_out)
+        
+        os.remove('macro.glm')
+        os.remove('example_gridlabd.glm' + GLM_INDEX_EXTENSION)
+        
+    def testGlmIndex(self):
+        '''
+        Example indexing the objects of a .glm file (and loading the index back from its cache file).
+        '''
+        __index = glm_index('example_gridlabd.glm')
+        
+        self.assertEqual(__index['house_test'].class_name, 'house')
+        self.assertEqual(__index['house_test']['cooling_setpoint'], 'coolspt*1')
+        self.assertEqual(__index['house_test'].parent, __index.of_class('triplex_meter')[0].name)
+        self.assertEqual(sorted(obj.class_name for obj in __index.children('house_test')), ['ZIPload', 'recorder'])
+        
+        __cached = glm_index('example_gridlabd.glm')
+        self.assertEqual(__cached.objects.keys(), __index.objects.keys())
+        self.assertEqual(__cached['house_test'].line, __index['house_test'].line)
+        
+        os.remove('example_gridlabd.glm' + GLM_INDEX_EXTENSION)
+        
+    def testCsvGridlab(self):
+        '''
+        Example loading a GridLAB-D recorder .csv with switch states, rectangular and polar values (and loading one 
+        time window and column of it).
+        '''
+        FILENAME = 'switch_recorder.csv'
+        
+        with open(FILENAME, 'w') as f:
+            f.write('# file...... switch_recorder.csv\n# date...... Mon Jun 01 00:00:00 2015\n# user...... test\n# host...... test\n')
+            f.write('# target.... switch_1\n# property.. status,power_out,voltage_A\n# limit..... 0\n# interval.. 60\n')
+            f.write('# timestamp,status,power_out,voltage_A\n')
+            f.write('2015-06-01 00:00:00 PDT,CLOSED,+100.5-20.25i,+120+90d\n')
+            f.write('2015-06-01 00:01:00 PDT,OPEN,+0+0i,+240-180d\n')
+            f.write('# end of tape\n')
+        
+        __data = CsvGridlab(FILENAME)
+        
+        self.assertEqual(__data.groupid, 'switch_1')
+        self.assertEqual(list(__data.names), ['status', 'power_out.real', 'power_out.imag', 'voltage_A.real', 'voltage_A.imag'])
+        self.assertTrue((__data.time == pd.DatetimeIndex(['2015-06-01 00:00:00', '2015-06-01 00:01:00'])).all())
+        self.assertTrue(np.allclose(__data.data.values, [[1.0, 100.5, -20.25, 0.0, 120.0], [0.0, 0.0, 0.0, -240.0, 0.0]]))
+        
+        __window = CsvGridlab(FILENAME, start='2015-06-01 00:00:30', columns=['voltage_A'])
+        
+        self.assertEqual(list(__window.names), ['voltage_A.real', 'voltage_A.imag'])
+        self.assertTrue((__window.time == pd.DatetimeIndex(['2015-06-01 00:01:00'])).all())
+        self.assertTrue(np.allclose(__window.data.values, [[-240.0, 0.0]]))
+        
+        os.remove(FILENAME)
+        os.remove(FILENAME + CSV_INDEX_EXTENSION)
+        
+    def testPlayerSidecar(self):
+        '''
+        Example loading a player file through its binary sidecar (changing a loaded series changes neither the sidecar 
+        nor later loads, and an out of date sidecar is rewritten over the old one).
+        '''
+        FILENAME = 'sidecar.player'
+        
+        with open(FILENAME, 'w') as f:
+            f.write('2015-06-01 00:00:00,1.5\n+1m,2.5\n+1m,3.5\n')
+        
+        __parsed = load_player(FILENAME)
+        __mapped = load_player(FILENAME)
+        __mapped[:] = 0.0
+        
+        self.assertTrue(np.allclose(load_player(FILENAME).values, [1.5, 2.5, 3.5]))
+        self.assertTrue((__mapped.index == __parsed.index).all())
+        
+        with open(FILENAME, 'a') as f:
+            f.write('+1m,4.5\n')
+        load_player(FILENAME)
+        
+        self.assertTrue(np.allclose(load_player(FILENAME).values, [1.5, 2.5, 3.5, 4.5]))
+        
+        os.remove(FILENAME)
+        os.remove(FILENAME + SIDECAR_EXTENSION)
+        
+    def testFileBusSaveInput(self):
+        '''
+        Example using a FileBus that saves the inputs it is sent to a .csv file.
+        '''
+        FILENAME = 'file_bus_save_input.json'
+        
+        with open_bus(FILENAME) as bus:
+            __frame = message_voltage_frame(bus.sim_time)
+            __run = bus.run(__frame)
+        
+        __saved = csv_to_table('file_bus_inputs.csv')
+        self.assertTrue((__saved.index == __run.index).all())
+        self.assertTrue(np.allclose(__saved['network_node.voltage_A'].values, __frame.values[1:,0]))
+        
+        os.remove('file_bus_inputs.csv')
+        
     def testFileBusTranslator(self):
         '''
         Example using a FileBus with an AggregatorBusTranslator.
@@ -179,12 +456,255 @@ class TestBus( TestCase ):
         FILENAME = 'file_bus_translator.json'
         
         with open_bus(FILENAME) as bus:
-            while not bus.finished:
-                __out = bus.transaction(inputs=None)
-                print translator_out_to_string(__out)
+            print bus.run()
     
         print 'bus finished'
         
+    def testFileBusRun(self):
+        '''
+        Bus.run should give the same outputs as the Bus.transaction loop.
+        '''
+        FILENAME = 'file_bus_translator.json'
+        
+        with open_bus(FILENAME) as bus:
+            __run = bus.run()
+            self.assertTrue(bus.finished)
+        
+        with open_bus(FILENAME) as bus:
+            __out = []
+            while not bus.finished:
+                __out.append(bus.transaction(inputs=None))
+        
+        self.assertEqual(len(__run.index), len(__out))
+        self.assertEqual(str(__run.index[-1]), __out[-1][AggregatorBusTranslator.IN_TIME_KEY])
+        self.assertTrue(np.allclose(__run[AggregatorBusTranslator.OUT_P_RE_KEY].values, [o[AggregatorBusTranslator.OUT_P_RE_KEY] for o in __out]))
+        self.assertTrue(np.allclose(__run[AggregatorBusTranslator.OUT_P_IM_KEY].values, [o[AggregatorBusTranslator.OUT_P_IM_KEY] for o in __out]))
+        
+    def testResistorBus(self):
+        '''
+        Example using a ResistorBus (ZIP load) with a voltage schedule.  Bus.run should give the same outputs 
+        as the Bus.transaction loop.
+        '''
+        FILENAME = 'resistor_bus.json'
+        
+        with open_bus(FILENAME) as bus:
+            #at the nominal voltage, the load is the base power at the 0.97 power factor
+            __nominal = bus.transaction(inputs=None).get_param('network_node','measured_power').value
+            self.assertTrue(np.allclose(__nominal, 3 * 1.5e6 * (0.97 + 1j * np.sqrt(1 - 0.97**2))))
+        
+        with open_bus(FILENAME) as bus:
+            __frame = message_voltage_frame(bus.sim_time)
+            __run = bus.run(__frame)
+            print __run
+        
+        with open_bus(FILENAME) as bus:
+            __out = []
+            for t, v in __frame['special.positive_sequence_voltage'][1:].iteritems():
+                __in = MessageCommonData()
+                __in.add_param(CommonParam(name='special',param='positive_sequence_voltage',value=v))
+                __out.append(bus.transaction(inputs=__in).get_param('network_node','measured_power').value)
+        
+        self.assertTrue(np.allclose(__run['network_node.measured_power'].values, __out))
+        
+    def testSurrogateBus(self):
+        '''
+        Example fitting a SurrogateBus to the ResistorBus.  The surrogate should be close to the ResistorBus within
+        the voltages it was trained with, and refuse voltages outside of them.
+        '''
+        with open_bus('resistor_bus.json') as bus:
+            __frame = message_voltage_frame(bus.sim_time)
+            __model = SurrogateBus.fit(bus, __frame, 'surrogate_model.json')
+            print __model['fit_error']
+        
+        self.assertTrue(__model['fit_error']['r2']['network_node.measured_power'] > 0.99)
+        
+        with open_bus('resistor_bus.json') as bus:
+            __expected = bus.run(__frame)
+        with open_bus('surrogate_bus.json') as bus:
+            __run = bus.run(__frame)
+        
+        self.assertTrue(np.allclose(__run.values, __expected.values, rtol=1e-2))
+        
+        with open_bus('surrogate_bus.json') as bus:
+            __in = MessageCommonData()
+            __in.add_param(CommonParam(name='special',param='positive_sequence_voltage',value=2 * __frame.values.max()))
+            self.assertRaises(Exception, bus.transaction, __in)
+        
+        os.remove('surrogate_model.json')
+        
+    def testMultiNodeBusResistor(self):
+        '''
+        MultiNodeBus.run of ResistorBus sub-Buses (which use their inputs) should give the same outputs as the 
+        MultiNodeBus.transaction loop.
+        '''
+        FILENAME = 'multi_bus_resistor.json'
+        
+        with open_bus(FILENAME) as bus:
+            __frame = translator_multinode_frame(bus.sim_time)
+            __run = bus.run(__frame)
+        
+        with open_bus(FILENAME) as bus:
+            __out = [bus.transaction(dict(row)) for _, row in __frame[1:].iterrows()]
+        
+        self.assertTrue(np.allclose(__run[AggregatorBusTranslator.OUT_P_RE_KEY].values, [o[AggregatorBusTranslator.OUT_P_RE_KEY] for o in __out]))
+        self.assertTrue(np.allclose(__run[AggregatorBusTranslator.OUT_P_IM_KEY].values, [o[AggregatorBusTranslator.OUT_P_IM_KEY] for o in __out]))
+        
+    def testCachedBus(self):
+        '''
+        Example wrapping a ResistorBus with a CachedBus.  A repeated run should be served from the cache without
+        starting the ResistorBus, and a run that changes the last inputs should replay the shared prefix and give
+        the same outputs as an uncached run.
+        '''
+        FILENAME = 'resistor_bus.json'
+        CACHE = 'transaction_cache.sqlite'
+        
+        def _run(bus, frame):
+            bus.start_bus()
+            __out = []
+            for t, v in frame['special.positive_sequence_voltage'][1:].iteritems():
+                __in = MessageCommonData()
+                __in.add_param(CommonParam(name='special',param='positive_sequence_voltage',value=v))
+                __out.append(bus.transaction(inputs=__in).get_param('network_node','measured_power').value)
+            bus.stop_bus()
+            return __out
+        
+        __frame = message_voltage_frame(load_bus('.', FILENAME).sim_time)
+        __changed = __frame.copy()
+        __changed.iloc[-5:] *= 1.01
+        
+        __first = _run(CachedBus(load_bus('.', FILENAME), TransactionCache(CACHE)), __frame)
+        
+        __bus = CachedBus(load_bus('.', FILENAME), TransactionCache(CACHE))
+        self.assertEqual(_run(__bus, __frame), __first)
+        self.assertFalse(__bus.live)
+        self.assertEqual(__bus.cache.hits, len(__first))
+        
+        __bus = CachedBus(load_bus('.', FILENAME), TransactionCache(CACHE))
+        self.assertTrue(np.allclose(_run(__bus, __changed), _run(load_bus('.', FILENAME), __changed)))
+        self.assertTrue(__bus.live)
+        self.assertEqual(__bus.cache.hits, len(__first) - 5)
+        
+        #a bus without a folder keeps its cache in the working directory
+        __params = load_bus('.', FILENAME).params
+        del __params['folder']
+        __params['transaction_cache'] = CACHE
+        __bus = get_bus_from_classname(__params)
+        self.assertEqual(_run(__bus, __frame), __first)
+        self.assertFalse(__bus.live)
+        
+        os.remove(CACHE)
+        
+    def testCachedMultiNodeBus(self):
+        '''
+        Example with a CachedBus as a MultiNodeBus sub-Bus (transaction_cache in its params), for both the
+        transaction loop and Bus.run, and a CachedBus wrapping a MultiNodeBus with the AggregatorBusTranslator.
+        '''
+        FILENAME = 'multi_bus_cached.json'
+        CACHE = 'transaction_cache.sqlite'
+        
+        def _loop(bus, frame):
+            bus.start_bus()
+            __out = [bus.transaction(dict(row))[AggregatorBusTranslator.OUT_P_RE_KEY] for _, row in frame[1:].iterrows()]
+            bus.stop_bus()
+            return __out
+        
+        def _run(bus, frame):
+            bus.start_bus()
+            __out = bus.run(frame)
+            bus.stop_bus()
+            return __out
+        
+        __frame = translator_multinode_frame(load_bus('.', FILENAME).sim_time)
+        
+        for __step in (_loop, _run):
+            __first = __step(load_bus('.', FILENAME), __frame)
+            
+            __bus = load_bus('.', FILENAME)
+            self.assertTrue(np.allclose(__step(__bus, __frame), __first))
+            self.assertFalse(__bus._buses[0].live)
+            self.assertEqual(__bus._buses[0].cache.hits, len(__frame) - 1)
+            
+            os.remove(CACHE)
+        
+        __first = _loop(CachedBus(load_bus('.', 'multi_bus_translator.json'), TransactionCache(CACHE)), __frame)
+        
+        __bus = CachedBus(load_bus('.', 'multi_bus_translator.json'), TransactionCache(CACHE))
+        self.assertEqual(_loop(__bus, __frame), __first)
+        self.assertFalse(__bus.live)
+        
+        os.remove(CACHE)
+        
+    def testReplayBus(self):
+        '''
+        Example recording a ResistorBus with a RecordingBus and serving its outputs back with a ReplayBus.
+        '''
+        __bus = RecordingBus(load_bus('.', 'resistor_bus.json'), 'resistor_bus_record.h5')
+        __bus.start_bus()
+        __frame = message_voltage_frame(__bus.sim_time)
+        __expected = __bus.run(__frame)
+        __bus.stop_bus()
+        
+        with open_bus('replay_bus.json') as bus:
+            __run = bus.run()
+        self.assertTrue(np.allclose(__run.values, __expected.values))
+        
+        with open_bus('replay_bus.json') as bus:
+            bus.check_inputs = True
+            __in = MessageCommonData()
+            __in.add_param(CommonParam(name='special',param='positive_sequence_voltage',value=__frame.values[1,0]))
+            self.assertTrue(np.allclose(bus.transaction(__in).get_param('network_node','measured_power').value, 
+                                        __expected['network_node.measured_power'].values[0]))
+            
+            __in = MessageCommonData()
+            __in.add_param(CommonParam(name='special',param='positive_sequence_voltage',value=1.01 * __frame.values[2,0]))
+            self.assertRaises(Exception, bus.transaction, __in)
+        
+        #a bus without a folder records to the working directory
+        __params = load_bus('.', 'resistor_bus.json').params
+        del __params['folder']
+        __params['record_file'] = 'resistor_bus_record.h5'
+        __bus = get_bus_from_classname(__params)
+        __bus.start_bus()
+        __bus.run(__frame)
+        __bus.stop_bus()
+        
+        with open_bus('replay_bus.json') as bus:
+            __run = bus.run()
+        self.assertTrue(np.allclose(__run.values, __expected.values))
+        
+        os.remove('resistor_bus_record.h5')
+        
+    def testRecordingBusTranslator(self):
+        '''
+        Example recording a MultiNodeBus with the AggregatorBusTranslator (dict inputs and outputs), and a RecordingBus
+        as a sub-Bus in MultiNodeBus.run.
+        '''
+        RECORD = 'multi_bus_record.h5'
+        
+        __bus = RecordingBus(load_bus('.', 'multi_bus_translator.json'), RECORD)
+        __bus.start_bus()
+        __frame = translator_multinode_frame(__bus.sim_time)
+        __out = [__bus.transaction(dict(row)) for _, row in __frame[1:].iterrows()]
+        __bus.stop_bus()
+        
+        __record = read_record(RECORD)
+        self.assertTrue(np.allclose(__record['inputs'][(AggregatorBusTranslator.IN_V_RE_KEY, None)], 
+                                    __frame[AggregatorBusTranslator.IN_V_RE_KEY].values[1:]))
+        self.assertTrue(np.allclose(__record['outputs'][(AggregatorBusTranslator.OUT_P_RE_KEY, None)], 
+                                    [o[AggregatorBusTranslator.OUT_P_RE_KEY] for o in __out]))
+        
+        __bus = load_bus('.', 'multi_bus_inline.json')
+        __bus._buses[0] = RecordingBus(__bus._buses[0], RECORD)
+        __bus.start_bus()
+        __run = __bus.run(translator_multinode_frame(__bus.sim_time))
+        __bus.stop_bus()
+        
+        __record = read_record(RECORD)
+        self.assertTrue((__record['time'] == __run.index.asi8).all())
+        self.assertTrue(np.allclose(__record['outputs'][('network_node', 'measured_power')], 4.731548028834177))
+        
+        os.remove(RECORD)
+        
     def testGridlabBus(self):
         '''
         Example using a GridlabBus.  Will change the base_power for the load
@@ -194,9 +714,7 @@ class TestBus( TestCase ):
         FILENAME = 'gridlabd_bus.json'
         
         with open_bus(FILENAME) as bus:
-            while not bus.finished:
-                __out = bus.transaction(inputs=message_gld_input())
-                print out_to_string(__out)
+            print bus.run(message_gld_frame(bus.sim_time))
     
         print 'bus finished'
         
@@ -241,11 +759,21 @@ class TestBus( TestCase ):
         FILENAME = 'multi_bus_translator.json'
         
         with open_bus(FILENAME) as bus:
-            while not bus.finished:
-                __out = bus.transaction(inputs=translator_multinode_input())
-                print translator_out_to_string(__out)
+            print bus.run(translator_multinode_frame(bus.sim_time))
     
         print 'bus finished'
         
+    def testMultiNodeBusInline(self):
+        '''
+        Example using a MultiNodeBus with one sub-Bus given inline (as a dict) and one given as a __bus_file.
+        '''
+        FILENAME = 'multi_bus_inline.json'
+        
+        with open_bus(FILENAME) as bus:
+            self.assertEqual([b.__class__.__name__ for b in bus._buses], ['ConstantBus', 'FileBus'])
+            __run = bus.run(translator_multinode_frame(bus.sim_time))
+        
+        self.assertFalse(__run.isnull().values.any())
+        
     
         
\ No newline at end of file
@@ -41,6 +41,6 @@ setup(
     license='LICENSE.txt',
     description='abstract transmission bus interface with GridLAB-D hooks',
     long_description=open('README.txt').read(),
-    data_files=[                    ('data/example_bus_input',['data/example_bus_input/bus_nosetest.py',                                               'data/example_bus_input/constant_bus_translator.json',                                               'data/example_bus_input/constant_bus.json',                                               'data/example_bus_input/file_bus_translator.json',                                               'data/example_bus_input/file_bus.json',                                               'data/example_bus_input/gridlabd_bus.json',                                               'data/example_bus_input/multi_bus_translator.json',                                               'data/example_bus_input/example_gridlabd.glm',                                               'data/example_bus_input/power.player'])                ],
+    data_files=[                    ('data/example_bus_input',['data/example_bus_input/bus_nosetest.py',                                               'data/example_bus_input/constant_bus_translator.json',                                               'data/example_bus_input/constant_bus.json',                                               'data/example_bus_input/file_bus_translator.json',                                               'data/example_bus_input/file_bus.json',                                               'data/example_bus_input/file_bus_csv.json',                                               'data/example_bus_input/file_bus_stream.json',                                               'data/example_bus_input/file_bus_h5.json',                                               'data/example_bus_input/file_bus_save_input.json',                                               'data/example_bus_input/file_bus_schedule.json',                                               'data/example_bus_input/loadshapes.csv',                                               'data/example_bus_input/gridlabd_bus.json',                                               'data/example_bus_input/multi_bus_translator.json',                                               'data/example_bus_input/multi_bus_inline.json',                                               'data/example_bus_input/multi_bus_cached.json',                                               'data/example_bus_input/multi_bus_resistor.json',                                               'data/example_bus_input/resistor_bus.json',                                               'data/example_bus_input/surrogate_bus.json',                                               'data/example_bus_input/replay_bus.json',                                               'data/example_bus_input/example_gridlabd.glm',                                               'data/example_bus_input/power.player'])                ],
     install_requires=open('requirements.txt').read()
 )